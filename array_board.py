@@ -0,0 +1,257 @@
+from typing import TYPE_CHECKING
+
+from classes import (Board, CLASS_REGISTRY, ENTITY_TYPES, ENTITY_CODES, OTHER_CODE,
+                     STATELESS_TYPES, Entity, RawCell, cell_type, json_cell, load_object)
+from fog import FogOfWar
+from instrument import timed
+from rng import GameRng, derive_seed, randint, using
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from classes import Player
+
+
+SYMBOLS = [" "] + [cls.symbol(None) for cls in ENTITY_TYPES[1:]]
+STATELESS_CODES = frozenset(ENTITY_CODES[cls] for cls in STATELESS_TYPES)
+
+
+class ArrayBoard(Board):
+
+    def __init__(self, rows: int, cols: int):
+        self._rows = rows
+        self._cols = cols
+        self._codes = bytearray(rows * cols)
+        self._fog = FogOfWar(rows, cols)
+        self._state = {}
+        self._factories = {}
+        self._lazy_seed = None
+        self._start = (0, 0)
+        self._goal = (rows - 1, cols - 1)
+        self._watchers = []
+        self._changes = None
+        self._spatial = None
+        self._source = None
+        self._generation = None
+        self._delta = None
+
+    def snapshot(self):
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._codes = bytearray(self._codes)
+        board._fog = self._fog.copy()
+        board._state = dict(self._state)
+        board._factories = dict(self._factories)
+        board._watchers = []
+        board._changes = None
+        board._spatial = None
+        board._source = self
+        board._delta = set(self._delta) if self._delta is not None else None
+        return board
+
+    def _index(self, pos: tuple[int, int]):
+        return pos[0] * self._cols + pos[1]
+
+    def place(self, entity: Entity, pos: tuple[int, int], reveal: bool = True):
+        r, c = pos
+        if not (0 <= r < self._rows and 0 <= c < self._cols):
+            return
+        i = r * self._cols + c
+        if self._spatial is not None:
+            self._spatial.move(self._cls_at(i), type(entity) if entity is not None else None, pos)
+        if entity is None:
+            self._codes[i] = 0
+            self._state.pop(i, None)
+        else:
+            cls = type(entity)
+            code = ENTITY_CODES.get(cls, OTHER_CODE)
+            self._codes[i] = code
+            if cls in STATELESS_TYPES:
+                self._state.pop(i, None)
+            else:
+                self._state[i] = entity
+        if reveal:
+            self._fog.reveal(pos)
+        if self._watchers:
+            self._changed(pos)
+
+    def _cls_at(self, i: int):
+        code = self._codes[i]
+        if code == OTHER_CODE:
+            return cell_type(self._state[i])
+        return ENTITY_TYPES[code]
+
+    def entity_at(self, pos: tuple[int, int]):
+        r, c = pos
+        if not (0 <= r < self._rows and 0 <= c < self._cols):
+            return None
+        i = r * self._cols + c
+        code = self._codes[i]
+        if code == 0:
+            return None
+        if code in STATELESS_CODES:
+            return ENTITY_TYPES[code](pos)
+        entity = self._state.get(i)
+        if type(entity) is RawCell:
+            entity = self._state[i] = entity.build()
+        elif entity is None:
+            cls = ENTITY_TYPES[code]
+            factory = self._factories.get(code)
+            with using(GameRng(derive_seed(self._lazy_seed or 0, (i,)))):
+                entity = factory(cls, pos) if factory else cls(pos)
+            if self._source is not None and self._source._codes[i] == code:
+                entity = self._source._state.setdefault(i, entity)
+                if self._source._delta is not None:
+                    self._source._delta.add(pos)
+            self._state[i] = entity
+            if self._delta is not None:
+                self._delta.add(pos)
+        return entity
+
+    def cell(self, i: int):
+        entity = self._state.get(i)
+        if entity is None and self._codes[i] not in STATELESS_CODES:
+            return self.entity_at(divmod(i, self._cols))
+        return entity
+
+    def code_at(self, pos: tuple[int, int]):
+        r, c = pos
+        if 0 <= r < self._rows and 0 <= c < self._cols:
+            return self._codes[r * self._cols + c]
+        return 0
+
+    def codes(self):
+        return bytearray(self._codes)
+
+    def _cells_in(self, top: int, left: int, bottom: int, right: int):
+        codes, cols = self._codes, self._cols
+        for r in range(top, bottom + 1):
+            base = r * cols
+            for c, code in enumerate(codes[base + left:base + right + 1], left):
+                if code:
+                    yield self._cls_at(base + c), (r, c)
+
+    def place_batch(self, cls: type, indices, factory=None):
+        code = ENTITY_CODES.get(cls)
+        if (code is None or self._factories.get(code, factory) is not factory
+                or self._watchers or self._spatial is not None):
+            return super().place_batch(cls, indices, factory)
+        if cls not in STATELESS_TYPES:
+            if factory is not None:
+                self._factories[code] = factory
+            if self._lazy_seed is None:
+                self._lazy_seed = randint(0, 2 ** 63 - 1)
+        if np is None:
+            for i in set(self._state).intersection(indices):
+                del self._state[i]
+            for i in indices:
+                self._codes[i] = code
+                self._fog.reveal(divmod(i, self._cols))
+            return
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._state:
+            stale = np.fromiter(self._state, dtype=np.int64, count=len(self._state))
+            hit = np.zeros(len(self._codes), dtype=bool)
+            hit[indices] = True
+            for i in stale[hit[stale]]:
+                del self._state[int(i)]
+        np.frombuffer(self._codes, dtype=np.uint8)[indices] = code
+        bits = np.zeros((self._rows, self._cols), dtype=bool)
+        bits.flat[indices] = True
+        packed = np.packbits(bits, axis=1, bitorder="little")
+        rows = np.flatnonzero(packed.any(axis=1))
+        self._fog.reveal_rows((r, int.from_bytes(packed[r].tobytes(), "little")) for r in rows.tolist())
+
+    def _symbol(self, i: int):
+        code = self._codes[i]
+        if code == OTHER_CODE:
+            return self._state[i].symbol()
+        return SYMBOLS[code]
+
+    def symbol_at(self, pos: tuple[int, int], player: 'Player'):
+        if not self.is_revealed(pos):
+            return "X"
+        if pos == player.position:
+            return "P"
+        return self._symbol(self._index(pos))
+
+    @timed("render")
+    def render(self, player: 'Player'):
+        lines = []
+        cols = self._cols
+        hidden = "|" + "|".join("X" * cols) + "|"
+        player_index = self._index(player.position)
+        for r in range(self._rows):
+            bits = self._fog.row(r)
+            if not bits:
+                lines.append(hidden)
+                continue
+            row = []
+            for i in range(r * cols, (r + 1) * cols):
+                if not bits >> (i - r * cols) & 1:
+                    row.append("X")
+                elif i == player_index:
+                    row.append("P")
+                else:
+                    row.append(self._symbol(i))
+            lines.append("|" + "|".join(row) + "|")
+        print("\n".join(lines))
+
+    def to_dict(self):
+        grid_data = []
+        codes, state, cols = self._codes, self._state, self._cols
+        for r in range(self._rows):
+            bits = self._fog.row(r)
+            row = []
+            for c in range(cols):
+                i = r * cols + c
+                if not codes[i]:
+                    entity = None
+                else:
+                    entity = state.get(i)
+                    if type(entity) is RawCell and entity.fmt == "json":
+                        entity = entity.data
+                    else:
+                        entity = self.entity_at((r, c)).to_dict()
+                row.append({"revealed": bool(bits >> c & 1), "entity": entity})
+            grid_data.append(row)
+
+        return {
+            "class": "ArrayBoard",
+            "rows": self._rows,
+            "cols": self._cols,
+            "start": self._start,
+            "goal": self._goal,
+            "grid": grid_data
+        }
+
+    @classmethod
+    def from_dict(cls, data, lazy: bool = True):
+        board = cls(data["rows"], data["cols"])
+        board._start = tuple(data["start"])
+        board._goal = tuple(data["goal"])
+
+        revealed = []
+        for r, row in enumerate(data["grid"]):
+            bits = 0
+            for c, cell in enumerate(row):
+                entity = cell["entity"]
+                if entity:
+                    entity = json_cell(entity) if lazy else load_object(entity)
+                if type(entity) is RawCell:
+                    i = r * board._cols + c
+                    board._codes[i] = ENTITY_CODES.get(entity.cls, OTHER_CODE)
+                    board._state[i] = entity
+                elif entity is not None:
+                    board.place(entity, (r, c))
+                if cell["revealed"]:
+                    bits |= 1 << c
+            revealed.append(bits)
+        board._fog = FogOfWar.from_rows(board._rows, board._cols, revealed)
+
+        return board
+
+CLASS_REGISTRY["ArrayBoard"] = ArrayBoard
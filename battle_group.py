@@ -0,0 +1,242 @@
+from typing import TYPE_CHECKING
+
+from classes import Enemy, Skeleton
+from rng import integers, randint
+from status import STACK_RULES, DEFAULT_RULE, StatusEffects, stack
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from classes import Player
+
+
+ACTIVE = 0
+DEAD = 1
+FLED = 2
+VECTOR_MIN = 32
+
+
+def _padded(column, capacity: int, dtype):
+    padded = np.zeros(capacity, dtype=dtype)
+    padded[:len(column)] = column
+    return padded
+
+
+class _Target:
+    __slots__ = ("_group", "_row")
+
+    def __init__(self, group: 'EnemyGroup', row: int):
+        self._group = group
+        self._row = row
+
+    @property
+    def _hp(self):
+        return float(self._group._hp[self._row])
+
+    def is_alive(self):
+        return self._group._hp[self._row] > 0
+
+    def take_damage(self, amount: float):
+        hp = self._group._hp
+        damage = float(min(amount, hp[self._row]))
+        hp[self._row] -= damage
+        return damage
+
+
+class EnemyGroup:
+
+    def __init__(self, enemies=()):
+        self._kinds = []
+        self._lvl = []
+        self._scale = []
+        self._hp = []
+        self._max_hp = []
+        self._damage = []
+        self._reward = []
+        self._sources = []
+        self._state = []
+        self._statuses = {}
+        self._active = {}
+        self._alive = None
+        for enemy in enemies:
+            self.add(enemy, source=True)
+
+    def __len__(self):
+        return len(self._active)
+
+    def _vectorize(self, capacity: int):
+        self._scale, self._hp, self._max_hp = (_padded(column, capacity, float)
+                                               for column in (self._scale, self._hp, self._max_hp))
+        self._statuses = {name: (_padded(dmgs, capacity, float), _padded(left, capacity, np.int64))
+                          for name, (dmgs, left) in self._statuses.items()}
+        self._alive = _padded([row in self._active for row in range(len(self._kinds))], capacity, bool)
+
+    def _grow(self):
+        self._vectorize(2 * len(self._hp))
+
+    def add(self, enemy: Enemy, source: bool = False):
+        row = len(self._kinds)
+        if self._alive is None and np is not None and row >= VECTOR_MIN:
+            self._vectorize(2 * row)
+        if self._alive is None:
+            self._scale.append(1 + enemy._lvl / 10)
+            self._hp.append(enemy._hp)
+            self._max_hp.append(enemy._max_hp)
+            for columns in self._statuses.values():
+                columns[0].append(0.0)
+                columns[1].append(0)
+        else:
+            if row >= len(self._hp):
+                self._grow()
+            self._scale[row] = 1 + enemy._lvl / 10
+            self._hp[row] = enemy._hp
+            self._max_hp[row] = enemy._max_hp
+            self._alive[row] = True
+        self._kinds.append(type(enemy))
+        self._lvl.append(enemy._lvl)
+        self._damage.append(None if isinstance(enemy, Skeleton) else int(enemy._max_enemy_damage))
+        self._reward.append(enemy._reward_coins)
+        self._sources.append(enemy if source else None)
+        self._state.append(ACTIVE)
+        self._active[row] = None
+        if enemy._statuses:
+            for name, (dmg, turns) in enemy._statuses.items():
+                self.apply_status(row, name, dmg, max(1, turns), "refresh")
+        return row
+
+    def active(self):
+        return list(self._active)
+
+    def target(self):
+        return _Target(self, next(iter(self._active)))
+
+    def target_hp(self):
+        return float(self._hp[next(iter(self._active))])
+
+    def total_hp(self):
+        if self._alive is not None:
+            return sum(self._hp[self._alive].tolist())
+        return sum(self._hp[row] for row in self._active)
+
+    def source(self, row: int):
+        return self._sources[row]
+
+    def below(self, rows: list, threshold: float):
+        hp, max_hp = self._hp, self._max_hp
+        if self._alive is not None:
+            rows = np.array(rows, dtype=np.int64)
+            return rows[hp[rows] / max_hp[rows] < threshold].tolist()
+        return [row for row in rows if hp[row] / max_hp[row] < threshold]
+
+    def apply_status(self, row: int, name: str, dmg: float, turns: int, rule: str = None):
+        columns = self._statuses.get(name)
+        if columns is None:
+            if self._alive is None:
+                columns = ([0.0] * len(self._hp), [0] * len(self._hp))
+            else:
+                columns = (np.zeros(len(self._hp)), np.zeros(len(self._hp), dtype=np.int64))
+            self._statuses[name] = columns
+        dmgs, left = columns
+        if left[row] > 0:
+            dmg, turns = stack(rule or STACK_RULES.get(name, DEFAULT_RULE), (float(dmgs[row]), int(left[row])),
+                               dmg, turns)
+        dmgs[row] = dmg
+        left[row] = turns
+
+    def tick_statuses(self):
+        if self._alive is not None:
+            return self._tick_columns()
+        hp, scale = self._hp, self._scale
+        total = 0.0
+        for dmgs, left in self._statuses.values():
+            ticking = [row for row in self._active if left[row] > 0]
+            for row in ticking:
+                damage = min(dmgs[row] * scale[row], hp[row])
+                hp[row] -= damage
+                left[row] -= 1
+                total += damage
+        return total
+
+    def _tick_columns(self):
+        hp, scale = self._hp, self._scale
+        total = 0.0
+        for dmgs, left in self._statuses.values():
+            ticking = np.flatnonzero(self._alive & (left > 0))
+            if not len(ticking):
+                continue
+            damage = np.minimum(dmgs[ticking] * scale[ticking], hp[ticking])
+            hp[ticking] -= damage
+            left[ticking] -= 1
+            total += sum(damage.tolist())
+        return total
+
+    def collect_dead(self):
+        hp = self._hp
+        if self._alive is not None:
+            dead = np.flatnonzero(self._alive & (hp <= 0)).tolist()
+            self._alive[dead] = False
+        else:
+            dead = [row for row in self._active if hp[row] <= 0]
+        for row in dead:
+            self._state[row] = DEAD
+            del self._active[row]
+        return dead
+
+    def payout(self, rows: list):
+        return sum(self._reward[row] for row in rows)
+
+    def flee(self, row: int):
+        if self._state[row] == ACTIVE:
+            self._state[row] = FLED
+            del self._active[row]
+            if self._alive is not None:
+                self._alive[row] = False
+
+    def summon(self, rows: list):
+        for row in rows:
+            self.add(self._kinds[row](self._lvl[row], None))
+
+    def before_turn(self, player: 'Player'):
+        kinds = self._kinds
+        if len(self._active) == 1:
+            row = next(iter(self._active))
+            kinds[row].before_turn_batch(self, [row], player)
+            return
+        groups = {}
+        for row in self._active:
+            groups.setdefault(kinds[row], []).append(row)
+        for kind, rows in groups.items():
+            kind.before_turn_batch(self, rows, player)
+
+    def attack(self, player: 'Player', rows: list):
+        state, damage = self._state, self._damage
+        by_max = {}
+        hits = 0
+        for row in rows:
+            if state[row] != ACTIVE:
+                continue
+            high = damage[row]
+            if high is None:
+                high = damage[row] = int(self._sources[row]._weapon._max_damage)
+            by_max[high] = by_max.get(high, 0) + 1
+            hits += 1
+        if hits == 1:
+            total = randint(0, high)
+        else:
+            total = 0
+            for high, count in by_max.items():
+                total += int(sum(integers(0, high, count)))
+        player.take_damage(total)
+        return total, hits
+
+    def sync(self):
+        for row, enemy in enumerate(self._sources):
+            if enemy is None:
+                continue
+            enemy._hp = float(self._hp[row])
+            statuses = {name: (float(dmgs[row]), int(left[row])) for name, (dmgs, left) in self._statuses.items()
+                        if left[row] > 0}
+            enemy._statuses = StatusEffects(statuses) if statuses else None
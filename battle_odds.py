@@ -0,0 +1,276 @@
+import functools
+import math
+import sys
+from collections import Counter
+
+from classes import Player, Enemy, Rat, Spider, Skeleton, Stick, MeleeWeapon, RangedWeapon
+from rng import GameRng, using
+
+try:
+    from battle_sim import simulate_battles, WIN, LOSS, FLED
+except ImportError:
+    simulate_battles = None
+
+
+EPSILON = 1e-12
+MAX_TURNS = 1000
+STATUSES = ("infection", "poison")
+CACHE_SIZE = 4096
+MAX_STATES = 500_000
+SAMPLES = 20_000
+
+def _half(value: float):
+    return int(round(value * 2))
+
+
+def _alive_count(hp: float, step: float):
+    if step <= 0:
+        return None
+    return max(0, math.ceil(hp / step - 1e-9))
+
+
+def _spread(dist: list, width: int, step: int = 1):
+    n = len(dist)
+    out = [0.0] * n
+    weight = 1.0 / (width + 1)
+    span = (width + 1) * step
+    for start in range(step):
+        window = 0.0
+        for k in range(start, n, step):
+            window += dist[k]
+            if k >= span:
+                window -= dist[k - span]
+            out[k] = window * weight
+    return out, max(0.0, sum(dist) - sum(out))
+
+
+def _shift(dist: list, shift: int):
+    if not shift:
+        return dist, 0.0
+    return [0.0] * shift + dist[:len(dist) - shift], sum(dist[len(dist) - shift:])
+
+
+def _enemy_damage(enemy: Enemy):
+    if isinstance(enemy, Skeleton):
+        return int(enemy._weapon._max_damage)
+    return int(enemy._max_enemy_damage)
+
+
+def battle_key(player: Player, enemy: Enemy):
+    weapon = player._weapon
+    if isinstance(weapon, RangedWeapon):
+        mult = player._accuracy
+        hits = weapon._ammo // weapon._ammo_consumption
+    elif isinstance(weapon, MeleeWeapon):
+        mult = player._rage
+        hits = weapon._durability if isinstance(weapon, Stick) else -1
+    else:
+        mult, hits = 1.0, -1
+    max_dmg = int(weapon._max_damage) if weapon else 20
+
+    proc = (None, 0.0, 0, 0.0)
+    flee = (0.0, 0.0)
+    if isinstance(enemy, Rat):
+        proc = ("infection", enemy._infection_chance, enemy._infection_turns, enemy._infection_damage_base)
+        flee = (enemy._flee_chance_low_hp, enemy._flee_threshold)
+    elif isinstance(enemy, Spider):
+        proc = ("poison", enemy._poison_chance, enemy._poison_turns, enemy._poison_damage_base)
+
+    statuses = tuple((name, float(dmg), int(turns)) for name, (dmg, turns) in sorted(player._statuses.items())
+                     if name in STATUSES)
+    return (type(weapon).__name__, max_dmg, hits, float(mult), type(enemy).__name__, enemy._lvl,
+            float(enemy._hp), float(enemy._max_hp), _enemy_damage(enemy), proc, flee,
+            float(player._hp), player._lvl, statuses)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _solve(weapon: str, max_dmg: int, hits: int, mult: float, enemy: str, enemy_lvl: int, enemy_hp: float,
+           enemy_max_hp: float, enemy_dmg: int, proc: tuple, flee: tuple, player_hp: float, player_lvl: int,
+           statuses: tuple):
+    proc_name, proc_chance, proc_turns, proc_dmg = proc
+    flee_chance, flee_threshold = flee
+
+    enemy_alive = _alive_count(enemy_hp, mult if max_dmg else 0)
+    if enemy_alive is None:
+        enemy_alive = 1
+    if enemy_alive == 0:
+        return {"win": 1.0, "loss": 0.0, "fled": 0.0, "timeout": 0.0,
+                "turns": ((0, 1.0),), "hp_left": ((player_hp, 1.0),)}
+    enemy_dist = [0.0] * enemy_alive
+    enemy_dist[0] = 1.0
+    flee_from = [flee_chance and (enemy_hp - mult * s) / enemy_max_hp < flee_threshold
+                 for s in range(enemy_alive)]
+
+    size = _alive_count(player_hp, 0.5)
+    if size == 0:
+        return {"win": 0.0, "loss": 1.0, "fled": 0.0, "timeout": 0.0,
+                "turns": ((0, 1.0),), "hp_left": ((0.0, 1.0),)}
+    status_dmg = {name: proc_dmg if name == proc_name else 0.0 for name in STATUSES}
+    start = [0, 0]
+    for name, dmg, turns in statuses:
+        status_dmg[name] = dmg
+        start[STATUSES.index(name)] = turns
+    scale = 1 + player_lvl / 10
+    ticks = [_half(status_dmg[name] * scale) for name in STATUSES]
+    player_dist = {tuple(start): [1.0] + [0.0] * (size - 1)}
+
+    win = loss = fled = 0.0
+    turns = {}
+    hp_left = {}
+    enemy_mass = 1.0
+    turn = 0
+    while turn < MAX_TURNS:
+        turn += 1
+
+        ticked = {}
+        tick_dead = 0.0
+        for state, dist in player_dist.items():
+            shift = sum(tick for tick, left in zip(ticks, state) if left > 0)
+            dist, dead = _shift(dist, shift)
+            tick_dead += dead
+            key = tuple(max(0, left - 1) for left in state)
+            if key in ticked:
+                ticked[key] = [a + b for a, b in zip(ticked[key], dist)]
+            else:
+                ticked[key] = dist
+        after_tick = [sum(column) for column in zip(*ticked.values())]
+        player_mass = sum(after_tick)
+
+        killed = 0.0
+        if max_dmg and (hits < 0 or turn <= hits):
+            enemy_dist, killed = _spread(enemy_dist, max_dmg)
+        escaped = 0.0
+        if flee_chance:
+            for s, low in enumerate(flee_from):
+                if low and enemy_dist[s]:
+                    escaped += enemy_dist[s] * flee_chance
+                    enemy_dist[s] *= 1 - flee_chance
+        remaining = sum(enemy_dist)
+
+        lost = enemy_mass * tick_dead
+        for k, p in enumerate(after_tick):
+            if p:
+                hp = round(player_hp - k / 2, 6)
+                hp_left[hp] = hp_left.get(hp, 0.0) + (killed + escaped) * p
+        win += killed * player_mass
+        fled += escaped * player_mass
+
+        hit = {}
+        attack_dead = 0.0
+        for state, dist in ticked.items():
+            branches = [(state, 1.0)]
+            if proc_name:
+                index = STATUSES.index(proc_name)
+                procced = list(state)
+                procced[index] = proc_turns
+                branches = [(state, 1 - proc_chance), (tuple(procced), proc_chance)]
+            for key, chance in branches:
+                if not chance:
+                    continue
+                spread, dead = _spread(dist, enemy_dmg, 2)
+                attack_dead += dead * chance
+                spread = [p * chance for p in spread]
+                if key in hit:
+                    hit[key] = [a + b for a, b in zip(hit[key], spread)]
+                else:
+                    hit[key] = spread
+        lost += remaining * attack_dead
+        loss += lost
+        turns[turn] = turns.get(turn, 0.0) + lost + (killed + escaped) * player_mass
+
+        player_dist = hit
+        enemy_mass = remaining
+        alive = enemy_mass * sum(sum(dist) for dist in player_dist.values())
+        if alive < EPSILON:
+            break
+
+    timeout = max(0.0, 1.0 - win - loss - fled)
+    hp_left[0.0] = hp_left.get(0.0, 0.0) + loss
+    return {
+        "win": win,
+        "loss": loss,
+        "fled": fled,
+        "timeout": timeout,
+        "turns": tuple(sorted(turns.items())),
+        "hp_left": tuple(sorted(hp_left.items()))
+    }
+
+
+def state_space(key: tuple):
+    max_dmg, mult, enemy_hp, player_hp = key[1], key[3], key[6], key[11]
+    enemy_alive = _alive_count(enemy_hp, mult if max_dmg else 0) or 1
+    return enemy_alive * max(1, _alive_count(player_hp, 0.5))
+
+
+def _odds(result: dict, turns: dict, hp_left: dict, exact: bool):
+    return {
+        "win": result["win"],
+        "loss": result["loss"],
+        "fled": result["fled"],
+        "timeout": result["timeout"],
+        "turns": turns,
+        "hp_left": hp_left,
+        "mean_turns": sum(t * p for t, p in turns.items()),
+        "mean_hp_left": sum(hp * p for hp, p in hp_left.items()),
+        "exact": exact
+    }
+
+
+def _sampled(player: Player, enemy: Enemy):
+    if simulate_battles is None:
+        return None
+    sample = simulate_battles(player, enemy, SAMPLES, rng=0)
+    winner = sample["winner"].tolist()
+    share = 1.0 / len(winner)
+    outcomes = Counter(winner)
+    result = {
+        "win": outcomes[WIN] * share,
+        "loss": outcomes[LOSS] * share,
+        "fled": outcomes[FLED] * share,
+        "timeout": (len(winner) - outcomes[WIN] - outcomes[LOSS] - outcomes[FLED]) * share
+    }
+    turns = {int(t): n * share for t, n in Counter(sample["turns"].tolist()).items()}
+    hp_left = {float(hp): n * share for hp, n in Counter(sample["player_hp"].tolist()).items()}
+    return _odds(result, turns, hp_left, False)
+
+
+def battle_odds(player: Player, enemy: Enemy):
+    key = battle_key(player, enemy)
+    if state_space(key) > MAX_STATES:
+        return _sampled(player, enemy)
+    result = _solve(*key)
+    return _odds(result, dict(result["turns"]), dict(result["hp_left"]), True)
+
+
+def cache_info():
+    return _solve.cache_info()
+
+
+def clear_cache():
+    _solve.cache_clear()
+
+
+if __name__ == "__main__":
+    import time
+    from battle_sim import simulate_battles, summarize
+
+    enemies = {"rat": Rat, "spider": Spider, "skeleton": Skeleton}
+    argv = sys.argv[1:]
+    enemy_cls = enemies.get(argv[0] if argv else "rat", Rat)
+    lvl = int(argv[1]) if len(argv) > 1 else 3
+    with using(GameRng(0)):
+        player = Player(lvl=1, position=(0, 0))
+        enemy = enemy_cls(lvl=lvl, position=(0, 0))
+
+    t0 = time.perf_counter()
+    odds = battle_odds(player, enemy)
+    exact = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    battle_odds(player, enemy)
+    cached = time.perf_counter() - t0
+    print(f"Точно: победа {odds['win']:.4f}, поражение {odds['loss']:.4f}, бегство {odds['fled']:.4f}, "
+          f"ходов {odds['mean_turns']:.2f}, HP {odds['mean_hp_left']:.2f} "
+          f"({exact * 1e3:.1f} мс, из кэша {cached * 1e6:.1f} мкс)")
+    sample = summarize(simulate_battles(player, enemy, 200_000, rng=0))
+    print(f"Monte Carlo: победа {sample['win_rate']:.4f}, поражение {sample['loss_rate']:.4f}, "
+          f"бегство {sample['fled_rate']:.4f}, ходов {sample['mean_turns']:.2f}, HP {sample['mean_hp_left']:.2f}")
@@ -0,0 +1,289 @@
+import numpy as np
+
+from classes import (Player, Enemy, Rat, Spider, Skeleton, Stick, Bow, Revolver,
+                     MeleeWeapon, RangedWeapon)
+from rng import GameRng
+
+
+WIN = 1
+LOSS = -1
+FLED = 0
+TIMEOUT = 2
+
+BONUS_TYPES = ["Medkit", "Rage", "Arrows", "Bullets", "Accuracy"]
+BONUS_PRICES = {"Medkit": 75, "Rage": 50, "Accuracy": 50}
+
+
+class BattlePolicy:
+
+    def __init__(self, heal_below: float = 0.5, refill_ammo: bool = True,
+                 boost_first_turn: bool = True, auto_buy: tuple = ("Medkit",)):
+        self.heal_below = heal_below
+        self.refill_ammo = refill_ammo
+        self.boost_first_turn = boost_first_turn
+        self.auto_buy = tuple(auto_buy)
+
+    @classmethod
+    def passive(cls):
+        return cls(heal_below=0.0, refill_ammo=False, boost_first_turn=False, auto_buy=())
+
+
+def _bonus_value(bonus):
+    for attr in ("_power", "_multiplier", "_amount"):
+        if hasattr(bonus, attr):
+            return getattr(bonus, attr)
+    return 0
+
+
+def _enemy_params(enemy: Enemy):
+    if isinstance(enemy, Skeleton):
+        return int(enemy._weapon._max_damage), 0.0, 0.0, 0.0
+    if isinstance(enemy, Rat):
+        return (int(enemy._max_enemy_damage), enemy._infection_chance,
+                enemy._flee_chance_low_hp, enemy._flee_threshold)
+    if isinstance(enemy, Spider):
+        return int(enemy._max_enemy_damage), enemy._poison_chance, 0.0, 0.0
+    return int(enemy._max_enemy_damage), 0.0, 0.0, 0.0
+
+
+def simulate_battles(player: Player, enemy: Enemy, n: int, policy: BattlePolicy = None,
+                     rng=None, max_turns: int = 1000):
+    policy = policy or BattlePolicy.passive()
+    if isinstance(rng, GameRng):
+        rng = rng.generator()
+    elif not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    weapon = player._weapon
+    melee = isinstance(weapon, MeleeWeapon)
+    ranged = isinstance(weapon, RangedWeapon)
+    max_dmg = int(weapon._max_damage) if weapon else 20
+    consumption = weapon._ammo_consumption if ranged else 0
+    ammo_bonus = "Arrows" if isinstance(weapon, Bow) else "Bullets" if isinstance(weapon, Revolver) else None
+
+    enemy_dmg, proc_chance, flee_chance, flee_threshold = _enemy_params(enemy)
+    proc_status = "infection" if isinstance(enemy, Rat) else "poison" if isinstance(enemy, Spider) else None
+    proc_base = enemy._infection_damage_base if isinstance(enemy, Rat) else getattr(enemy, "_poison_damage_base", 0.0)
+    proc_turns = enemy._infection_turns if isinstance(enemy, Rat) else getattr(enemy, "_poison_turns", 0)
+
+    statuses = {name: (float(dmg), int(turns)) for name, (dmg, turns) in player._statuses.items()}
+    if proc_status and proc_status not in statuses:
+        statuses[proc_status] = (proc_base, 0)
+
+    stacks = {name: np.array([_bonus_value(b) for b in player._inventory[name]], dtype=float)
+              for name in BONUS_TYPES}
+    tracked = []
+    if policy.heal_below > 0:
+        tracked.append("Medkit")
+    if policy.refill_ammo and ammo_bonus:
+        tracked.append(ammo_bonus)
+    if policy.boost_first_turn and (melee or ranged):
+        tracked.append("Rage" if melee else "Accuracy")
+
+    initial = {
+        "player_hp": player._hp,
+        "enemy_hp": enemy._hp,
+        "coins": player._coins,
+        "rage": player._rage,
+        "accuracy": player._accuracy,
+        "ammo": weapon._ammo if ranged else 0,
+        "durability": getattr(weapon, "_durability", 0) or 0,
+    }
+    for name, (dmg, turns) in statuses.items():
+        initial["status_" + name] = dmg
+        initial[name] = turns
+    for name in tracked:
+        initial["left_" + name] = len(stacks[name])
+        initial["used_" + name] = 0
+
+    fields = list(initial)
+    row = {key: i for i, key in enumerate(fields)}
+    state = np.array([initial[key] for key in fields], dtype=np.float32)[:, None].repeat(n, axis=1)
+    result = state.copy()
+    winner = np.full(n, TIMEOUT, dtype=np.int8)
+    turns = np.zeros(n, dtype=np.int64)
+    idx = np.arange(n)
+
+    lvl_mult = 1 + player._lvl / 10
+    max_hp = player._max_hp
+    enemy_max_hp = enemy._max_hp
+    reward = enemy._reward_coins
+
+    def take_bonus(s, name, mask):
+        left = s[row["left_" + name]]
+        values = stacks[name][np.clip(left - 1, 0, None).astype(np.int64)] if len(stacks[name]) else 0.0
+        left -= mask
+        s[row["used_" + name]] += mask
+        return mask * values
+
+    def buy(s, name, mask):
+        coins = s[row["coins"]]
+        mask = mask & (coins >= BONUS_PRICES[name])
+        coins -= mask * BONUS_PRICES[name]
+        size = len(mask)
+        if name == "Medkit":
+            values = rng.integers(10, 41, size=size, dtype=np.int32)
+        elif name == "Rage":
+            values = 1.0 + rng.random(size, dtype=np.float32)
+        else:
+            values = 0.1 + rng.random(size, dtype=np.float32) * 0.9
+        return mask, mask * values
+
+    turn = 0
+    while turn < max_turns and len(idx):
+        s = state
+        m = len(idx)
+
+        php = s[row["player_hp"]]
+        if any(s[row[name]].any() for name in statuses):
+            for name in statuses:
+                left_turns = s[row[name]]
+                ticking = left_turns > 0
+                php -= ticking * (s[row["status_" + name]] * lvl_mult)
+                left_turns -= ticking
+            np.maximum(php, 0.0, out=php)
+
+        pending = np.ones(m, dtype=bool)
+        if "Medkit" in tracked:
+            need = php < max_hp * policy.heal_below
+            from_inv = need & (s[row["left_Medkit"]] > 0)
+            heal = take_bonus(s, "Medkit", from_inv)
+            if "Medkit" in policy.auto_buy:
+                bought, bought_heal = buy(s, "Medkit", need & ~from_inv)
+                heal += bought_heal
+                from_inv |= bought
+            np.minimum(php + heal, max_hp, out=php)
+            pending &= ~from_inv
+        if ammo_bonus in tracked:
+            need = pending & (s[row["ammo"]] < consumption) & (s[row["left_" + ammo_bonus]] > 0)
+            s[row["ammo"]] += take_bonus(s, ammo_bonus, need)
+            pending &= ~need
+        if turn == 0 and policy.boost_first_turn and (melee or ranged):
+            boost = "Rage" if melee else "Accuracy"
+            target = s[row["rage"] if melee else row["accuracy"]]
+            has = pending & (s[row["left_" + boost]] > 0)
+            target += take_bonus(s, boost, has)
+            if boost in policy.auto_buy:
+                target += buy(s, boost, pending & ~has)[1]
+
+        raw = rng.integers(0, max_dmg + 1, size=m, dtype=np.int32)
+        if isinstance(weapon, Stick):
+            durability = s[row["durability"]]
+            hits = durability > 0
+            durability -= hits
+            dmg = hits * (raw * s[row["rage"]])
+        elif melee or weapon is None:
+            dmg = raw * s[row["rage"]]
+        else:
+            ammo = s[row["ammo"]]
+            hits = ammo >= consumption
+            ammo -= hits * consumption
+            dmg = hits * (raw * s[row["accuracy"]])
+        ehp = s[row["enemy_hp"]]
+        ehp -= dmg
+
+        outcome = np.full(m, TIMEOUT, dtype=np.int8)
+        killed = ehp <= 0
+        s[row["coins"]] += killed * reward
+        outcome[killed] = WIN
+        fighting = ~killed
+
+        if proc_status:
+            procs = fighting & (rng.random(m, dtype=np.float32) < proc_chance)
+            s[row["status_" + proc_status]][procs] = proc_base
+            s[row[proc_status]][procs] = proc_turns
+        if flee_chance:
+            low = np.flatnonzero(fighting & (ehp < enemy_max_hp * flee_threshold))
+            fled = low[rng.random(len(low), dtype=np.float32) < flee_chance]
+            outcome[fled] = FLED
+            fighting[fled] = False
+
+        hit = rng.integers(0, enemy_dmg + 1, size=m, dtype=np.int32)
+        hit *= fighting
+        php -= hit
+        dead = php <= 0
+        outcome[dead] = LOSS
+        fighting &= ~dead
+
+        if not fighting.all():
+            done = ~fighting
+            finished = idx[done]
+            result[:, finished] = s[:, done]
+            winner[finished] = outcome[done]
+            turns[finished] = turn + 1
+            idx = idx[fighting]
+            state = s[:, fighting]
+        turn += 1
+
+    result[:, idx] = state
+    turns[idx] = turn
+    winner[result[row["player_hp"]] <= 0] = LOSS
+
+    out = {"winner": winner, "turns": turns}
+    for key in ("coins", "ammo", "durability"):
+        out[key] = result[row[key]].astype(np.int64)
+    for key in ("player_hp", "enemy_hp"):
+        out[key] = np.maximum(result[row[key]], 0.0).astype(np.float64)
+    for key in ("rage", "accuracy"):
+        out[key] = result[row[key]].astype(np.float64)
+    for name in ("infection", "poison"):
+        out[name] = result[row[name]].astype(np.int64) if name in row else np.zeros(n, dtype=np.int64)
+    for name in BONUS_TYPES:
+        key = "used_" + name
+        out[key] = result[row[key]].astype(np.int64) if key in row else np.zeros(n, dtype=np.int64)
+    return out
+
+
+def summarize(result):
+    winner = result["winner"]
+    return {
+        "battles": len(winner),
+        "win_rate": float(np.mean(winner == WIN)),
+        "loss_rate": float(np.mean(winner == LOSS)),
+        "fled_rate": float(np.mean(winner == FLED)),
+        "mean_turns": float(np.mean(result["turns"])),
+        "mean_hp_left": float(np.mean(result["player_hp"])),
+        "mean_coins": float(np.mean(result["coins"])),
+    }
+
+
+def _interactive_battles(player_factory, enemy_factory, n):
+    import builtins
+    import contextlib
+    import io
+    from game import start_battle
+    from classes import Board
+
+    board = Board(1, 1)
+    real_input = builtins.input
+    builtins.input = lambda *args: "n"
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(n):
+                start_battle(player_factory(), enemy_factory(), board)
+    finally:
+        builtins.input = real_input
+
+
+if __name__ == "__main__":
+    import time
+
+    def make_player():
+        return Player(lvl=1, position=(0, 0))
+
+    def make_enemy():
+        return Rat(lvl=3, position=(0, 0))
+
+    n = 200_000
+    t0 = time.perf_counter()
+    result = simulate_battles(make_player(), make_enemy(), n, rng=0)
+    vectorized = time.perf_counter() - t0
+    print(summarize(result))
+
+    k = 5_000
+    t0 = time.perf_counter()
+    _interactive_battles(make_player, make_enemy, k)
+    interactive = (time.perf_counter() - t0) / k * n
+
+    print(f"vectorized: {vectorized:.3f}s, interactive (extrapolated): {interactive:.3f}s, "
+          f"speedup x{interactive / vectorized:.0f}")
@@ -0,0 +1,331 @@
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import game
+from array_board import ArrayBoard
+from classes import Board, Player, Rat, Spider, Skeleton, Tower
+from fog import FogOfWar
+from rng import GameRng, using
+from save import load, save_game, load_game
+
+
+DIFFICULTY_PATH = "difficulty.json"
+BASELINE_PATH = "bench_baseline.json"
+SIZES = (5, 50, 200, 1000, 2000)
+MIN_TIME = 0.5
+MAX_TIME = 5.0
+BATCH_TIME = 0.001
+MIN_BATCHES = 5
+REFERENCE_REPEAT = 3
+TOLERANCE = 0.25
+RETRIES = 3
+TOWER_CALLS = 100
+BATTLES = 50
+BOARDS = {"board": Board, "array": ArrayBoard}
+
+
+class _NullOutput:
+
+    def write(self, text: str):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _answer_all(steps, answer: str = "n"):
+    try:
+        next(steps)
+        while True:
+            steps.send(answer)
+    except StopIteration:
+        pass
+
+
+def _create_level(difficulty: str):
+    def setup(level, size, settings):
+        return lambda: game.create_level(difficulty, board_cls=type(level[0]), size=(size, size),
+                                         settings=settings[difficulty], rng=GameRng(size))
+    return setup
+
+
+def _render(level, size, settings):
+    board, player = level
+    board = board.snapshot()
+    board._fog = FogOfWar.from_rows(size, size, [(1 << size) - 1] * size)
+    return lambda: board.render(player)
+
+
+def _to_dict(level, size, settings):
+    board = level[0]
+    return board.to_dict
+
+
+def _from_dict(level, size, settings):
+    data = level[0].to_dict()
+    return lambda: type(level[0]).from_dict(data)
+
+
+def _save_game(level, size, settings):
+    board, player = level
+    return lambda: save_game(player, board, 1, "normal")
+
+
+def _load_game(level, size, settings):
+    board, player = level
+    save_game(player, board, 1, "normal")
+    return load_game
+
+
+def _tower_interact(level, size, settings):
+    board = level[0].snapshot()
+    rng = GameRng(size)
+    positions = [(rng.randrange(size), rng.randrange(size)) for _ in range(TOWER_CALLS)]
+    tower = Tower()
+
+    def run():
+        board._fog = FogOfWar(size, size)
+        for pos in positions:
+            tower.interact(board, pos)
+    return run, TOWER_CALLS
+
+
+def _battle(level, size, settings):
+    board = level[0].snapshot()
+    enemies = (Rat, Spider, Skeleton)
+
+    def run():
+        with using(GameRng(0)):
+            for i in range(BATTLES):
+                player = Player(lvl=1, position=(0, 0))
+                enemy = enemies[i % len(enemies)](lvl=1 + i % 3, position=(0, 0))
+                _answer_all(game.battle_steps(player, enemy, board))
+    return run, BATTLES
+
+
+BENCHMARKS = {
+    "create_level.easy": _create_level("easy"),
+    "create_level.normal": _create_level("normal"),
+    "create_level.hard": _create_level("hard"),
+    "render": _render,
+    "to_dict": _to_dict,
+    "from_dict": _from_dict,
+    "save_game": _save_game,
+    "load_game": _load_game,
+    "tower_interact": _tower_interact,
+    "battle": _battle,
+}
+
+
+def _reference_work():
+    cells = {}
+    for i in range(5000):
+        cells[(i % 100, i // 100)] = i
+    return sum(value for value in cells.values() if value & 1)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _reference(repeat: int = REFERENCE_REPEAT):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return min(_timed(_reference_work) for _ in range(repeat))
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _batch(run, number: int):
+    t0 = time.perf_counter()
+    for _ in range(number):
+        run()
+    return time.perf_counter() - t0
+
+
+def _calibrate(run):
+    number = 1
+    while True:
+        elapsed = _batch(run, number)
+        if elapsed >= BATCH_TIME or number >= 10 ** 6:
+            return number, elapsed
+        number *= 10
+
+
+def measure_all(benches: dict, min_time: float = MIN_TIME, min_batches: int = MIN_BATCHES):
+    state = {}
+    for key, (run, ops) in benches.items():
+        number, elapsed = _calibrate(run)
+        state[key] = {"number": number, "times": [elapsed / number], "references": [_reference()], "total": elapsed}
+    while True:
+        pending = [key for key, s in state.items()
+                   if s["total"] < min_time or (len(s["times"]) < min_batches and s["total"] < MAX_TIME)]
+        if not pending:
+            break
+        for key in pending:
+            s = state[key]
+            elapsed = _batch(benches[key][0], s["number"])
+            s["times"].append(elapsed / s["number"])
+            s["references"].append(_reference())
+            s["total"] += elapsed
+    results = {}
+    for key, s in state.items():
+        ops = benches[key][1]
+        results[key] = {
+            "best": min(s["times"]) / ops,
+            "median": statistics.median(s["times"]) / ops,
+            "runs": len(s["times"]) * s["number"],
+            "reference": min(s["references"])
+        }
+    return results
+
+
+def measure(run, ops: int = 1, min_time: float = MIN_TIME, min_batches: int = MIN_BATCHES):
+    return measure_all({None: (run, ops)}, min_time, min_batches)[None]
+
+
+def run_suite(sizes=SIZES, names=None, min_time: float = MIN_TIME, board: str = "board"):
+    settings = load(DIFFICULTY_PATH)
+    names = names or list(BENCHMARKS)
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(_NullOutput()):
+        os.chdir(tmp)
+        try:
+            for size in sizes:
+                with using(GameRng(0)):
+                    level = game.create_level("normal", board_cls=BOARDS[board], size=(size, size),
+                                              settings=settings["normal"])
+                benches = {}
+                for name in names:
+                    bench = BENCHMARKS[name](level, size, settings)
+                    key = f"{name}@{size}" if board == "board" else f"{name}@{size}/{board}"
+                    benches[key] = bench if isinstance(bench, tuple) else (bench, 1)
+                for key, result in measure_all(benches, min_time).items():
+                    results[key] = result
+                    sys.stderr.write(f"{key}: {result['best'] * 1e3:.3f} мс\n")
+                level = benches = None
+        finally:
+            os.chdir(cwd)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "board": board,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+
+
+def speed(report: dict, baseline: dict):
+    keys = [key for key in report["results"] if "reference" in baseline["results"].get(key, {})]
+    if not keys:
+        return 1.0
+    return (statistics.median(report["results"][key]["reference"] for key in keys)
+            / statistics.median(baseline["results"][key]["reference"] for key in keys))
+
+
+def compare(report: dict, baseline: dict, tolerance: float = TOLERANCE):
+    regressions = []
+    scale = speed(report, baseline)
+    for key, result in report["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = result["best"] / (base["best"] * scale) if base["best"] else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append((key, base["best"], result["best"], ratio))
+    return regressions
+
+
+def remeasure(report: dict, keys, min_time: float = MIN_TIME, board: str = "board"):
+    by_size = {}
+    for key in keys:
+        name, size = key.split("/")[0].rsplit("@", 1)
+        by_size.setdefault(int(size), []).append(name)
+    for size, names in by_size.items():
+        for key, result in run_suite((size,), names, min_time, board)["results"].items():
+            if result["best"] < report["results"][key]["best"]:
+                report["results"][key] = result
+    return report
+
+
+def _write_report(report: dict, output: str = None):
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def _option(argv, flag: str, default=None):
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
+
+def main(argv):
+    sizes = tuple(int(size) for size in _option(argv, "--sizes", ",".join(map(str, SIZES))).split(","))
+    names = _option(argv, "--only")
+    names = names.split(",") if names else None
+    if names and any(name not in BENCHMARKS for name in names):
+        print(f"Неизвестный бенчмарк. Доступны: {', '.join(BENCHMARKS)}")
+        return 2
+    board = _option(argv, "--board", "board")
+    if board not in BOARDS:
+        print(f"Неизвестное поле. Доступны: {', '.join(BOARDS)}")
+        return 2
+    min_time = float(_option(argv, "--min-time", MIN_TIME))
+    tolerance = float(_option(argv, "--tolerance", TOLERANCE))
+    retries = int(_option(argv, "--retries", RETRIES))
+    baseline_path = _option(argv, "--baseline", BASELINE_PATH)
+    output = _option(argv, "--json")
+
+    report = run_suite(sizes, names, min_time, board)
+
+    if "--save-baseline" in argv:
+        _write_report(report, output)
+        baseline = load(baseline_path) or {"results": {}}
+        baseline["meta"] = report["meta"]
+        baseline["results"].update(report["results"])
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        return 0
+
+    baseline = load(baseline_path)
+    if baseline is None:
+        _write_report(report, output)
+        sys.stderr.write(f"Базовые результаты {baseline_path} не найдены, сравнение пропущено.\n")
+        return 0
+    regressions = compare(report, baseline, tolerance)
+    for attempt in range(retries):
+        if not regressions:
+            break
+        sys.stderr.write(f"Перепроверка: {', '.join(key for key, *_ in regressions)}\n")
+        remeasure(report, [key for key, *_ in regressions], min_time * 2 ** (attempt + 1), board)
+        regressions = compare(report, baseline, tolerance)
+    _write_report(report, output)
+    for key, base, best, ratio in regressions:
+        sys.stderr.write(f"Регрессия {key}: {base * 1e3:.3f} мс -> {best * 1e3:.3f} мс (x{ratio:.2f})\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
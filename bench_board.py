@@ -0,0 +1,61 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from classes import Board, Tower, Medkit, Coins, Rat
+from array_board import ArrayBoard
+
+
+def build(board_cls, size: int, density: float, seed: int = 0):
+    rng = random.Random(seed)
+    board = board_cls(size, size)
+    kinds = [Tower, Medkit, Coins, Rat]
+    for r in range(size):
+        for c in range(size):
+            board.reveal((r, c))
+    for i in range(int(size * size * density)):
+        pos = (rng.randrange(size), rng.randrange(size))
+        kind = rng.choice(kinds)
+        board.place(kind(pos) if kind is not Rat else Rat(1, pos), pos)
+    return board
+
+
+def measure_memory(board_cls, size: int, density: float):
+    tracemalloc.start()
+    board = build(board_cls, size, density)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return board, current
+
+
+def measure_ops(board, size: int, n: int = 200_000):
+    rng = random.Random(1)
+    positions = [(rng.randrange(size), rng.randrange(size)) for i in range(n)]
+    results = {}
+    for name, op in [("entity_at", board.entity_at), ("is_revealed", board.is_revealed),
+                     ("reveal", board.reveal), ("in_bounds", board.in_bounds)]:
+        t0 = time.perf_counter()
+        for pos in positions:
+            op(pos)
+        results[name] = (time.perf_counter() - t0) / n * 1e9
+    t0 = time.perf_counter()
+    for pos in positions:
+        board.place(None, pos)
+    results["place"] = (time.perf_counter() - t0) / n * 1e9
+    return results
+
+
+def main(sizes=(100, 1000), densities=(0.0, 0.3)):
+    for size in sizes:
+        for density, board_cls in [(d, cls) for d in densities for cls in (Board, ArrayBoard)]:
+            board, memory = measure_memory(board_cls, size, density)
+            ops = measure_ops(board, size)
+            ops_text = ", ".join(f"{name} {ns:.0f} ns" for name, ns in ops.items())
+            print(f"{board_cls.__name__:>10} {size}x{size} density {density}: "
+                  f"{memory / 2**20:8.1f} MiB | {ops_text}")
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (100, 1000)
+    main(sizes)
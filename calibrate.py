@@ -0,0 +1,221 @@
+import builtins
+import contextlib
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+import game
+from classes import Fist
+from pathfinding import PathFinder, DIRECTIONS
+from rng import GameRng, using
+from save import load
+
+
+DIFFICULTY_PATH = "difficulty.json"
+TARGET_SURVIVAL = {"easy": 0.9, "normal": 0.6, "hard": 0.3}
+MAX_LEVELS = 5
+MAX_TURNS = 2000
+Z = 1.96
+
+_create_level = game.create_level
+
+
+class RunOver(Exception):
+    pass
+
+
+class ScriptedPolicy:
+
+    def __init__(self, settings: dict, max_levels: int = MAX_LEVELS, max_turns: int = MAX_TURNS,
+                 heal_below: float = 0.5):
+        self._settings = settings
+        self._max_levels = max_levels
+        self._max_turns = max_turns
+        self._heal_below = heal_below
+        self._finder = None
+        self._using_bonus = False
+        self.board = None
+        self.player = None
+        self.levels = 0
+        self.turns = 0
+        self.coins = []
+
+    def create_level(self, difficulty: str, player_lvl: int = 1, **kwargs):
+        if self.player is not None:
+            self.levels += 1
+            self.coins.append(self.player._coins)
+            if self.levels >= self._max_levels:
+                raise RunOver
+        if kwargs.get("settings") is None:
+            kwargs["settings"] = self._settings
+        self.board, self.player = _create_level(difficulty, player_lvl, **kwargs)
+        if self._finder:
+            self._finder.close()
+        self._finder = PathFinder(self.board)
+        return self.board, self.player
+
+    def __call__(self, prompt: str = ""):
+        player = self.player
+        if prompt.startswith("Ваш ход"):
+            self.turns += 1
+            if self.turns > self._max_turns:
+                raise RunOver
+            r, c = player.position
+            step = self._finder.next_step(player.position)
+            return DIRECTIONS[(step[0] - r, step[1] - c)]
+        if prompt.startswith("Использовать бонус"):
+            self._using_bonus = bool(player._inventory["Medkit"]) and player._hp < player._max_hp * self._heal_below
+            return "y" if self._using_bonus else "n"
+        if not prompt and self._using_bonus:
+            self._using_bonus = False
+            return "Medkit"
+        if not prompt:
+            weapon = player._weapon
+            return "y" if isinstance(weapon, Fist) or not weapon.is_available() else "n"
+        return "n"
+
+
+@contextlib.contextmanager
+def _headless(policy: ScriptedPolicy):
+    saved = (builtins.input, game.create_level, game.save_game, game.save_record, game.load_record)
+    builtins.input = policy
+    game.create_level = policy.create_level
+    game.save_game = lambda *args, **kwargs: None
+    game.save_record = lambda *args: None
+    game.load_record = lambda: (0, 0)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input, game.create_level, game.save_game, game.save_record, game.load_record = saved
+
+
+def play_run(difficulty: str, settings: dict, seed: int, max_levels: int = MAX_LEVELS,
+             max_turns: int = MAX_TURNS):
+    policy = ScriptedPolicy(settings, max_levels, max_turns)
+    with _headless(policy), using(GameRng(seed)):
+        board, player = policy.create_level(difficulty, 1)
+        try:
+            game.game(board, player, 1, difficulty, settings=settings)
+        except RunOver:
+            pass
+    return {
+        "levels": policy.levels,
+        "survived": policy.levels >= max_levels,
+        "turns": policy.turns,
+        "coins": policy.coins
+    }
+
+
+def _run_batch(task):
+    difficulty, settings, seeds, max_levels, max_turns = task
+    return [play_run(difficulty, settings, seed, max_levels, max_turns) for seed in seeds]
+
+
+def wilson(successes: int, n: int, z: float = Z):
+    if n == 0:
+        return 0.0, 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return p, max(0.0, center - half), min(1.0, center + half)
+
+
+def mean_ci(values, z: float = Z):
+    if not values:
+        return 0.0, 0.0
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, z * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def summarize(results, max_levels: int = MAX_LEVELS):
+    survived = sum(result["survived"] for result in results)
+    curve = []
+    for level in range(max_levels):
+        coins = [result["coins"][level] for result in results if len(result["coins"]) > level]
+        mean, half = mean_ci(coins)
+        curve.append({"level": level + 1, "runs": len(coins), "coins": mean, "ci": half})
+    levels, levels_ci = mean_ci([result["levels"] for result in results])
+    turns, turns_ci = mean_ci([result["turns"] for result in results])
+    return {
+        "runs": len(results),
+        "survival": wilson(survived, len(results)),
+        "levels": (levels, levels_ci),
+        "turns": (turns, turns_ci),
+        "coins": curve
+    }
+
+
+def run_many(pool: Pool, difficulty: str, settings: dict, runs: int, seed: int = 0,
+             max_levels: int = MAX_LEVELS, max_turns: int = MAX_TURNS):
+    chunk = max(1, runs // ((os.cpu_count() or 1) * 4))
+    tasks = [(difficulty, settings, range(start, min(start + chunk, seed + runs)), max_levels, max_turns)
+             for start in range(seed, seed + runs, chunk)]
+    results = [result for batch in pool.imap_unordered(_run_batch, tasks) for result in batch]
+    return summarize(results, max_levels)
+
+
+def scaled(settings: dict, pressure: float):
+    result = dict(settings)
+    result["enemy_multiplier"] = round(settings["enemy_multiplier"] * pressure, 4)
+    for key in ("bonus_multiplier", "weapon_multiplier", "tower_multiplier"):
+        result[key] = round(settings[key] / pressure, 4)
+    return result
+
+
+def search(pool: Pool, difficulty: str, settings: dict, target: float, budget: int, steps: int = 8):
+    runs = max(1, budget // steps)
+    lo, hi = math.log(0.25), math.log(4.0)
+    best = None
+    for step in range(steps):
+        mid = (lo + hi) / 2
+        candidate = scaled(settings, math.exp(mid))
+        stats = run_many(pool, difficulty, candidate, runs)
+        survival = stats["survival"][0]
+        if best is None or abs(survival - target) < abs(best[1]["survival"][0] - target):
+            best = (candidate, stats)
+        if survival > target:
+            lo = mid
+        else:
+            hi = mid
+    return best
+
+
+def report(difficulty: str, stats: dict):
+    p, low, high = stats["survival"]
+    levels, levels_ci = stats["levels"]
+    curve = ", ".join(f"{point['coins']:.0f}±{point['ci']:.0f}" for point in stats["coins"] if point["runs"])
+    print(f"{difficulty}: забегов {stats['runs']}, выживание {p:.3f} [{low:.3f}; {high:.3f}], "
+          f"уровней {levels:.2f}±{levels_ci:.2f}, монеты по уровням: {curve or '-'}")
+
+
+def main(argv):
+    runs = int(argv[0]) if argv and argv[0].isdigit() else 1000
+    settings = load(DIFFICULTY_PATH)
+    found = {}
+    with Pool(os.cpu_count()) as pool:
+        for difficulty, base in settings.items():
+            t0 = time.perf_counter()
+            report(difficulty, run_many(pool, difficulty, base, runs))
+            if "--search" in argv:
+                candidate, stats = search(pool, difficulty, base, TARGET_SURVIVAL[difficulty], runs)
+                found[difficulty] = candidate
+                print(f"  цель {TARGET_SURVIVAL[difficulty]:.2f}: "
+                      + ", ".join(f"{key}={candidate[key]}" for key in candidate if key.endswith("_multiplier")))
+                report("  " + difficulty, stats)
+            print(f"  {time.perf_counter() - t0:.1f} с")
+    if found and "--write" in argv:
+        with open(DIFFICULTY_PATH, "w", encoding="utf-8") as file:
+            json.dump({**settings, **found}, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
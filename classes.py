@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
-from random import randint, random, choice
+from typing import TYPE_CHECKING
+
+from fog import FogOfWar
+from instrument import timed
+from rng import GameRng, using, randint, random, randoms, choice
+from spatial import SpatialIndex
+from status import StatusEffects
+
+if TYPE_CHECKING:
+    from battle_group import EnemyGroup
 
 
 CLASS_REGISTRY = {}
@@ -9,6 +18,7 @@ def register_class(cls):
     return cls
 
 class Entity(ABC):
+    __slots__ = ("_position",)
 
     def __init__(self, position: tuple[int, int]):
         self._position = position
@@ -23,6 +33,7 @@ class Entity(ABC):
 
 
 class Damageable(ABC):
+    __slots__ = ()
 
     def __init__(self, hp: float, max_hp: float):
         self._hp = hp
@@ -41,14 +52,32 @@ class Damageable(ABC):
         self._hp -= damage
         return damage
 
+    def status_scale(self):
+        return 1.0
+
+    def apply_status(self, name: str, dmg: float, turns: int, rule: str = None):
+        if self._statuses is None:
+            self._statuses = StatusEffects()
+        self._statuses.apply(name, dmg, turns, rule)
+
+    def tick_statuses(self):
+        if not self._statuses:
+            return 0.0, []
+        return self._statuses.tick(self, self.status_scale())
+
+    def has_status(self):
+        return bool(self._statuses)
+
 
 class Attacker(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def attack(self, target: Damageable):
         pass
 
 class Weapon(Entity):
+    __slots__ = ("_name", "_max_damage")
 
     def __init__(self, name: str, max_damage: float, position: tuple[int, int]):
         Entity.__init__(self, position)
@@ -67,6 +96,7 @@ class Weapon(Entity):
     
 
 class MeleeWeapon(Weapon):
+    __slots__ = ()
 
     def damage(self, rage: float):
         return self.roll_damage() * rage
@@ -84,7 +114,8 @@ class MeleeWeapon(Weapon):
 
 
 class RangedWeapon(Weapon):
-    
+    __slots__ = ("_ammo", "_ammo_consumption")
+
     def __init__(self, name:str, max_damage: float, ammo: int, position: tuple):
         super().__init__(name, max_damage, position)
         self._ammo = ammo
@@ -118,6 +149,7 @@ class RangedWeapon(Weapon):
 
 
 class Fist(MeleeWeapon):
+    __slots__ = ()
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(name="Кулак", max_damage=20, position=position)
@@ -138,6 +170,7 @@ CLASS_REGISTRY["Fist"] = Fist
 
 
 class Stick(MeleeWeapon):
+    __slots__ = ("_durability",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(name="Палка", max_damage = 25, position=position)
@@ -166,7 +199,7 @@ CLASS_REGISTRY["Stick"] = Stick
 
 
 class Bow(RangedWeapon):
-
+    __slots__ = ()
 
     def __init__(self, position):
         ammo = randint(10, 15)
@@ -184,6 +217,7 @@ class Bow(RangedWeapon):
 CLASS_REGISTRY["Bow"] = Bow
 
 class Revolver(RangedWeapon):
+    __slots__ = ()
 
     def __init__(self, position: tuple[int, int]):
         ammo = randint(5, 10)
@@ -203,7 +237,7 @@ CLASS_REGISTRY["Revolver"]=Revolver
 
 
 class Bonus(Entity):
-
+    __slots__ = ()
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -217,6 +251,7 @@ class Bonus(Entity):
 
 
 class Medkit(Bonus):
+    __slots__ = ("_power",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -246,6 +281,7 @@ CLASS_REGISTRY["medkit"] = Medkit
 
 
 class Rage(Bonus):
+    __slots__ = ("_multiplier",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -275,6 +311,7 @@ CLASS_REGISTRY["rage"] = Rage
 
 
 class Arrows(Bonus):
+    __slots__ = ("_amount",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -305,6 +342,7 @@ CLASS_REGISTRY["arrows"] = Arrows
 
 
 class Bullets(Bonus):
+    __slots__ = ("_amount",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -333,6 +371,7 @@ class Bullets(Bonus):
 CLASS_REGISTRY["bullets"] = Bullets
 
 class Accuracy(Bonus):
+    __slots__ = ("_multiplier",)
 
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
@@ -363,6 +402,8 @@ CLASS_REGISTRY["accuracy"] = Accuracy
 
 
 class Coins(Bonus):
+    __slots__ = ("_amount",)
+
     def __init__(self, position: tuple[int, int]):
         super().__init__(position)
         self._amount = randint(50, 100)
@@ -387,11 +428,13 @@ class Coins(Bonus):
 CLASS_REGISTRY["coins"] = Coins
 
 class Structure(Entity):
+    __slots__ = ()
+
     def __init__(self, position: tuple[int, int]):
         super().__init__(position )
 
     @abstractmethod
-    def interact(self, player: 'Player', board: 'Board'):
+    def interact(self, board: 'Board', position: tuple[int, int] = None):
         pass
 
     def symbol(self):
@@ -399,34 +442,39 @@ class Structure(Entity):
 
 
 class Tower(Structure):
+    __slots__ = ()
+    _reveal_radius = 2
+    _shared = None
 
-    def __init__(self, position: tuple[int, int]):
-        super().__init__(position)
-        self._reveal_radius = 2
-
-    def interact(self, board: 'Board'):
-        r, c = self._position
-        for dr in range(-self._reveal_radius, self._reveal_radius + 1):
-            for dc in range(-self._reveal_radius, self._reveal_radius + 1):
-                nr, nc = r + dr, c + dc
-                if board.in_bounds((nr, nc)):
-                    board.reveal((nr, nc))
+    def __new__(cls, position: tuple[int, int] = None):
+        if cls._shared is None:
+            cls._shared = super().__new__(cls)
+        return cls._shared
+
+    def __init__(self, position: tuple[int, int] = None):
+        pass
+
+    @property
+    def position(self):
+        return None
+
+    def interact(self, board: 'Board', position: tuple[int, int] = None):
+        board.reveal_area(board.visited() if position is None else position, self._reveal_radius)
         print("Башня открыла окрестности!")
 
     def to_dict(self):
         return{
-            "class": "tower",
-            "position": self.position
+            "class": "tower"
         }
     
     @classmethod
     def from_dict(cls, data):
-        instance = cls(position=tuple(data["position"]))
-        return instance
+        return cls()
 
 CLASS_REGISTRY["tower"] = Tower
 
 class Enemy(Entity, Damageable, Attacker):
+    __slots__ = ("_hp", "_max_hp", "_lvl", "_max_enemy_damage", "_reward_coins", "_statuses")
 
     def __init__(self, lvl: int, max_hp: float, max_damage: float, reward_coins: int, position: tuple[int, int]):
         Entity.__init__(self, position)
@@ -434,6 +482,10 @@ class Enemy(Entity, Damageable, Attacker):
         self._lvl = lvl
         self._max_enemy_damage = max_damage
         self._reward_coins = reward_coins
+        self._statuses = None
+
+    def status_scale(self):
+        return 1 + self._lvl / 10
 
     def roll_enemy_damage(self):
         return randint(0, int(self._max_enemy_damage))
@@ -447,21 +499,26 @@ class Enemy(Entity, Damageable, Attacker):
     def before_turn(self, player: 'Player'):
         pass
 
+    @classmethod
+    def before_turn_batch(cls, group: 'EnemyGroup', rows: list, player: 'Player'):
+        pass
+
     def symbol(self):
         return "E"
 
 
 class Rat(Enemy):
+    __slots__ = ()
+    _infection_chance = 0.25
+    _flee_chance_low_hp = 0.10
+    _flee_threshold = 0.15
+    _infection_damage_base = 5.0
+    _infection_turns = 3
 
     def __init__(self, lvl: int, position: tuple[int, int]):
         hp = 100 * (1 + lvl / 10)
         max_dmg = 15 * (1 + lvl / 10)
         super().__init__(lvl, hp, max_dmg, 200, position)
-        self._infection_chance = 0.25
-        self._flee_chance_low_hp = 0.10
-        self._flee_threshold = 0.15
-        self._infection_damage_base = 5.0
-        self._infection_turns = 3
 
     def before_turn(self, player: 'Player'):
         if random() < self._infection_chance:
@@ -470,6 +527,19 @@ class Rat(Enemy):
             print("Крыса сбежала!")
             player.end_fight()
 
+    @classmethod
+    def before_turn_batch(cls, group: 'EnemyGroup', rows: list, player: 'Player'):
+        for roll in randoms(len(rows)):
+            if roll < cls._infection_chance:
+                player.apply_status("infection", cls._infection_damage_base, cls._infection_turns)
+        low = group.below(rows, cls._flee_threshold)
+        if not low:
+            return
+        for row, roll in zip(low, randoms(len(low))):
+            if roll < cls._flee_chance_low_hp:
+                print("Крыса сбежала!")
+                group.flee(row)
+
     def to_dict(self):
         return {
             "class": "Rat",
@@ -486,16 +556,17 @@ class Rat(Enemy):
 CLASS_REGISTRY["Rat"] = Rat
 
 class Spider(Enemy):
+    __slots__ = ()
+    _poison_chance = 0.10
+    _poison_damage_base = 15.0
+    _poison_turns = 2
+    _summon_chance_low_hp = 0.10
+    _call_threshold = 0.15
 
     def __init__(self, lvl: int, position: tuple[int, int]):
         hp = 100*(1+lvl/10)
         max_dmg = 20*(1+lvl/10)
         super().__init__(lvl, hp, max_dmg, 250, position)
-        self._poison_chance = 0.10
-        self._poison_damage_base = 15.0
-        self._poison_turns = 2
-        self._summon_chance_low_hp =0.10
-        self._call_threshold = 0.15
 
     def before_turn(self, player: 'Player'):
         if random() < self._poison_chance:
@@ -503,6 +574,19 @@ class Spider(Enemy):
         if self._hp / self._max_hp < self._call_threshold and random() < self._summon_chance_low_hp:
             print("Паук призвал подкрепление!")
 
+    @classmethod
+    def before_turn_batch(cls, group: 'EnemyGroup', rows: list, player: 'Player'):
+        for roll in randoms(len(rows)):
+            if roll < cls._poison_chance:
+                player.apply_status("poison", cls._poison_damage_base, cls._poison_turns)
+        low = group.below(rows, cls._call_threshold)
+        if not low:
+            return
+        callers = [row for row, roll in zip(low, randoms(len(low))) if roll < cls._summon_chance_low_hp]
+        if callers:
+            print("Паук призвал подкрепление!" if len(callers) == 1 else f"Пауки призвали подкрепление: {len(callers)}!")
+            group.summon(callers)
+
     def to_dict(self):
         return {
             "class": "Spider",
@@ -520,12 +604,26 @@ CLASS_REGISTRY["Spider"] = Spider
 
 
 class Skeleton(Enemy):
+    __slots__ = ("_loot", "_loot_seed")
+    _weapon_types = (Fist, Stick, Bow, Revolver)
 
     def __init__(self, lvl: int, position: tuple[int, int]):
         hp = 100 * (1 + lvl / 10)
         max_dmg = 10 * (1 + lvl / 10)
         super().__init__(lvl, hp, max_dmg, 150, position)
-        self._weapon = choice([Fist(position), Stick(position), Bow(position), Revolver(position)])
+        self._loot = choice(self._weapon_types)
+        self._loot_seed = randint(0, 2 ** 31 - 1)
+
+    @property
+    def _weapon(self):
+        if isinstance(self._loot, type):
+            with using(GameRng(self._loot_seed)):
+                self._loot = self._loot(self._position)
+        return self._loot
+
+    @_weapon.setter
+    def _weapon(self, weapon: Weapon):
+        self._loot = weapon
 
     def attack(self, target):
         dmg = self._weapon.roll_damage()
@@ -560,6 +658,9 @@ CLASS_REGISTRY["Skeleton"] = Skeleton
 
 @register_class
 class Player(Entity, Damageable, Attacker):
+    __slots__ = ("_hp", "_max_hp", "_lvl", "_weapon", "_inventory", "_coins",
+                 "_rage", "_accuracy", "_statuses", "_fight")
+
     def __init__(self, lvl: int, position: tuple[int, int]):
         Entity.__init__(self, position)
         max_hp = 150 * (1 + lvl / 10)
@@ -573,7 +674,7 @@ class Player(Entity, Damageable, Attacker):
 
         self._rage = 1.0
         self._accuracy = 1.0
-        self._statuses = {}
+        self._statuses = StatusEffects()
         self._fight = False
 
     def symbol(self):
@@ -585,6 +686,7 @@ class Player(Entity, Damageable, Attacker):
             print("Нельзя выйти за пределы поля!")
             return False
         self._position = new_pos
+        board.visit(new_pos)
 
 
     def attack(self, target: Damageable):
@@ -597,28 +699,27 @@ class Player(Entity, Damageable, Attacker):
         target.take_damage(dmg)
         return dmg
 
-    def choose_weapon(self, new_weapon: Weapon):
+    def offer_weapon(self, new_weapon: Weapon):
         print(f"Найдено оружие: {new_weapon._name}. Заменить? (y/n)")
-        if input().strip().lower() == 'y':
+
+    def accept_weapon(self, new_weapon: Weapon, answer: str):
+        if answer.strip().lower() == 'y':
             self._weapon = new_weapon
             print(f"Оружие заменено на {new_weapon._name}")
 
+    def choose_weapon(self, new_weapon: Weapon):
+        self.offer_weapon(new_weapon)
+        self.accept_weapon(new_weapon, input())
+
+    def status_scale(self):
+        return 1 + self._lvl / 10
+
     def apply_status_tick(self):
-        total_damage = 0.0
-        for status, (dmg, turns) in list(self._statuses.items()):
-            real_dmg = dmg * (1 + self._lvl / 10)
-            taken = self.take_damage(real_dmg)
-            total_damage += taken
-            if turns <= 1:
-                del self._statuses[status]
-                print(f"Статус {status} закончился")
-            else:
-                self._statuses[status] = (dmg, turns - 1)
+        total_damage, expired = self.tick_statuses()
+        for status in expired:
+            print(f"Статус {status} закончился")
         return total_damage
 
-    def apply_status(self, name: str, dmg: float, turns):
-        self._statuses[name] = (dmg, turns)
-
     def add_coins(self, amount: int):
         self._coins += amount
 
@@ -626,19 +727,26 @@ class Player(Entity, Damageable, Attacker):
         self._inventory[name].append(bonus)
         print(f"Бонус {name} добавлен в инвентарь")
 
-    def use_bonus(self):
+    def bonus_choices(self):
         available = [k for k, v in self._inventory.items() if v]
         if not available:
             print("Инвентарь пуст.")
-            return
-        print("Выберите бонус:", ", ".join(available))
-        choice_name = input().strip()
-        if choice_name in available:
+        else:
+            print("Выберите бонус:", ", ".join(available))
+        return available
+
+    def apply_bonus_choice(self, choice_name: str):
+        choice_name = choice_name.strip()
+        if self._inventory.get(choice_name):
             bonus = self._inventory[choice_name].pop()
             bonus.apply(self)
         else:
             print("Неверный выбор.")
 
+    def use_bonus(self):
+        if self.bonus_choices():
+            self.apply_bonus_choice(input())
+
     def buy_auto_if_needed(self, bonus_type: str):
         prices = {"Medkit": 75, "Rage": 50, "Accuracy": 50}
         if bonus_type not in prices:
@@ -662,9 +770,6 @@ class Player(Entity, Damageable, Attacker):
     def end_fight(self):
         self._fight = False
 
-    def has_status(self):
-        return len(self._statuses) > 0
-    
     def to_dict(self):
         weapon_data = self._weapon.to_dict() if self._weapon else None
         return {
@@ -678,7 +783,7 @@ class Player(Entity, Damageable, Attacker):
             "rage": round(self._rage, 2),
             "accuracy": round(self._accuracy, 2),
             "statuses": dict(self._statuses),
-            "inventory": {name: len(items) for name, items in self._inventory.items()},
+            "inventory": {name: [bonus.to_dict() for bonus in items] for name, items in self._inventory.items()},
             "fight": self._fight
         }
 
@@ -693,8 +798,11 @@ class Player(Entity, Damageable, Attacker):
         player._rage = data["rage"]
         player._accuracy = data["accuracy"]
         player._fight = data["fight"]
-        player._statuses = dict(data["statuses"]) if data["statuses"] else {}
+        player._statuses = StatusEffects(data["statuses"])
         player._inventory = {name: [] for name in ["Medkit", "Rage", "Arrows", "Bullets", "Accuracy"]}
+        for name, items in data["inventory"].items():
+            if isinstance(items, list):
+                player._inventory[name] = [load_object(item) for item in items]
         
         if data["weapon"]:
             player._weapon = load_object(data["weapon"])
@@ -705,47 +813,220 @@ class Player(Entity, Damageable, Attacker):
     
 CLASS_REGISTRY["Player"] = Player
 
+ENTITY_TYPES = [None, Tower, Player, Fist, Stick, Bow, Revolver,
+                Medkit, Rage, Arrows, Bullets, Accuracy, Coins, Rat, Spider, Skeleton]
+ENTITY_CODES = {cls: code for code, cls in enumerate(ENTITY_TYPES) if cls}
+OTHER_CODE = 255
+STATELESS_TYPES = {Tower}
+
+_decode_rng = GameRng(0)
+
+
+class RawCell:
+    __slots__ = ("cls", "data", "fmt", "decode")
+
+    def __init__(self, cls: type, data, fmt: str, decode):
+        self.cls = cls
+        self.data = data
+        self.fmt = fmt
+        self.decode = decode
+
+    def symbol(self):
+        return self.cls.symbol(None)
+
+    def build(self):
+        with using(_decode_rng):
+            return self.decode(self.cls, self.data)
+
+
+def cell_type(cell):
+    return cell.cls if type(cell) is RawCell else type(cell)
+
+
+def _decode_json(cls: type, data: dict):
+    return cls.from_dict(data)
+
+
+def json_cell(data: dict):
+    cls = CLASS_REGISTRY.get(data.get("class"))
+    if cls is None or cls in STATELESS_TYPES:
+        return load_object(data)
+    return RawCell(cls, data, "json", _decode_json)
+
+
 class Board:
+    _visited = None
+
     def __init__(self, rows: int, cols: int):
         self._rows = rows
         self._cols = cols
         self._grid = [
-            [(None, False) for i in range(cols)] for j in range(rows)
+            [None for i in range(cols)] for j in range(rows)
         ]
+        self._fog = FogOfWar(rows, cols)
         self._start = (0, 0)
         self._goal = (rows - 1, cols - 1)
+        self._watchers = []
+        self._changes = None
+        self._spatial = None
+        self._generation = None
+        self._delta = None
+
+    def watch(self):
+        changes = set()
+        self._watchers.append(changes)
+        return changes
+
+    def unwatch(self, changes: set):
+        self._watchers = [watcher for watcher in self._watchers if watcher is not changes]
+
+    def _changed(self, pos: tuple[int, int]):
+        for changes in self._watchers:
+            changes.add(pos)
+
+    def visit(self, pos: tuple[int, int]):
+        self._visited = pos
+
+    def visited(self):
+        return self._visited
+
+    def track_changes(self):
+        if self._changes is None:
+            self._changes = self.watch()
+
+    def pop_changes(self):
+        changes = set(self._changes or ())
+        if self._changes is not None:
+            self._changes.clear()
+        return changes
+
+    def track_generation(self, generation: dict):
+        self._generation = generation
+        self._delta = self.watch()
+
+    def generation(self):
+        return self._generation
+
+    def delta(self):
+        return sorted(self._delta) if self._delta is not None else None
+
+    def snapshot(self):
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._grid = [row[:] for row in self._grid]
+        board._fog = self._fog.copy()
+        board._watchers = []
+        board._changes = None
+        board._spatial = None
+        board._delta = set(self._delta) if self._delta is not None else None
+        return board
 
     def in_bounds(self, pos: tuple[int, int]):
         r, c = pos
         return 0 <= r < self._rows and 0 <= c < self._cols
 
-    def place(self, entity: Entity, pos: tuple[int, int]):
+    def place(self, entity: Entity, pos: tuple[int, int], reveal: bool = True):
         if self.in_bounds(pos):
-            self._grid[pos[0]][pos[1]] = (entity, True)
+            if self._spatial is not None:
+                old = self._grid[pos[0]][pos[1]]
+                self._spatial.move(cell_type(old) if old is not None else None,
+                                   type(entity) if entity is not None else None, pos)
+            self._grid[pos[0]][pos[1]] = entity
+            if reveal:
+                self._fog.reveal(pos)
+            if self._watchers:
+                self._changed(pos)
+
+    def place_batch(self, cls: type, indices, factory=None):
+        for index in indices:
+            pos = divmod(int(index), self._cols)
+            self.place(factory(cls, pos) if factory else cls(pos), pos)
 
     def entity_at(self, pos: tuple[int, int]):
         if self.in_bounds(pos):
-            return self._grid[pos[0]][pos[1]][0]
+            entity = self._grid[pos[0]][pos[1]]
+            if type(entity) is RawCell:
+                entity = self._grid[pos[0]][pos[1]] = entity.build()
+            return entity
         return None
 
+    def code_at(self, pos: tuple[int, int]):
+        if not self.in_bounds(pos):
+            return 0
+        entity = self._grid[pos[0]][pos[1]]
+        return 0 if entity is None else ENTITY_CODES.get(cell_type(entity), OTHER_CODE)
+
+    def codes(self):
+        get = ENTITY_CODES.get
+        return bytearray(0 if entity is None else get(type(entity)) or get(cell_type(entity), OTHER_CODE)
+                         for row in self._grid for entity in row)
+
+    def spatial(self):
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self._rows, self._cols, loader=self._cells_in)
+        return self._spatial
+
+    def _cells_in(self, top: int, left: int, bottom: int, right: int):
+        for r in range(top, bottom + 1):
+            for c, entity in enumerate(self._grid[r][left:right + 1], left):
+                if entity is not None:
+                    yield cell_type(entity), (r, c)
+
+    def nearest(self, cls: type, pos: tuple[int, int], revealed_only: bool = False, max_radius: int = None):
+        accept = self.is_revealed if revealed_only else None
+        return self.spatial().nearest(cls, pos, accept, max_radius)
+
+    def within(self, cls: type, pos: tuple[int, int], radius: int):
+        return self.spatial().within(cls, pos, radius)
+
+    def in_rect(self, cls: type, top: int, left: int, bottom: int, right: int):
+        return self.spatial().in_rect(cls, top, left, bottom, right)
+
     def is_revealed(self, pos: tuple[int, int]):
-        if self.in_bounds(pos):
-            return self._grid[pos[0]][pos[1]][1]
-        return False
+        return self._fog.is_revealed(pos)
 
     def reveal(self, pos: tuple[int, int]):
-        if self.in_bounds(pos):
-            self._grid[pos[0]][pos[1]] = (self._grid[pos[0]][pos[1]][0], True)
-
+        if self._fog.reveal(pos) and self._watchers:
+            self._changed(pos)
+
+    def reveal_area(self, pos: tuple[int, int], radius: int):
+        if not self._watchers:
+            return self._fog.reveal_area(pos, radius)
+        revealed = set()
+        added = self._fog.reveal_area(pos, radius, revealed)
+        for changes in self._watchers:
+            changes.update(revealed)
+        return added
+
+    def revealed_count(self):
+        return self._fog.count()
+
+    def revealed_bounds(self):
+        return self._fog.bounds()
+
+    def symbol_at(self, pos: tuple[int, int], player: 'Player'):
+        if not self.is_revealed(pos):
+            return "X"
+        if pos == player.position:
+            return "P"
+        entity = self._grid[pos[0]][pos[1]]
+        return " " if entity is None else entity.symbol()
+
+    @timed("render")
     def render(self, player: 'Player'):
         lines = []
+        hidden = "|" + "|".join("X" * self._cols) + "|"
         for r in range(self._rows):
+            bits = self._fog.row(r)
+            if not bits:
+                lines.append(hidden)
+                continue
             row = []
             for c in range(self._cols):
-                cell_entity, revealed = self._grid[r][c]
+                cell_entity = self._grid[r][c]
                 pos = (r, c)
 
-                if not revealed:
+                if not bits >> c & 1:
                     row.append("X")
                     continue
 
@@ -763,16 +1044,19 @@ class Board:
 
     def to_dict(self):
         grid_data = []
-        for r in range(self._rows):
+        for r, cells in enumerate(self._grid):
+            bits = self._fog.row(r)
             row = []
-            for c in range(self._cols):
-                entity, revealed = self._grid[r][c]
-                cell = {"revealed": revealed}
+            for c, entity in enumerate(cells):
                 if entity is None:
-                    cell["entity"] = None
+                    data = None
+                elif type(entity) is not RawCell:
+                    data = entity.to_dict()
+                elif entity.fmt == "json":
+                    data = entity.data
                 else:
-                    cell["entity"] = entity.to_dict()
-                row.append(cell)
+                    data = self.entity_at((r, c)).to_dict()
+                row.append({"revealed": bool(bits >> c & 1), "entity": data})
             grid_data.append(row)
 
         return {
@@ -785,7 +1069,7 @@ class Board:
         }
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, lazy: bool = True):
         rows = data["rows"]
         cols = data["cols"]
         board = cls(rows, cols)
@@ -793,14 +1077,19 @@ class Board:
         board._goal = tuple(data["goal"])
 
         grid_data = data["grid"]
+        revealed = []
         for r, row in enumerate(grid_data):
+            bits = 0
             for c, cell in enumerate(row):
-                revealed = cell["revealed"]
+                if cell["revealed"]:
+                    bits |= 1 << c
                 entity_data = cell["entity"]
                 entity = None
                 if entity_data:
-                    entity = load_object(entity_data)
-                board._grid[r][c] = (entity, revealed)
+                    entity = json_cell(entity_data) if lazy else load_object(entity_data)
+                board._grid[r][c] = entity
+            revealed.append(bits)
+        board._fog = FogOfWar.from_rows(rows, cols, revealed)
 
         return board
     
@@ -0,0 +1,62 @@
+import hashlib
+from typing import TYPE_CHECKING
+
+from classes import CLASS_REGISTRY, Player, load_object
+from rng import GameRng, NumpyRng
+from save_bin import SaveFormatError
+
+if TYPE_CHECKING:
+    from classes import Board
+
+
+RNG_TYPES = {"GameRng": GameRng, "NumpyRng": NumpyRng}
+
+
+def base_hash(board: 'Board'):
+    return hashlib.blake2b(bytes(board.codes()) + board._fog.to_bytes(), digest_size=16).hexdigest()
+
+
+def is_fresh(rng: GameRng):
+    return type(rng).__name__ in RNG_TYPES and type(rng)(rng.base_seed).getstate() == rng.getstate()
+
+
+def encode_delta(board: 'Board', player: Player):
+    generation = board.generation()
+    if generation is None:
+        return board.to_dict()
+    cells = []
+    for pos in board.delta():
+        entity = board.entity_at(pos)
+        if entity is player:
+            entity_data = "player"
+        else:
+            entity_data = entity.to_dict() if entity else None
+        cells.append([pos[0], pos[1], entity_data, board.is_revealed(pos)])
+    return {
+        "class": "delta",
+        "generation": generation,
+        "cells": cells
+    }
+
+
+def decode_delta(data: dict, player: Player):
+    from game import build_level
+    generation = data["generation"]
+    size = generation["size"]
+    board, base_player = build_level(generation["difficulty"], generation["player_lvl"],
+                                     CLASS_REGISTRY[generation["board"]], tuple(size) if size else None,
+                                     generation["settings"], RNG_TYPES[generation["rng"]](generation["seed"]))
+    if board.generation()["hash"] != generation["hash"]:
+        raise SaveFormatError("Уровень из сохранения не удалось восстановить по зерну")
+    if board.entity_at(board._start) is base_player:
+        board.place(player, board._start)
+        board._delta.discard(board._start)
+    for r, c, entity_data, revealed in data["cells"]:
+        if entity_data == "player":
+            entity = player
+        else:
+            entity = load_object(entity_data) if entity_data else None
+        board.place(entity, (r, c), reveal=False)
+        if revealed:
+            board.reveal((r, c))
+    return board
@@ -0,0 +1,140 @@
+class FogOfWar:
+
+    def __init__(self, rows: int, cols: int):
+        self._rows = rows
+        self._cols = cols
+        self._bits = [0] * rows
+        self._count = 0
+        self._bounds = None
+        self._masks = {}
+
+    @classmethod
+    def from_rows(cls, rows: int, cols: int, bits):
+        fog = cls(rows, cols)
+        fog.reveal_rows(enumerate(bits))
+        return fog
+
+    @classmethod
+    def from_bytes(cls, rows: int, cols: int, data: bytes):
+        value = int.from_bytes(data, "little")
+        return cls.from_rows(rows, cols, _split(value, 0, rows, cols))
+
+    def to_bytes(self):
+        value = _join(self._bits, 0, self._rows, self._cols)
+        return value.to_bytes((self._rows * self._cols + 7) // 8, "little")
+
+    def copy(self):
+        fog = self.__class__.__new__(self.__class__)
+        fog.__dict__.update(self.__dict__)
+        fog._bits = self._bits[:]
+        return fog
+
+    def row(self, r: int):
+        return self._bits[r]
+
+    def count(self):
+        return self._count
+
+    def bounds(self):
+        return self._bounds
+
+    def is_revealed(self, pos: tuple[int, int]):
+        r, c = pos
+        if 0 <= r < self._rows and 0 <= c < self._cols:
+            return bool(self._bits[r] >> c & 1)
+        return False
+
+    def _mask(self, c: int, radius: int):
+        key = (c, radius)
+        mask = self._masks.get(key)
+        if mask is None:
+            lo = max(c - radius, 0)
+            hi = min(c + radius, self._cols - 1)
+            mask = ((1 << (hi - lo + 1)) - 1) << lo if lo <= hi else 0
+            self._masks[key] = mask
+        return mask
+
+    def _reveal_row(self, r: int, mask: int):
+        new = mask & ~self._bits[r]
+        if not new:
+            return 0
+        self._bits[r] |= new
+        self._count += new.bit_count()
+        self._extend(r, (new & -new).bit_length() - 1, r, new.bit_length() - 1)
+        return new
+
+    def _extend(self, top: int, left: int, bottom: int, right: int):
+        if self._bounds is not None:
+            old_top, old_left, old_bottom, old_right = self._bounds
+            top, left = min(top, old_top), min(left, old_left)
+            bottom, right = max(bottom, old_bottom), max(right, old_right)
+        self._bounds = (top, left, bottom, right)
+
+    def reveal(self, pos: tuple[int, int]):
+        r, c = pos
+        if 0 <= r < self._rows and 0 <= c < self._cols:
+            return bool(self._reveal_row(r, 1 << c))
+        return False
+
+    def reveal_rows(self, rows):
+        bits = self._bits
+        full = (1 << self._cols) - 1
+        added = 0
+        top = left = bottom = right = None
+        for r, mask in rows:
+            new = mask & full & ~bits[r]
+            if not new:
+                continue
+            bits[r] |= new
+            added += new.bit_count()
+            low = (new & -new).bit_length() - 1
+            high = new.bit_length() - 1
+            if top is None:
+                top, left, bottom, right = r, low, r, high
+            else:
+                top, bottom = min(top, r), max(bottom, r)
+                left, right = min(left, low), max(right, high)
+        if top is not None:
+            self._count += added
+            self._extend(top, left, bottom, right)
+        return added
+
+    def reveal_area(self, pos: tuple[int, int], radius: int, changes: set = None):
+        r, c = pos
+        mask = self._mask(c, radius)
+        if not mask:
+            return 0
+        added = 0
+        for nr in range(max(r - radius, 0), min(r + radius, self._rows - 1) + 1):
+            new = self._reveal_row(nr, mask)
+            if new:
+                added += new.bit_count()
+                if changes is not None:
+                    changes.update((nr, nc) for nc in _bit_positions(new))
+        return added
+
+
+def _bit_positions(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _join(bits, lo: int, hi: int, cols: int):
+    if hi - lo == 1:
+        return bits[lo]
+    if hi <= lo:
+        return 0
+    mid = (lo + hi) // 2
+    return _join(bits, lo, mid, cols) | _join(bits, mid, hi, cols) << ((mid - lo) * cols)
+
+
+def _split(value: int, lo: int, hi: int, cols: int):
+    if hi - lo == 1:
+        return [value]
+    if hi <= lo:
+        return []
+    mid = (lo + hi) // 2
+    width = (mid - lo) * cols
+    return _split(value & ((1 << width) - 1), lo, mid, cols) + _split(value >> width, mid, hi, cols)
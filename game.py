@@ -1,69 +1,111 @@
 from classes import *
 from save import *
-import random
+from renderer import TerminalRenderer
+from journal import MoveJournal
+from pathfinding import PathFinder, DIRECTIONS
+from recording import Recording
+from prefetch import LevelPrefetcher
+from delta import base_hash, is_fresh
+from battle_odds import battle_odds
+from battle_group import EnemyGroup
+from roaming import Roamer
+from rng import GameRng, current, activate, using
+from placement import populate
+from world import ChunkedBoard, WORLD_SIZE
+import instrument
+import contextlib
+import contextvars
+import io
+import sys
+
+@instrument.timed("create_level")
+def create_level(difficulty: str, player_lvl: int = 1, board_cls=Board, size: tuple[int, int] = None,
+                 settings: dict = None, rng: GameRng = None):
+    board, player = build_level(difficulty, player_lvl, board_cls, size, settings, rng)
+    print(f"Уровень {player_lvl}: поле{board._rows}x{board._cols}, сложность '{difficulty}'")
+    return board, player
+
+
+def build_level(difficulty: str, player_lvl: int = 1, board_cls=Board, size: tuple[int, int] = None,
+                settings: dict = None, rng: GameRng = None):
+    rng = rng or current()
+    settings = settings or load_settings()[difficulty]
+    fresh = is_fresh(rng)
+    with using(rng):
+        board, player = _create_level(difficulty, player_lvl, board_cls, size, settings, rng)
+    if fresh:
+        board.track_generation({
+            "rng": type(rng).__name__,
+            "seed": rng.base_seed,
+            "difficulty": difficulty,
+            "player_lvl": player_lvl,
+            "board": board_cls.__name__,
+            "size": list(size) if size else None,
+            "settings": settings,
+            "hash": base_hash(board)
+        })
+    return board, player
+
 
-def create_level(difficulty: str, player_lvl: int = 1):
-    
-    settings = load("difficulty.json")
-    s = settings[difficulty]
+def _create_level(difficulty: str, player_lvl: int, board_cls, size: tuple[int, int], settings: dict,
+                  rng: GameRng):
+    s = settings or load_settings()[difficulty]
 
-    n = random.randint(s["board_min"], s["board_max"])
-    m = random.randint(s["board_min"], s["board_max"])
+    if size:
+        n, m = size
+    else:
+        n = rng.randint(s["board_min"], s["board_max"])
+        m = rng.randint(s["board_min"], s["board_max"])
 
-    board = Board(n, m)
+    board = board_cls(n, m)
     player = Player(lvl= player_lvl, position=(0, 0))
     board.place(player, (0, 0))
 
-    total_cells = n*m
     goal = (n-1, m-1)
-    exclude_positions = [(0, 0), goal]
-
-    def get_random_position():
-        for i in range(100):
-            r = random.randint(0, n-1)
-            c = random.randint(0, m - 1)
-            pos = (r, c)
-            if pos not in exclude_positions and board.entity_at(pos) is None:
-                return pos
-        return None  
-
-    tower_count = max(1, int(total_cells*s["tower_multiplier"]))
-    for i in range(tower_count):
-        pos = get_random_position()
-        if pos:
-            board.place(Tower(pos), pos)
-
-    weapons = [Stick, Bow, Revolver]
-    weapon_count = int(total_cells * s["weapon_multiplier"])
-    for i in range(weapon_count):
-        pos = get_random_position()
-        if pos:
-            weapon_class = random.choice(weapons)
-            board.place(weapon_class(pos),pos)
-
-    bonuses = [Medkit, Rage, Arrows, Bullets, Accuracy, Coins]
-    bonus_count = int(total_cells * s["bonus_multiplier"])
-    for i in range(bonus_count):
-        pos = get_random_position()
-        if pos :
-            bonus_class = random.choice(bonuses)
-            board.place(bonus_class(pos), pos)
-
-    enemies = [Rat, Spider, Skeleton]
-    enemy_count=int(total_cells * s["enemy_multiplier"])
-    for i in range(enemy_count):
-        pos = get_random_position()
-        if pos:
-            enemy_class = random.choice(enemies)
-            enemy_level =random.randint(1, player_lvl + 2)
-            enemy = enemy_class(lvl=enemy_level, position=pos)
-            board.place(enemy, pos)
-
-    print(f"Уровень {player_lvl}: поле{n}x{m}, сложность '{difficulty}'")
+    populate(board, s, player_lvl, [(0, 0), goal], rng)
+    return board, player
+
+
+@instrument.timed("prefetch_level")
+def _prefetched_level(difficulty: str, player_lvl: int, settings: dict, rng: GameRng):
+    return build_level(difficulty, player_lvl, settings=settings, rng=rng)
+
+
+def _level_key(difficulty: str, player_lvl: int, settings: dict, level: int):
+    s = settings or load_settings()[difficulty]
+    return (difficulty, player_lvl, level, tuple(sorted(s.items()))), s
+
+
+def prefetch_level(prefetcher: LevelPrefetcher, difficulty: str, player_lvl: int, settings: dict,
+                   rng: GameRng, level: int):
+    key, s = _level_key(difficulty, player_lvl, settings, level)
+    prefetcher.submit(key, _prefetched_level, difficulty, player_lvl, s, rng)
+
+
+def next_level(prefetcher: LevelPrefetcher, difficulty: str, player_lvl: int, settings: dict,
+               rng: GameRng, level: int):
+    key, s = _level_key(difficulty, player_lvl, settings, level)
+    ready = prefetcher.take(key) if prefetcher else None
+    if ready is None:
+        return create_level(difficulty, player_lvl=player_lvl, settings=s, rng=rng)
+    board, player = ready
+    print(f"Уровень {player_lvl}: поле{board._rows}x{board._cols}, сложность '{difficulty}'")
+    return board, player
+
+
+def create_world(difficulty: str, player_lvl: int = 1, size: tuple[int, int] = None, settings: dict = None,
+                 rng: GameRng = None):
+    rng = rng or current()
+    s = settings or load_settings()[difficulty]
+    n, m = size or (WORLD_SIZE, WORLD_SIZE)
+    board = ChunkedBoard(n, m, s, seed=rng.getrandbits(64), player_lvl=player_lvl)
+    player = Player(lvl=player_lvl, position=board._start)
+    board.reveal(board._start)
+    print(f"Мир {n}x{m}, сложность '{difficulty}', каталог {board.path}")
     return board, player
 
 
-def start():
+def start(world: bool = False):
     print("Игра Сдохни или умри")
 
     save_data, has_save = load_game()
@@ -73,11 +115,12 @@ def start():
         print(f"Найдено сохранение. Текущий уровень: {current_level}")
         action = input("Введите 'start' для продолжения или 'new' для новой игры: ").strip().lower()
         if action == "start":
-            player = Player.from_dict(save_data["player"])
+            player = save_data["player"]
             if save_data["board"] is not None:
-                board = Board.from_dict(save_data["board"])
+                board = save_data["board"]
             else:
-                board, player = create_level(difficulty, player_lvl=player._lvl)
+                board, player = create_level(difficulty, player_lvl=player._lvl,
+                                             rng=current().split("level", current_level + 1))
                 current_level+=1
             return board, player, current_level, difficulty
 
@@ -86,7 +129,10 @@ def start():
     while difficulty not in ["easy", "normal", "hard"]:
         difficulty =input("Выберите сложность (easy/normal/hard): ").strip().lower()
 
-    board, player = create_level(difficulty, player_lvl=1)
+    if world:
+        board, player = create_world(difficulty, player_lvl=1)
+    else:
+        board, player = create_level(difficulty, player_lvl=1, rng=current().split("level", 1))
     return board, player, 1, difficulty
 
 
@@ -96,40 +142,195 @@ YELLOW = '\033[93m'
 BLUE = '\033[94m'
 RESET = '\033[0m'
 
-def game(board: Board, player: Player, current_level: int, difficulty: str):
+SHOW_ODDS = False
+
+def travel_step(finder: PathFinder, board: Board, player: Player, target: tuple[int, int]):
+    if player.position == target:
+        print("Вы на месте.")
+        return None
+    step = finder.next_step(player.position, target)
+    if step is None:
+        print("Путь не найден.")
+        return None
+    if not board.is_revealed(step):
+        print("Дальше неразведанная территория.")
+        return None
+    if isinstance(board.entity_at(step), Enemy):
+        print(f"{RED}Впереди враг!{RESET}")
+        return None
+    return DIRECTIONS[(step[0] - player.position[0], step[1] - player.position[1])]
+
+
+def parse_target(parts: list, board: Board):
+    if len(parts) == 1:
+        return board._goal
+    try:
+        target = (int(parts[1]), int(parts[2]))
+    except (IndexError, ValueError):
+        return None
+    return target if len(parts) == 3 and board.in_bounds(target) else None
+
+
+def run_blocking(steps):
+    try:
+        with instrument.phase("step"):
+            prompt = next(steps)
+        while True:
+            command = input(prompt)
+            with instrument.phase("step"):
+                prompt = steps.send(command)
+    except StopIteration as stop:
+        return stop.value
+
+
+class GameSession:
+
+    def __init__(self, steps, rng: GameRng = None):
+        self._steps = steps
+        self.rng = rng or GameRng()
+        self._context = contextvars.Context()
+        self._context.run(activate, self.rng)
+        self.prompt = None
+        self.finished = False
+
+    def _resume(self, command: str = None):
+        try:
+            with instrument.phase("step"):
+                if command is None:
+                    self.prompt = next(self._steps)
+                else:
+                    self.prompt = self._steps.send(command)
+        except StopIteration:
+            self.prompt = None
+            self.finished = True
+
+    def _advance(self, command: str = None):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self._context.run(self._resume, command)
+        return out.getvalue()
+
+    def start(self):
+        return self._advance()
+
+    def send(self, command: str):
+        if self.finished:
+            return ""
+        return self._advance(command)
+
+    def close(self):
+        self._context.run(self._steps.close)
+        self.finished = True
+
+
+def new_game_steps(persist: bool = False, renderer=None, recorder=None, settings: dict = None):
+    print("Игра Сдохни или умри")
+    difficulty = ""
+    while difficulty not in ["easy", "normal", "hard"]:
+        difficulty = (yield "Выберите сложность (easy/normal/hard): ").strip().lower()
+    level_settings = settings[difficulty] if settings else None
+    board, player = create_level(difficulty, player_lvl=1, settings=level_settings, rng=current().split("level", 1))
+    yield from game_steps(board, player, 1, difficulty, renderer, persist=persist, recorder=recorder,
+                          settings=level_settings)
+
+
+def game(board: Board, player: Player, current_level: int, difficulty: str, renderer=None, journal=None,
+         prefetcher=None, settings: dict = None):
+    return run_blocking(game_steps(board, player, current_level, difficulty, renderer, journal,
+                                   settings=settings, prefetcher=prefetcher))
+
+
+def game_steps(board: Board, player: Player, current_level: int, difficulty: str, renderer=None, journal=None,
+               persist: bool = True, recorder=None, settings: dict = None, prefetcher=None):
+    command = None
+    target = None
+    battles = 0
+    rng = current()
+    finder = PathFinder(board)
+    roamer = Roamer(board, rng.split("roam", current_level))
+    moved = False
+    board.visit(player.position)
+    if prefetcher:
+        prefetch_level(prefetcher, difficulty, player._lvl, settings, rng.split("level", current_level + 1),
+                       current_level + 1)
+    if journal:
+        journal.start(player, board, current_level, difficulty)
+    if recorder:
+        recorder.checkpoint(board, player, current_level)
+
+    def draw():
+        with instrument.phase("draw"):
+            if renderer:
+                renderer.draw(board, player)
+            else:
+                board.render(player)
+
     while True:
-        board.render(player)
+        if moved:
+            moved = False
+            roamer.step(player.position)
+        if target is None:
+            draw()
         if not player.is_alive():
             print(f"{RED}Вы умерли. Игра окончена.{RESET}")
-            old_level, old_coins = load_record()
+            old_level, old_coins = load_record() if persist else (0, 0)
             if current_level > old_level or (current_level == old_level and player._coins > old_coins):
-                save_record(current_level, player._coins)
+                if persist:
+                    save_record(current_level, player._coins)
                 print(f"Новый рекорд: уровень {current_level}, монеты: {player._coins}")
+            if journal:
+                journal.truncate()
+                journal.close()
+            if recorder:
+                recorder.checkpoint(board, player, current_level)
             return
 
         row, col = player.position
         goal = (board._rows - 1, board._cols - 1)
 
         if (row, col) == goal:
-            print("Поздравляем! Вы достигли цели и выжили!")
-            save_game(player, None, current_level, difficulty)
-            current_level += 1
-            board, player = create_level(difficulty, player_lvl=player._lvl)
+            with instrument.phase("level_transition"):
+                print("Поздравляем! Вы достигли цели и выжили!")
+                if persist:
+                    save_game(player, None, current_level, difficulty)
+                current_level += 1
+                board, player = next_level(prefetcher, difficulty, player._lvl, settings,
+                                           rng.split("level", current_level), current_level)
+            if prefetcher:
+                prefetch_level(prefetcher, difficulty, player._lvl, settings,
+                               rng.split("level", current_level + 1), current_level + 1)
+            target = None
+            moved = False
+            finder.close()
+            finder = PathFinder(board)
+            roamer = Roamer(board, rng.split("roam", current_level))
+            board.visit(player.position)
+            if journal:
+                journal.checkpoint(player, board, current_level, difficulty)
+            if recorder:
+                recorder.checkpoint(board, player, current_level)
             continue
 
         if player.has_status():
-            damage = player.apply_status_tick()
+            with instrument.phase("status"):
+                damage = player.apply_status_tick()
             if damage > 0:
                 print(f"Вы получили {damage:.1f} урона от статусов.")
 
         entity = board.entity_at(player.position)
         if isinstance(entity, Enemy) and not player.fight:
-            start_battle(player, entity, board)
+            battles += 1
+            instrument.count("battles")
+            with using(rng.split("battle", current_level, battles)):
+                yield from battle_steps(player, entity, board)
+            if journal:
+                with instrument.phase("journal"):
+                    journal.record("battle", player, board, current_level, difficulty)
             continue
 
         if isinstance(entity, Weapon) and entity!=player._weapon:
             print(f"{GREEN}Вы нашли оружие: {entity._name}! Сменить? (y/n){RESET}")
-            player.choose_weapon(entity)
+            yield from choose_weapon_steps(player, entity)
             board.place(None, player.position)
 
         elif isinstance(entity, Bonus):
@@ -139,46 +340,109 @@ def game(board: Board, player: Player, current_level: int, difficulty: str):
 
         elif isinstance(entity, Tower):
             print(f"{YELLOW}Вы вошли в башню.{RESET}")
-            entity.interact(board)
-
-        print(f"Позиция: {player.position}, Здоровье: {player._hp:.1f}, Монеты: {player._coins}")
-        print("Команды: w (вверх), s (вниз), a (влево), d (вправо), i (инвентарь), q (выход)")
-
-        command = input("Ваш ход: ").strip().lower()
+            with instrument.phase("tower"):
+                entity.interact(board)
+
+        if journal:
+            with instrument.phase("journal"):
+                journal.record(command, player, board, current_level, difficulty)
+
+        if target is not None:
+            with instrument.phase("travel"):
+                command = travel_step(finder, board, player, target)
+            if command is None:
+                target = None
+                draw()
+
+        if target is None:
+            print(f"Позиция: {player.position}, Здоровье: {player._hp:.1f}, Монеты: {player._coins}")
+            print("Команды: w (вверх), s (вниз), a (влево), d (вправо), t [строка столбец] (путь), "
+                  "i (инвентарь), q (выход)")
+            command = (yield "Ваш ход: ").strip().lower()
+        parts = command.split()
 
         if command == 'q' or command == 'exit':
             if player.fight:
                 print("Нельзя выйти во время боя!")
             else:
-                save_game(player, board, current_level, difficulty)
-                print("Игра сохранена.")
+                if journal:
+                    journal.checkpoint(player, board, current_level, difficulty)
+                    journal.close()
+                elif persist:
+                    save_game(player, board, current_level, difficulty)
+                if recorder:
+                    recorder.checkpoint(board, player, current_level)
+                print("Игра сохранена." if persist else "Игра завершена.")
                 return
         elif command == 'i':
-            show_inventory(player)
+            yield from inventory_steps(player)
         elif command in ['w', 's', 'a', 'd']:
             direction_map = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}
             d_row, d_col = direction_map[command]
-            player.move(d_row, d_col, board)
+            moved = player.move(d_row, d_col, board) is not False
+        elif parts and parts[0] in ("t", "travel") and isinstance(board, ChunkedBoard):
+            print("Автопуть недоступен в бесконечном мире.")
+        elif parts and parts[0] in ("t", "travel"):
+            target = parse_target(parts, board)
+            if target is None:
+                print("Неверная цель.")
         else:
             print("Неверная команда.")
 
 
+def choose_weapon_steps(player: Player, weapon: Weapon):
+    player.offer_weapon(weapon)
+    player.accept_weapon(weapon, (yield ""))
+
+
+def use_bonus_steps(player: Player):
+    if player.bonus_choices():
+        player.apply_bonus_choice((yield ""))
+
+
 def start_battle(player: Player, enemy: Enemy, board: Board):
+    run_blocking(battle_steps(player, enemy, board))
+
+
+def show_odds(enabled: bool = True):
+    global SHOW_ODDS
+    SHOW_ODDS = enabled
+
+
+def print_odds(player: Player, enemy: Enemy):
+    with instrument.phase("battle_odds"):
+        odds = battle_odds(player, enemy)
+    if odds is None:
+        return
+    print(f"Шансы без бонусов{'' if odds['exact'] else ' (оценка)'}: победа {odds['win']:.0%}, "
+          f"поражение {odds['loss']:.0%}, бегство врага {odds['fled']:.0%}, ~{odds['mean_turns']:.1f} ходов"
+          + (" (без учёта подкрепления)" if isinstance(enemy, Spider) else ""))
+
+
+def battle_steps(player: Player, enemy: Enemy, board: Board):
     print(f"{RED}Бой начался! {enemy.__class__.__name__} (урон: {enemy._max_enemy_damage:.1f}, HP: {enemy._hp:.1f}){RESET}")
+    if SHOW_ODDS:
+        print_odds(player, enemy)
     player.change_fight()
+    group = EnemyGroup([enemy])
 
-    while player.is_alive() and enemy.is_alive():
-        print(f"\nВаш ход. Здоровье: {player._hp:.1f}, Враг: {enemy._hp:.1f}")
+    while player.is_alive() and len(group):
+        if len(group) == 1:
+            print(f"\nВаш ход. Здоровье: {player._hp:.1f}, Враг: {group.target_hp():.1f}")
+        else:
+            print(f"\nВаш ход. Здоровье: {player._hp:.1f}, Врагов: {len(group)}, "
+                  f"цель: {group.target_hp():.1f}, всего HP: {group.total_hp():.1f}")
 
         if player.has_status():
-            damage = player.apply_status_tick()
+            with instrument.phase("status"):
+                damage = player.apply_status_tick()
             if damage > 0:
                 print(f"Вы получили {damage:.1f} урона от статусов.")
 
         if any(player._inventory[key] for key in player._inventory):
-            choice_input = input("Использовать бонус? (y/n): ").strip().lower()
+            choice_input = (yield "Использовать бонус? (y/n): ").strip().lower()
             if choice_input == 'y':
-                player.use_bonus()
+                yield from use_bonus_steps(player)
             else:
                 if not player._weapon.is_available():
                     if isinstance(player._weapon, Bow):
@@ -192,36 +456,72 @@ def start_battle(player: Player, enemy: Enemy, board: Board):
                 elif isinstance(player._weapon, Revolver):
                     player.buy_auto_if_needed("Bullets")
 
-        damage = player.attack(enemy)
+        instrument.count("battle_rounds")
+        with instrument.phase("status"):
+            damage = group.tick_statuses()
+        if damage > 0:
+            print(f"Враги получили {damage:.1f} урона от статусов.")
+            yield from collect_dead_steps(player, group)
+            if not len(group):
+                break
+        with instrument.phase("battle.attack"):
+            damage = player.attack(group.target())
         print(f"Вы нанесли {damage:.1f} урона.")
 
-        if not enemy.is_alive():
-            print(f"Враг повержен! +{enemy._reward_coins} монет.")
-            player.add_coins(enemy._reward_coins)
-            if isinstance(enemy, Skeleton):
-                loot = enemy.drop_loot()
-                if loot:
-                    print(f"Добыто: {loot._name}!")
-                    player.choose_weapon(loot)
+        if group.target_hp() <= 0:
+            yield from collect_dead_steps(player, group)
+            if not len(group):
+                break
+
+        with instrument.phase("battle.enemy"):
+            attackers = group.active()
+            group.before_turn(player)
+            escaped = not len(group)
+            if not escaped:
+                enemy_damage, hits = group.attack(player, attackers)
+        if escaped:
             break
 
-        enemy.before_turn(player)
-        if not enemy.is_alive():
-            break
-
-        enemy_damage = enemy.attack(player)
-        print(f"Враг нанёс {enemy_damage:.1f} урона.")
+        if hits == 1:
+            print(f"Враг нанёс {enemy_damage:.1f} урона.")
+        else:
+            print(f"Враги ({hits}) нанесли {enemy_damage:.1f} урона.")
 
         if not player.is_alive():
             print("Вы погибли.")
             break
 
+    group.sync()
     player.end_fight()
     if player.is_alive():
         board.place(None, player.position)
 
 
+def collect_dead_steps(player: Player, group: EnemyGroup):
+    killed = group.collect_dead()
+    if not killed:
+        return 0
+    payout = group.payout(killed) if player.is_alive() else 0
+    player.add_coins(payout)
+    if len(killed) == 1:
+        print(f"Враг повержен! +{payout} монет.")
+    else:
+        print(f"Повержено врагов: {len(killed)}! +{payout} монет.")
+    for row in killed:
+        source = group.source(row)
+        if isinstance(source, Skeleton):
+            loot = source.drop_loot()
+            if loot:
+                print(f"Добыто: {loot._name}!")
+                yield from choose_weapon_steps(player, loot)
+    return payout
+
+
 def show_inventory(player: Player):
+    run_blocking(inventory_steps(player))
+
+
+def inventory_steps(player: Player):
     print("\n--- Инвентарь ---")
     has_items = False
     for name, items in player._inventory.items():
@@ -231,10 +531,36 @@ def show_inventory(player: Player):
     if not has_items:
         print("Инвентарь пуст.")
     print(f"Монеты: {player._coins}")
-    cmd = input("Команды: 'use' — применить, любой другой — назад: ").strip().lower()
+    cmd = (yield "Команды: 'use' — применить, любой другой — назад: ").strip().lower()
     if cmd == 'use':
-        player.use_bonus()
+        yield from use_bonus_steps(player)
 
 if __name__ == "__main__":
-    board, player, level, diff = start()
-    game(board, player, level, diff)
\ No newline at end of file
+    renderer = TerminalRenderer() if "--diff-render" in sys.argv else None
+    writer = enable_async_saves() if "--async-save" in sys.argv else None
+    if "--delta-save" in sys.argv:
+        set_save_format("delta")
+    journal = MoveJournal(save_game, writer=writer) if "--journal" in sys.argv else None
+    recording = Recording.new(load_settings()) if "--record" in sys.argv else None
+    if "--instrument" in sys.argv:
+        instrument.enable()
+    if "--odds" in sys.argv:
+        show_odds()
+    profile = instrument.profiled() if "--profile" in sys.argv else contextlib.nullcontext()
+    prefetcher = LevelPrefetcher() if "--no-prefetch" not in sys.argv else None
+    try:
+        with profile:
+            if recording:
+                with using(GameRng(recording.seed)):
+                    run_blocking(recording.wrap(new_game_steps(True, renderer, recording, recording.settings)))
+            else:
+                board, player, level, diff = start("--world" in sys.argv)
+                game(board, player, level, diff, renderer, journal, prefetcher)
+    finally:
+        if recording:
+            print(f"Запись сохранена: {recording.save()}")
+        if renderer:
+            renderer.close()
+        if prefetcher:
+            prefetcher.close()
+        flush_saves()
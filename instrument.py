@@ -0,0 +1,157 @@
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import math
+import signal
+from time import perf_counter
+
+
+DUMP_PATH = "instrument.json"
+PROFILE_PATH = "game.prof"
+BUCKETS_PER_OCTAVE = 8
+
+_enabled = False
+_path = DUMP_PATH
+_histograms = {}
+_counters = {}
+_null = contextlib.nullcontext()
+
+
+class Histogram:
+    __slots__ = ("count", "total", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets = {}
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        key = int(math.log2(seconds * 1e9 + 1) * BUCKETS_PER_OCTAVE)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def percentile(self, q: float):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen >= rank:
+                return min((2 ** ((key + 1) / BUCKETS_PER_OCTAVE) - 1) / 1e9, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max
+        }
+
+
+def record(name: str, seconds: float):
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = Histogram()
+    histogram.add(seconds)
+
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Phase:
+    __slots__ = ("_name", "_t0")
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self._name, perf_counter() - self._t0)
+        return False
+
+
+def phase(name: str):
+    return _Phase(name) if _enabled else _null
+
+
+def timed(name: str):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - t0)
+        return wrapper
+    return decorate
+
+
+def enabled():
+    return _enabled
+
+
+def stats():
+    return {
+        "phases": {name: histogram.summary() for name, histogram in sorted(_histograms.items())},
+        "counters": dict(sorted(_counters.items()))
+    }
+
+
+def dump(path: str = None):
+    with open(path or _path, "w", encoding="utf-8") as file:
+        json.dump(stats(), file, indent=2)
+        file.write("\n")
+
+
+def reset():
+    _histograms.clear()
+    _counters.clear()
+
+
+def enable(path: str = DUMP_PATH, dump_on_exit: bool = True):
+    global _enabled, _path
+    _enabled = True
+    _path = path
+    if dump_on_exit:
+        atexit.register(dump)
+    if hasattr(signal, "SIGUSR1"):
+        try:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: dump())
+        except ValueError:
+            pass
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    atexit.unregister(dump)
+
+
+@contextlib.contextmanager
+def profiled(path: str = PROFILE_PATH):
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -0,0 +1,179 @@
+import json
+import os
+from typing import TYPE_CHECKING
+
+from classes import Player, load_object
+
+if TYPE_CHECKING:
+    from classes import Board
+
+
+JOURNAL_PATH = "save.journal"
+
+
+def _cell_record(board: 'Board', player: Player, pos: tuple[int, int]):
+    entity = board.entity_at(pos)
+    if entity is player:
+        entity_data = "player"
+    else:
+        entity_data = entity.to_dict() if entity else None
+    return [pos[0], pos[1], entity_data, board.is_revealed(pos)]
+
+
+def _new_checkpoint():
+    return os.urandom(8).hex()
+
+
+class MoveJournal:
+
+    def __init__(self, save_fn, path: str = JOURNAL_PATH, checkpoint_every: int = 50, fsync: bool = True,
+                 writer=None):
+        self._save_fn = save_fn
+        self._writer = writer
+        self._path = path
+        self._pending = None
+        self._checkpoint_every = checkpoint_every
+        self._fsync = fsync
+        self._file = None
+        self._turn = 0
+        self._since_checkpoint = 0
+        self._checkpoint = None
+
+    def attach(self, board: 'Board'):
+        board.track_changes()
+        board.pop_changes()
+
+    def start(self, player: Player, board: 'Board', current_level: int, difficulty: str):
+        self._checkpoint = _new_checkpoint()
+        ticket = self._save_fn(player, board, current_level, difficulty, checkpoint=self._checkpoint)
+        if ticket is not None and self._writer is not None:
+            self._writer.flush()
+        if board is not None:
+            self.attach(board)
+        self.truncate()
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self._path, "a", encoding="utf-8")
+        return self._file
+
+    def record(self, command: str, player: Player, board: 'Board', current_level: int, difficulty: str):
+        self._turn += 1
+        if self._pending is not None and self._writer.done(self._pending):
+            self._drop_old()
+        entry = {
+            "checkpoint": self._checkpoint,
+            "turn": self._turn,
+            "level": current_level,
+            "difficulty": difficulty,
+            "cmd": command,
+            "player": player.to_dict(),
+            "cells": [_cell_record(board, player, pos) for pos in sorted(board.pop_changes())]
+        }
+        self._write(entry)
+
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self._checkpoint_every:
+            self.checkpoint(player, board, current_level, difficulty)
+
+    def _write(self, entry: dict):
+        file = self._open()
+        file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        file.flush()
+        if self._fsync:
+            os.fsync(file.fileno())
+
+    def checkpoint(self, player: Player, board: 'Board', current_level: int, difficulty: str):
+        base, self._checkpoint = self._checkpoint, _new_checkpoint()
+        if self._writer is not None:
+            self._rotate()
+            self._write({"checkpoint": self._checkpoint, "base": base})
+        ticket = self._save_fn(player, board, current_level, difficulty, checkpoint=self._checkpoint)
+        if board is not None:
+            self.attach(board)
+        if ticket is None or self._writer is None:
+            self.truncate()
+        else:
+            self._pending = ticket
+
+    def _rotate(self):
+        self.close()
+        if self._pending is not None and not self._writer.done(self._pending):
+            self._writer.flush()
+        self._drop_old()
+        if os.path.exists(self._path):
+            os.replace(self._path, self._path + ".old")
+        self._since_checkpoint = 0
+
+    def _drop_old(self):
+        if os.path.exists(self._path + ".old"):
+            os.remove(self._path + ".old")
+        self._pending = None
+
+    def truncate(self):
+        self.close()
+        with open(self._path, "w", encoding="utf-8"):
+            pass
+        self._drop_old()
+        self._since_checkpoint = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_entries(path: str):
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+    return entries
+
+
+def _read_all(path: str):
+    return _read_entries(path + ".old") + _read_entries(path)
+
+
+def read_journal(path: str = JOURNAL_PATH):
+    return [entry for entry in _read_all(path) if "base" not in entry]
+
+
+def _chained(entries, checkpoint: str):
+    chained = []
+    for entry in entries:
+        if "base" in entry:
+            if checkpoint is not None and entry["base"] == checkpoint:
+                checkpoint = entry["checkpoint"]
+        elif checkpoint is not None and entry.get("checkpoint") == checkpoint:
+            chained.append(entry)
+    return chained
+
+
+def replay_journal(data, path: str = JOURNAL_PATH):
+    entries = _chained(_read_all(path), data.get("checkpoint"))
+    if not entries or data["board"] is None:
+        return data, 0
+
+    board = data["board"]
+    player = Player.from_dict(entries[-1]["player"])
+    if board.entity_at(board._start) is data["player"]:
+        board.place(player, board._start)
+    for entry in entries:
+        for r, c, entity_data, revealed in entry["cells"]:
+            if entity_data == "player":
+                entity = player
+            else:
+                entity = load_object(entity_data) if entity_data else None
+            board.place(entity, (r, c), reveal=False)
+            if revealed:
+                board.reveal((r, c))
+    data["player"] = player
+    data["difficulty"] = entries[-1]["difficulty"]
+    return data, len(entries)
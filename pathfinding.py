@@ -0,0 +1,171 @@
+import heapq
+from typing import TYPE_CHECKING
+
+from classes import ENTITY_TYPES, Enemy
+
+if TYPE_CHECKING:
+    from classes import Board
+
+
+STEP_COST = 1
+FOG_COST = 3
+ENEMY_COST = 10
+UNREACHABLE = float("inf")
+
+COST_TABLE = bytes(ENEMY_COST if cls is not None and issubclass(cls, Enemy) else STEP_COST
+                   for cls in ENTITY_TYPES) + bytes([STEP_COST]) * (256 - len(ENTITY_TYPES))
+
+DIRECTIONS = {(-1, 0): "w", (1, 0): "s", (0, -1): "a", (0, 1): "d"}
+
+
+class DistanceField:
+
+    def __init__(self, board: 'Board', target: tuple[int, int]):
+        self._board = board
+        self._rows = board._rows
+        self._cols = board._cols
+        self._target = target
+        self._cost = None
+        self._dist = None
+        self._dirty = True
+
+    @property
+    def target(self):
+        return self._target
+
+    def _cell_cost(self, pos: tuple[int, int]):
+        if not self._board.is_revealed(pos):
+            return FOG_COST
+        return COST_TABLE[self._board.code_at(pos)]
+
+    def _neighbors(self, i: int):
+        cols = self._cols
+        r, c = divmod(i, cols)
+        if r > 0:
+            yield i - cols
+        if r < self._rows - 1:
+            yield i + cols
+        if c > 0:
+            yield i - 1
+        if c < cols - 1:
+            yield i + 1
+
+    def _build(self):
+        cols = self._cols
+        fog = self._board._fog
+        cost = self._board.codes().translate(COST_TABLE)
+        for r in range(self._rows):
+            bits = fog.row(r)
+            for c in range(cols):
+                if not bits >> c & 1:
+                    cost[r * cols + c] = FOG_COST
+        self._cost = cost
+        self._dist = [UNREACHABLE] * (self._rows * cols)
+        target = self._target[0] * cols + self._target[1]
+        self._dist[target] = 0
+        self._relax([(0, target)])
+        self._dirty = False
+
+    def _relax(self, heap):
+        dist = self._dist
+        cost = self._cost
+        heapq.heapify(heap)
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            nd = d + cost[i]
+            for j in self._neighbors(i):
+                if nd < dist[j]:
+                    dist[j] = nd
+                    heapq.heappush(heap, (nd, j))
+
+    def update(self, changed):
+        if self._dirty:
+            return
+        seeds = []
+        for pos in changed:
+            if not (0 <= pos[0] < self._rows and 0 <= pos[1] < self._cols):
+                continue
+            i = pos[0] * self._cols + pos[1]
+            old = self._cost[i]
+            new = self._cell_cost(pos)
+            if new == old:
+                continue
+            self._cost[i] = new
+            if new > old:
+                if any(self._dist[j] == self._dist[i] + old for j in self._neighbors(i)):
+                    self._dirty = True
+                    return
+            elif self._dist[i] < UNREACHABLE:
+                seeds.append((self._dist[i], i))
+        if seeds:
+            self._relax(seeds)
+
+    def _ensure(self):
+        if self._dirty:
+            self._build()
+
+    def distance(self, pos: tuple[int, int]):
+        self._ensure()
+        r, c = pos
+        if not (0 <= r < self._rows and 0 <= c < self._cols):
+            return None
+        d = self._dist[r * self._cols + c]
+        return None if d == UNREACHABLE else d
+
+    def next_step(self, pos: tuple[int, int]):
+        self._ensure()
+        r, c = pos
+        if pos == self._target or not (0 <= r < self._rows and 0 <= c < self._cols):
+            return None
+        i = r * self._cols + c
+        for j in self._neighbors(i):
+            if self._dist[j] + self._cost[j] == self._dist[i]:
+                return divmod(j, self._cols)
+        return None
+
+    def path(self, pos: tuple[int, int]):
+        steps = []
+        step = self.next_step(pos)
+        while step is not None:
+            steps.append(step)
+            step = self.next_step(step)
+        return steps
+
+
+class PathFinder:
+
+    def __init__(self, board: 'Board', max_fields: int = 8):
+        self._board = board
+        self._changes = board.watch()
+        self._fields = {}
+        self._max_fields = max_fields
+
+    def field(self, target: tuple[int, int] = None):
+        target = tuple(target) if target is not None else self._board._goal
+        if self._changes:
+            changed = list(self._changes)
+            self._changes.clear()
+            for field in self._fields.values():
+                field.update(changed)
+        field = self._fields.pop(target, None)
+        if field is None:
+            field = DistanceField(self._board, target)
+            if len(self._fields) >= self._max_fields:
+                del self._fields[next(iter(self._fields))]
+        self._fields[target] = field
+        return field
+
+    def distance(self, pos: tuple[int, int], target: tuple[int, int] = None):
+        return self.field(target).distance(pos)
+
+    def next_step(self, pos: tuple[int, int], target: tuple[int, int] = None):
+        return self.field(target).next_step(pos)
+
+    def path(self, pos: tuple[int, int], target: tuple[int, int] = None):
+        return self.field(target).path(pos)
+
+    def close(self):
+        self._board.unwatch(self._changes)
+        self._fields.clear()
@@ -0,0 +1,130 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from classes import (Board, Tower, Stick, Bow, Revolver, Medkit, Rage, Arrows, Bullets, Accuracy, Coins,
+                     Rat, Spider, Skeleton)
+from rng import GameRng, current, randint
+
+
+class FreeCells:
+
+    def __init__(self, rows: int, cols: int, exclude=(), rng=None):
+        rng = rng or current()
+        self._rows = rows
+        self._cols = cols
+        self._rng = rng
+        excluded = sorted({r * cols + c for r, c in exclude if 0 <= r < rows and 0 <= c < cols})
+        if np is not None:
+            self._gen = rng.generator()
+            self._pool = np.delete(np.arange(rows * cols, dtype=np.int32), excluded)
+            self._gen.shuffle(self._pool)
+        else:
+            self._gen = None
+            self._pool = array("q", range(rows * cols))
+            for value in reversed(excluded):
+                del self._pool[value]
+            rng.shuffle(self._pool)
+        self._size = len(self._pool)
+        self._slot = None
+
+    def __len__(self):
+        return self._size
+
+    def _slots(self):
+        if self._slot is None:
+            total = self._rows * self._cols
+            if self._gen is not None:
+                self._slot = np.full(total, -1, dtype=np.int32)
+                self._slot[self._pool[:self._size]] = np.arange(self._size, dtype=np.int32)
+            else:
+                self._slot = array("q", [-1]) * total
+                for s in range(self._size):
+                    self._slot[self._pool[s]] = s
+        return self._slot
+
+    def __contains__(self, pos: tuple[int, int]):
+        r, c = pos
+        if not (0 <= r < self._rows and 0 <= c < self._cols):
+            return False
+        return self._slots()[r * self._cols + c] >= 0
+
+    def _remove_slot(self, s: int):
+        value = int(self._pool[s])
+        last = self._size - 1
+        moved = int(self._pool[last])
+        self._pool[s] = moved
+        self._pool[last] = value
+        if self._slot is not None:
+            self._slot[moved] = s
+            self._slot[value] = -1
+        self._size = last
+        return value
+
+    def discard(self, pos: tuple[int, int]):
+        if pos in self:
+            self._remove_slot(int(self._slot[pos[0] * self._cols + pos[1]]))
+
+    def take(self):
+        if self._size == 0:
+            return None
+        return divmod(self._remove_slot(self._size - 1), self._cols)
+
+    def take_indices(self, count: int):
+        count = max(0, min(count, self._size))
+        start = self._size - count
+        values = self._pool[start:self._size]
+        if self._gen is None:
+            values = values.tolist()
+            if self._slot is not None:
+                for value in values:
+                    self._slot[value] = -1
+        else:
+            values = values.copy()
+            if self._slot is not None:
+                self._slot[values] = -1
+        self._size = start
+        return values
+
+    def take_many(self, count: int):
+        return [divmod(int(value), self._cols) for value in self.take_indices(count)]
+
+    def place_batch(self, board: 'Board', count: int, classes: list, factory=None):
+        indices = self.take_indices(count)
+        if len(indices) == 0:
+            return 0
+        if self._gen is None:
+            kinds = self._rng.choices(range(len(classes)), k=len(indices))
+            groups = {}
+            for kind, index in zip(kinds, indices):
+                groups.setdefault(kind, []).append(index)
+        else:
+            kinds = self._gen.integers(len(classes), size=len(indices))
+            groups = {kind: indices[kinds == kind] for kind in range(len(classes))}
+        for kind, group in groups.items():
+            if len(group):
+                board.place_batch(classes[kind], group, factory)
+        return len(indices)
+
+
+def populate(board: Board, settings: dict, player_lvl: int, exclude, rng: GameRng):
+    total_cells = board._rows * board._cols
+    cells = FreeCells(board._rows, board._cols, exclude=exclude, rng=rng)
+
+    def make_enemy(enemy_class, pos):
+        return enemy_class(lvl=randint(1, player_lvl + 2), position=pos)
+
+    tower_count = max(1, int(total_cells * settings["tower_multiplier"]))
+    cells.place_batch(board, tower_count, [Tower])
+
+    weapon_count = int(total_cells * settings["weapon_multiplier"])
+    cells.place_batch(board, weapon_count, [Stick, Bow, Revolver])
+
+    bonus_count = int(total_cells * settings["bonus_multiplier"])
+    cells.place_batch(board, bonus_count, [Medkit, Rage, Arrows, Bullets, Accuracy, Coins])
+
+    enemy_count = int(total_cells * settings["enemy_multiplier"])
+    cells.place_batch(board, enemy_count, [Rat, Spider, Skeleton], make_enemy)
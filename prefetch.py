@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from instrument import count
+
+
+class LevelPrefetcher:
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._key = None
+        self._future = None
+
+    def submit(self, key, fn, *args):
+        self.cancel()
+        self._key = key
+        self._future = self._executor.submit(fn, *args)
+
+    def take(self, key):
+        future, self._future = self._future, None
+        if future is None or self._key != key:
+            if future is not None:
+                future.cancel()
+            count("prefetch.miss")
+            return None
+        count("prefetch.hit" if future.done() else "prefetch.wait")
+        return future.result()
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._key = None
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
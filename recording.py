@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from rng import current
+from save_writer import atomic_write
+
+if TYPE_CHECKING:
+    from classes import Board, Player
+
+
+REPLAY_DIR = "replays"
+VERSION = 4
+
+
+def state_hash(board: 'Board', player: 'Player', level: int):
+    digest = hashlib.sha1()
+    digest.update(f"{level}:{board._rows}x{board._cols}:".encode())
+    digest.update(board.codes())
+    digest.update(board._fog.to_bytes())
+    digest.update(json.dumps(player.to_dict(), sort_keys=True).encode("utf-8"))
+    digest.update(repr(current().getstate()).encode())
+    return digest.hexdigest()
+
+
+class Recording:
+
+    def __init__(self, seed: int, settings: dict, commands: list = None, checkpoints: list = None,
+                 error: str = None):
+        self.seed = seed
+        self.settings = settings
+        self.commands = commands if commands is not None else []
+        self.checkpoints = checkpoints if checkpoints is not None else []
+        self.error = error
+
+    @classmethod
+    def new(cls, settings: dict, seed: int = None):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        return cls(seed, settings)
+
+    def checkpoint(self, board: 'Board', player: 'Player', level: int):
+        self.checkpoints.append([level, state_hash(board, player, level)])
+
+    def wrap(self, steps):
+        try:
+            prompt = next(steps)
+            while True:
+                command = yield prompt
+                self.commands.append(command)
+                prompt = steps.send(command)
+        except StopIteration as stop:
+            return stop.value
+        except Exception as error:
+            self.error = repr(error)
+            raise
+
+    def to_dict(self):
+        return {
+            "version": VERSION,
+            "seed": self.seed,
+            "settings": self.settings,
+            "commands": self.commands,
+            "checkpoints": self.checkpoints,
+            "error": self.error
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        if data.get("version") != VERSION:
+            raise ValueError(f"Неподдерживаемая версия записи: {data.get('version')}")
+        return cls(data["seed"], data["settings"], data["commands"], data["checkpoints"], data.get("error"))
+
+    def save(self, path: str = None):
+        if path is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.seed:016x}.json")
+        atomic_write(path, json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return path
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
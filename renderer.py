@@ -0,0 +1,90 @@
+import shutil
+import sys
+from typing import TYPE_CHECKING
+
+from instrument import timed
+
+if TYPE_CHECKING:
+    from classes import Board, Player
+
+
+CLEAR = "\033[2J\033[H"
+SAVE_CURSOR = "\0337"
+RESTORE_CURSOR = "\0338"
+RESET_SCROLL = "\033[r"
+
+
+class TerminalRenderer:
+
+    def __init__(self, out=None, viewport: tuple[int, int] = None, reserved_lines: int = 10):
+        self._out = out or sys.stdout
+        self._viewport = viewport
+        self._reserved_lines = reserved_lines
+        self._frame = None
+        self._origin = None
+        self._frames = 0
+        self._skipped = 0
+        self._cells_written = 0
+
+    def _view_size(self, board: 'Board'):
+        if self._viewport:
+            rows, cols = self._viewport
+        else:
+            size = shutil.get_terminal_size()
+            rows = max(1, size.lines - self._reserved_lines)
+            cols = max(1, (size.columns - 1) // 2)
+        return min(rows, board._rows), min(cols, board._cols)
+
+    def _view_origin(self, board: 'Board', player: 'Player', rows: int, cols: int):
+        r, c = player.position
+        top = min(max(0, r - rows // 2), board._rows - rows)
+        left = min(max(0, c - cols // 2), board._cols - cols)
+        return top, left
+
+    def _build_frame(self, board: 'Board', player: 'Player', top: int, left: int, rows: int, cols: int):
+        return [[board.symbol_at((r, c), player) for c in range(left, left + cols)]
+                for r in range(top, top + rows)]
+
+    @timed("render")
+    def draw(self, board: 'Board', player: 'Player'):
+        rows, cols = self._view_size(board)
+        top, left = self._view_origin(board, player, rows, cols)
+        frame = self._build_frame(board, player, top, left, rows, cols)
+        self._frames += 1
+
+        if self._frame is None or self._origin != (top, left) or len(self._frame) != rows \
+                or len(self._frame[0]) != cols:
+            buf = [CLEAR, f"\033[{rows + 2};{shutil.get_terminal_size().lines}r", "\033[H"]
+            for line in frame:
+                buf.append("|" + "|".join(line) + "|\n")
+            buf.append(f"\033[{rows + 2};1H")
+            self._cells_written += rows * cols
+        else:
+            buf = []
+            for r, (old, new) in enumerate(zip(self._frame, frame)):
+                for c in range(cols):
+                    if old[c] != new[c]:
+                        buf.append(f"\033[{r + 1};{2 * c + 2}H{new[c]}")
+            if not buf:
+                self._skipped += 1
+                return False
+            self._cells_written += len(buf)
+            buf.insert(0, SAVE_CURSOR)
+            buf.append(RESTORE_CURSOR)
+
+        self._frame = frame
+        self._origin = (top, left)
+        self._out.write("".join(buf))
+        self._out.flush()
+        return True
+
+    def invalidate(self):
+        self._frame = None
+
+    def close(self):
+        self._out.write(RESET_SCROLL)
+        self._out.flush()
+        self._frame = None
+
+    def stats(self):
+        return {"frames": self._frames, "skipped": self._skipped, "cells_written": self._cells_written}
@@ -0,0 +1,126 @@
+import contextlib
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import TYPE_CHECKING
+
+import game
+from recording import Recording, state_hash
+from rng import GameRng, using
+
+if TYPE_CHECKING:
+    from classes import Board, Player
+
+
+class Divergence(Exception):
+    pass
+
+
+class _NullOutput:
+
+    def write(self, text: str):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class _NullRenderer:
+
+    def draw(self, board: 'Board', player: 'Player'):
+        pass
+
+
+class _Verifier:
+
+    def __init__(self, recording: Recording):
+        self._expected = recording.checkpoints
+        self.checked = 0
+        self.command = 0
+
+    def checkpoint(self, board: 'Board', player: 'Player', level: int):
+        if self.checked >= len(self._expected):
+            raise Divergence(f"лишняя контрольная точка на уровне {level}, команда {self.command}")
+        expected = self._expected[self.checked]
+        actual = [level, state_hash(board, player, level)]
+        if actual != expected:
+            raise Divergence(f"контрольная точка {self.checked} (уровень {expected[0]}): "
+                             f"ожидалось {expected[1][:12]}, получено {actual[1][:12]} "
+                             f"на уровне {level}, команда {self.command}")
+        self.checked += 1
+
+
+def replay(recording: Recording):
+    verifier = _Verifier(recording)
+    steps = game.new_game_steps(renderer=_NullRenderer(), recorder=verifier, settings=recording.settings)
+    commands = recording.commands
+    error = None
+    try:
+        with contextlib.redirect_stdout(_NullOutput()), using(GameRng(recording.seed)):
+            try:
+                next(steps)
+                for command in commands:
+                    steps.send(command)
+                    verifier.command += 1
+            except StopIteration:
+                if verifier.command + 1 < len(commands):
+                    raise Divergence(f"игра завершилась после команды {verifier.command} "
+                                     f"из {len(commands)}") from None
+            finally:
+                steps.close()
+    except Divergence as divergence:
+        return "diverged", str(divergence)
+    except Exception as exc:
+        error = repr(exc)
+        if error != recording.error:
+            return "error", f"{error} на команде {verifier.command}"
+    if error is None and recording.error is not None:
+        return "diverged", f"ожидалась ошибка {recording.error}"
+    if verifier.checked < len(recording.checkpoints):
+        return "diverged", f"пройдено контрольных точек {verifier.checked} из {len(recording.checkpoints)}"
+    return "ok", None
+
+
+def replay_file(path: str):
+    try:
+        recording = Recording.load(path)
+    except (OSError, ValueError, KeyError) as exc:
+        return path, "error", repr(exc), 0
+    status, detail = replay(recording)
+    return path, status, detail, len(recording.commands)
+
+
+def collect(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".json"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main(argv):
+    paths = list(collect(argv or ["replays"]))
+    if not paths:
+        print("Записи не найдены.")
+        return 0
+    t0 = time.perf_counter()
+    counts = {"ok": 0, "diverged": 0, "error": 0}
+    commands = 0
+    with Pool(os.cpu_count()) as pool:
+        chunk = max(1, len(paths) // ((os.cpu_count() or 1) * 4))
+        for path, status, detail, count in pool.imap_unordered(replay_file, paths, chunk):
+            counts[status] += 1
+            commands += count
+            if status != "ok":
+                print(f"{status}: {path}: {detail}")
+    elapsed = time.perf_counter() - t0
+    print(f"Записей: {len(paths)}, совпало: {counts['ok']}, расхождений: {counts['diverged']}, "
+          f"ошибок: {counts['error']}; {commands} команд за {elapsed:.2f} с")
+    return 0 if counts["ok"] == len(paths) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
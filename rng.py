@@ -0,0 +1,142 @@
+import contextlib
+import contextvars
+import hashlib
+import os
+import random as _random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def derive_seed(seed: int, keys: tuple):
+    data = ":".join(str(part) for part in (seed, *keys)).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class GameRng(_random.Random):
+
+    def __init__(self, seed: int = None):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.base_seed = seed
+        super().__init__(seed)
+
+    def split(self, *keys):
+        return self.__class__(derive_seed(self.base_seed, keys))
+
+    def randoms(self, n: int):
+        return [self.random() for _ in range(n)]
+
+    def integers(self, low: int, high: int, n: int):
+        below, width = self._randbelow, high - low + 1
+        return [low + below(width) for _ in range(n)]
+
+    def generator(self):
+        if np is None:
+            raise RuntimeError("numpy не установлен")
+        return np.random.default_rng(self.getrandbits(64))
+
+    def __reduce__(self):
+        return self.__class__, (self.base_seed,), self.getstate()
+
+    def __setstate__(self, state):
+        self.setstate(state)
+
+
+class NumpyRng(GameRng):
+
+    def __init__(self, seed: int = None, buffer: int = 4096):
+        if np is None:
+            raise RuntimeError("numpy не установлен")
+        self._buffer = buffer
+        super().__init__(seed)
+
+    def seed(self, a=None, version: int = 2):
+        self._gen = np.random.default_rng(a)
+        self._doubles = []
+        self._pos = 0
+        self._words = []
+        self._wpos = 0
+
+    def random(self):
+        if self._pos >= len(self._doubles):
+            self._doubles = self._gen.random(self._buffer).tolist()
+            self._pos = 0
+        value = self._doubles[self._pos]
+        self._pos += 1
+        return value
+
+    def _word(self):
+        if self._wpos >= len(self._words):
+            self._words = self._gen.integers(0, 1 << 32, self._buffer, dtype=np.uint32).tolist()
+            self._wpos = 0
+        value = self._words[self._wpos]
+        self._wpos += 1
+        return value
+
+    def getrandbits(self, k: int):
+        if k <= 32:
+            return self._word() >> (32 - k)
+        value = 0
+        for shift in range(0, k, 32):
+            value |= self._word() << shift
+        return value & ((1 << k) - 1)
+
+    def randoms(self, n: int):
+        return self._gen.random(n)
+
+    def integers(self, low: int, high: int, n: int):
+        return self._gen.integers(low, high + 1, n)
+
+    def generator(self):
+        return self._gen
+
+    def getstate(self):
+        return (self._gen.bit_generator.state, self._doubles[self._pos:], self._words[self._wpos:])
+
+    def setstate(self, state):
+        self._gen.bit_generator.state, self._doubles, self._words = state
+        self._pos = self._wpos = 0
+
+
+_fallback = GameRng()
+_current = contextvars.ContextVar("rng")
+
+
+def current():
+    return _current.get(_fallback)
+
+
+def activate(rng: GameRng):
+    return _current.set(rng)
+
+
+@contextlib.contextmanager
+def using(rng: GameRng):
+    token = _current.set(rng)
+    try:
+        yield rng
+    finally:
+        _current.reset(token)
+
+
+def randint(a: int, b: int):
+    return current().randint(a, b)
+
+
+def random():
+    return current().random()
+
+
+def choice(seq):
+    return current().choice(seq)
+
+
+def randoms(n: int):
+    return current().randoms(n)
+
+
+def integers(low: int, high: int, n: int):
+    return current().integers(low, high, n)
@@ -0,0 +1,89 @@
+import math
+
+from classes import Board, Enemy
+from instrument import count, timed
+from rng import GameRng
+
+
+ACTIVE_RADIUS = 6
+MOVE_CHANCE = 0.5
+CHASE_RADIUS = 2
+CATCHUP_RADIUS = 4
+STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class Roamer:
+
+    def __init__(self, board: Board, rng: GameRng, radius: int = ACTIVE_RADIUS):
+        self._board = board
+        self._rng = rng
+        self._radius = radius
+        self._turn = 0
+        self._seen = {}
+
+    @property
+    def turn(self):
+        return self._turn
+
+    def _free(self, pos: tuple[int, int]):
+        board = self._board
+        if pos == board._start or pos == board._goal or not board.in_bounds(pos):
+            return False
+        return board.code_at(pos) == 0
+
+    def _move(self, old: tuple[int, int], new: tuple[int, int]):
+        board = self._board
+        enemy = board.entity_at(old)
+        board.place(None, old, reveal=False)
+        board.place(enemy, new, reveal=False)
+        enemy._position = new
+        self._seen.pop(old, None)
+        self._seen[new] = self._turn
+
+    def _step(self, pos: tuple[int, int], player_pos: tuple[int, int]):
+        rng = self._rng
+        if rng.random() >= MOVE_CHANCE:
+            self._seen[pos] = self._turn
+            return
+        dr, dc = player_pos[0] - pos[0], player_pos[1] - pos[1]
+        if abs(dr) + abs(dc) <= CHASE_RADIUS:
+            if abs(dr) >= abs(dc):
+                step = (1 if dr > 0 else -1, 0)
+            else:
+                step = (0, 1 if dc > 0 else -1)
+        else:
+            step = STEPS[rng.randrange(len(STEPS))]
+        new = (pos[0] + step[0], pos[1] + step[1])
+        if self._free(new):
+            self._move(pos, new)
+            count("roam.moves")
+        else:
+            self._seen[pos] = self._turn
+
+    def _catch_up(self, pos: tuple[int, int], elapsed: int, player_pos: tuple[int, int]):
+        spread = min(math.isqrt(elapsed), CATCHUP_RADIUS)
+        rng = self._rng
+        new = (pos[0] + rng.randint(-spread, spread), pos[1] + rng.randint(-spread, spread))
+        if new != pos and new != player_pos and self._free(new):
+            self._move(pos, new)
+            count("roam.catch_up")
+        else:
+            self._seen[pos] = self._turn
+
+    @timed("roam")
+    def step(self, player_pos: tuple[int, int]):
+        self._turn += 1
+        r, c = player_pos
+        radius = self._radius
+        nearby = sorted(self._board.in_rect(Enemy, r - radius, c - radius, r + radius, c + radius))
+        for pos in nearby:
+            if pos == player_pos:
+                continue
+            last = self._seen.get(pos, 0)
+            if last >= self._turn:
+                continue
+            if last < self._turn - 1:
+                self._catch_up(pos, self._turn - last, player_pos)
+            else:
+                self._step(pos, player_pos)
+        return len(nearby)
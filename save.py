@@ -1,4 +1,13 @@
 import json
+import os
+import sys
+
+from classes import Player, load_object
+from save_bin import write_save, read_save, is_binary, encode_body, pack_save
+from save_writer import SaveWriter, atomic_write
+from journal import replay_journal
+from delta import encode_delta, decode_delta
+from instrument import timed
 
 def file_exists(path):
     try:
@@ -10,8 +19,11 @@ def file_exists(path):
 
 
 def save(path, data):
-    with open(path, "w", encoding="utf-8") as file:
-        json.dump(data, file, indent=4, ensure_ascii=False)
+    atomic_write(path, encode_json(data))
+
+
+def encode_json(data):
+    return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
 
 
 def load(path):
@@ -21,23 +33,140 @@ def load(path):
         return json.load(file)
 
 
-def save_game(player, board, current_level, difficulty):
-    save_data = {
+DIFFICULTY_PATH = "difficulty.json"
+_settings_cache = {}
+
+
+def load_settings(path=DIFFICULTY_PATH):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _settings_cache.get(path)
+    if cached is None or cached[0] != key:
+        cached = _settings_cache[path] = (key, load(path))
+    return cached[1]
+
+
+SAVE_PATH = "save.bin"
+JSON_SAVE_PATH = "save.json"
+DELTA_SAVE_PATH = "save.delta.json"
+SAVE_FORMAT = "binary"
+SAVE_FORMATS = ("binary", "json", "delta")
+ASYNC_WRITER = None
+
+
+def set_save_format(fmt):
+    global SAVE_FORMAT
+    if fmt not in SAVE_FORMATS:
+        raise ValueError(f"Неизвестный формат сохранения: {fmt}")
+    SAVE_FORMAT = fmt
+
+
+def enable_async_saves():
+    global ASYNC_WRITER
+    if ASYNC_WRITER is None:
+        ASYNC_WRITER = SaveWriter()
+    return ASYNC_WRITER
+
+
+@timed("save.flush_saves")
+def flush_saves():
+    if ASYNC_WRITER is not None:
+        ASYNC_WRITER.flush()
+
+
+def state_dict(player, board, current_level, difficulty, delta=False, checkpoint=None):
+    if board is None:
+        board_data = None
+    elif delta:
+        board_data = encode_delta(board, player)
+    else:
+        board_data = board.to_dict()
+    return {
         "difficulty": difficulty,
         "current_level": current_level,
         "player": player.to_dict(),
-        "board": board.to_dict() if board else None
+        "board": board_data,
+        "checkpoint": checkpoint
     }
-    save("save.json", save_data)
 
 
+@timed("save.save_game")
+def save_game(player, board, current_level, difficulty, fmt=None, checkpoint=None):
+    fmt = fmt or SAVE_FORMAT
+    json_format = fmt in ("json", "delta")
+    delta = fmt == "delta"
+    json_path = DELTA_SAVE_PATH if delta else JSON_SAVE_PATH
+    if ASYNC_WRITER is None:
+        if json_format:
+            save(json_path, state_dict(player, board, current_level, difficulty, delta, checkpoint))
+        else:
+            write_save(SAVE_PATH, player, board, current_level, difficulty, checkpoint=checkpoint)
+        return None
+
+    def snapshot():
+        player_copy = Player.from_dict(player.to_dict())
+        board_copy = board.snapshot() if board else None
+        if board_copy and board_copy.entity_at(board._start) is player:
+            board_copy.place(player_copy, board._start)
+        return player_copy, board_copy
+
+    if json_format:
+        def encode(state):
+            return encode_json(state_dict(*state, current_level, difficulty, delta, checkpoint))
+        return ASYNC_WRITER.submit(json_path, snapshot, encode)
+
+    def encode(state):
+        return pack_save(encode_body(*state, current_level, difficulty, checkpoint))
+    return ASYNC_WRITER.submit(SAVE_PATH, snapshot, encode)
+
+
+@timed("save.read_state")
+def read_state(path):
+    if is_binary(path):
+        return read_save(path)
+    data = load(path)
+    if data is None:
+        return None
+    data["player"] = Player.from_dict(data["player"])
+    data.setdefault("checkpoint", None)
+    board = data["board"]
+    if board and board.get("class") == "delta":
+        data["board"] = decode_delta(board, data["player"])
+    else:
+        data["board"] = load_object(board) if board else None
+    return data
+
+
+@timed("save.load_game")
 def load_game():
-    data = load("save.json")
+    paths = [path for path in (SAVE_PATH, JSON_SAVE_PATH, DELTA_SAVE_PATH) if file_exists(path)]
+    if not paths:
+        return None, False
+    data = read_state(max(paths, key=os.path.getmtime))
     if data is None:
         return None, False
+    data, replayed = replay_journal(data)
     return data, True
 
 
+@timed("save.convert_save")
+def convert_save(src, dst, compress=True):
+    data = read_state(src)
+    if data is None:
+        return False
+    if dst.endswith(".json"):
+        save(dst, state_dict(data["player"], data["board"], data["current_level"], data["difficulty"],
+                             dst.endswith(".delta.json"), data["checkpoint"]))
+    else:
+        write_save(dst, data["player"], data["board"], data["current_level"], data["difficulty"], compress,
+                   data["checkpoint"])
+    return True
+
+
+@timed("save.save_record")
 def save_record(max_level, coins):
     record = {
         "max_level": max_level,
@@ -46,8 +175,18 @@ def save_record(max_level, coins):
     save("record.json", record)
 
 
+@timed("save.load_record")
 def load_record():
     data = load("record.json")
     if data and isinstance(data, dict) and "max_level" in data and "coins" in data:
         return data["max_level"], data["coins"]
-    return 0, 0
\ No newline at end of file
+    return 0, 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python save.py <откуда> <куда>")
+    elif convert_save(sys.argv[1], sys.argv[2]):
+        print(f"{sys.argv[1]} -> {sys.argv[2]}")
+    else:
+        print(f"Не удалось прочитать {sys.argv[1]}")
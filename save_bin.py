@@ -0,0 +1,302 @@
+import gzip
+import io
+import json
+import struct
+
+from classes import (ENTITY_TYPES, ENTITY_CODES, OTHER_CODE, STATELESS_TYPES, CLASS_REGISTRY,
+                     Board, Player, Enemy, Skeleton, Fist, Stick, Bow, Revolver, Medkit, Rage,
+                     Arrows, Bullets, Accuracy, Coins, Rat, Spider, RawCell, cell_type, load_object)
+from array_board import ArrayBoard, STATELESS_CODES
+from world import ChunkedBoard
+from fog import FogOfWar
+from save_writer import atomic_write
+
+
+MAGIC = b"SDUM"
+VERSION = 2
+FLAG_GZIP = 1
+
+INVENTORY_TYPES = ["Medkit", "Rage", "Arrows", "Bullets", "Accuracy"]
+
+FIELDS = {
+    Fist: [],
+    Stick: [("_durability", "i")],
+    Bow: [("_ammo", "i")],
+    Revolver: [("_ammo", "i")],
+    Medkit: [("_power", "i")],
+    Rage: [("_multiplier", "d")],
+    Arrows: [("_amount", "i")],
+    Bullets: [("_amount", "i")],
+    Accuracy: [("_multiplier", "d")],
+    Coins: [("_amount", "i")],
+    Rat: [("_lvl", "i"), ("_hp", "d"), ("_reward_coins", "i")],
+    Spider: [("_lvl", "i"), ("_hp", "d"), ("_reward_coins", "i")],
+    Skeleton: [("_lvl", "i"), ("_hp", "d"), ("_reward_coins", "i")],
+}
+STRUCTS = {cls: struct.Struct("<ii" + "".join(fmt for name, fmt in fields))
+           for cls, fields in FIELDS.items()}
+
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+I32 = struct.Struct("<i")
+F64 = struct.Struct("<d")
+PLAYER = struct.Struct("<iiddiqddB")
+BOARD = struct.Struct("<IIiiii")
+
+
+class SaveFormatError(Exception):
+    pass
+
+
+def is_binary(path):
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class _Writer:
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+    def pack(self, fmt: struct.Struct, *values):
+        self._stream.write(fmt.pack(*values))
+
+    def string(self, text: str):
+        data = text.encode("utf-8")
+        self.pack(U16, len(data))
+        self.write(data)
+
+    def entity(self, entity):
+        if type(entity) is RawCell:
+            if entity.fmt == "binary":
+                self.write(entity.data)
+                return
+            entity = entity.build()
+        cls = type(entity)
+        if cls not in STRUCTS:
+            self.string(json.dumps(entity.to_dict(), ensure_ascii=False))
+            return
+        fields = FIELDS[cls]
+        r, c = entity.position
+        self.pack(STRUCTS[cls], r, c, *(getattr(entity, name) for name, fmt in fields))
+        if cls is Skeleton:
+            self.tagged(entity._weapon)
+
+    def tagged(self, entity):
+        if entity is None:
+            self.pack(U8, 0)
+            return
+        self.pack(U8, ENTITY_CODES.get(type(entity), OTHER_CODE))
+        self.entity(entity)
+
+    def player(self, player: Player):
+        r, c = player.position
+        self.pack(PLAYER, r, c, player._hp, player._max_hp, player._lvl, player._coins,
+                  player._rage, player._accuracy, player._fight)
+        self.pack(U8, len(player._statuses))
+        for name, (dmg, turns) in player._statuses.items():
+            self.string(name)
+            self.pack(F64, dmg)
+            self.pack(I32, turns)
+        for name in INVENTORY_TYPES:
+            items = player._inventory.get(name, [])
+            self.pack(U16, len(items))
+            for bonus in items:
+                self.entity(bonus)
+        self.tagged(player._weapon)
+
+    def board(self, board: Board, player: Player):
+        self.string(type(board).__name__)
+        if isinstance(board, ChunkedBoard):
+            self.string(json.dumps(board.to_dict(), ensure_ascii=False))
+            return
+        self.pack(BOARD, board._rows, board._cols, *board._start, *board._goal)
+        self.write(board._fog.to_bytes())
+        if isinstance(board, ArrayBoard):
+            self.write(bytes(board._codes))
+            cells = [(i, board.cell(i))
+                     for i, code in enumerate(board._codes) if code and code not in STATELESS_CODES]
+        else:
+            codes = bytearray(board._rows * board._cols)
+            stateful = []
+            for r, row in enumerate(board._grid):
+                for c, entity in enumerate(row):
+                    i = r * board._cols + c
+                    if entity is not None:
+                        cls = cell_type(entity)
+                        codes[i] = ENTITY_CODES.get(cls, OTHER_CODE)
+                        if cls not in STATELESS_TYPES:
+                            stateful.append((i, entity))
+            self.write(bytes(codes))
+            cells = stateful
+        for i, entity in cells:
+            if issubclass(cell_type(entity), Player):
+                self.pack(U8, entity is player)
+                if entity is player:
+                    continue
+            self.entity(entity)
+
+
+class _Reader:
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, n: int):
+        data = self._stream.read(n)
+        if len(data) != n:
+            raise SaveFormatError("Файл сохранения обрезан")
+        return data
+
+    def unpack(self, fmt: struct.Struct):
+        return fmt.unpack(self.read(fmt.size))
+
+    def string(self):
+        return self.read(self.unpack(U16)[0]).decode("utf-8")
+
+    def entity(self, code: int):
+        cls = ENTITY_TYPES[code] if code != OTHER_CODE else None
+        if cls not in STRUCTS:
+            return load_object(json.loads(self.string()))
+        values = self.unpack(STRUCTS[cls])
+        pos = (values[0], values[1])
+        fields = FIELDS[cls]
+        if issubclass(cls, Enemy):
+            entity = cls(lvl=values[2], position=pos)
+        else:
+            entity = cls(pos)
+        for (name, fmt), value in zip(fields, values[2:]):
+            setattr(entity, name, value)
+        if cls is Skeleton:
+            entity._weapon = self.tagged()
+        return entity
+
+    def tagged(self):
+        code = self.unpack(U8)[0]
+        return self.entity(code) if code else None
+
+    def raw(self, code: int):
+        cls = ENTITY_TYPES[code] if code != OTHER_CODE else None
+        if cls not in STRUCTS:
+            size = self.read(U16.size)
+            return size + self.read(U16.unpack(size)[0])
+        data = self.read(STRUCTS[cls].size)
+        if cls is Skeleton:
+            tag = self.read(U8.size)
+            data += tag + (self.raw(tag[0]) if tag[0] else b"")
+        return data
+
+    def player(self):
+        r, c, hp, max_hp, lvl, coins, rage, accuracy, fight = self.unpack(PLAYER)
+        player = Player(lvl=lvl, position=(r, c))
+        player._hp = hp
+        player._max_hp = max_hp
+        player._coins = coins
+        player._rage = rage
+        player._accuracy = accuracy
+        player._fight = bool(fight)
+        for i in range(self.unpack(U8)[0]):
+            name = self.string()
+            dmg = self.unpack(F64)[0]
+            player._statuses[name] = (dmg, self.unpack(I32)[0])
+        for name in INVENTORY_TYPES:
+            cls = CLASS_REGISTRY[name.lower()]
+            player._inventory[name] = [self.entity(ENTITY_CODES[cls]) for i in range(self.unpack(U16)[0])]
+        player._weapon = self.tagged() or Fist((r, c))
+        return player
+
+    def board(self, player: Player, lazy: bool = True):
+        board_cls = CLASS_REGISTRY.get(self.string(), Board)
+        if issubclass(board_cls, ChunkedBoard):
+            return board_cls.from_dict(json.loads(self.string()))
+        rows, cols, *ends = self.unpack(BOARD)
+        board = board_cls(rows, cols)
+        board._start = (ends[0], ends[1])
+        board._goal = (ends[2], ends[3])
+        total = rows * cols
+        revealed = self.read((total + 7) // 8)
+        codes = self.read(total)
+
+        board._fog = FogOfWar.from_bytes(rows, cols, revealed)
+        if isinstance(board, ArrayBoard):
+            board._codes[:] = codes
+        for i, code in enumerate(codes):
+            if code == 0:
+                continue
+            pos = divmod(i, cols)
+            cls = ENTITY_TYPES[code] if code != OTHER_CODE else None
+            if cls in STATELESS_TYPES:
+                if not isinstance(board, ArrayBoard):
+                    board._grid[pos[0]][pos[1]] = cls(pos)
+                continue
+            if cls is Player and self.unpack(U8)[0]:
+                entity = player
+            elif lazy and cls in STRUCTS:
+                entity = RawCell(cls, self.raw(code), "binary", _decode_entity)
+            else:
+                entity = self.entity(code)
+            if isinstance(board, ArrayBoard):
+                board._state[i] = entity
+            else:
+                board._grid[pos[0]][pos[1]] = entity
+        return board
+
+
+def _decode_entity(cls: type, data: bytes):
+    return _Reader(io.BytesIO(data)).entity(ENTITY_CODES[cls])
+
+
+def encode_body(player, board, current_level: int, difficulty: str, checkpoint: str = None):
+    stream = io.BytesIO()
+    writer = _Writer(stream)
+    writer.string(difficulty)
+    writer.string(checkpoint or "")
+    writer.pack(U32, current_level)
+    writer.player(player)
+    writer.pack(U8, board is not None)
+    if board is not None:
+        writer.board(board, player)
+    return stream.getvalue()
+
+
+def pack_save(body: bytes, compress: bool = True):
+    header = MAGIC + U8.pack(VERSION) + U8.pack(FLAG_GZIP if compress else 0)
+    if compress:
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+    return header + body
+
+
+def write_save(path, player, board, current_level: int, difficulty: str, compress: bool = True,
+               checkpoint: str = None):
+    atomic_write(path, pack_save(encode_body(player, board, current_level, difficulty, checkpoint), compress))
+
+
+def read_save(path, lazy: bool = True):
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise SaveFormatError("Это не бинарное сохранение")
+        version = U8.unpack(file.read(1))[0]
+        if version > VERSION:
+            raise SaveFormatError(f"Неизвестная версия сохранения: {version}")
+        flags = U8.unpack(file.read(1))[0]
+        stream = gzip.GzipFile(fileobj=file, mode="rb") if flags & FLAG_GZIP else file
+        reader = _Reader(stream)
+        difficulty = reader.string()
+        checkpoint = reader.string() if version >= 2 else ""
+        current_level = reader.unpack(U32)[0]
+        player = reader.player()
+        board = reader.board(player, lazy) if reader.unpack(U8)[0] else None
+    return {
+        "difficulty": difficulty,
+        "current_level": current_level,
+        "player": player,
+        "board": board,
+        "checkpoint": checkpoint or None
+    }
@@ -0,0 +1,120 @@
+import atexit
+import os
+import threading
+import time
+
+
+def atomic_write(path, data: bytes):
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SaveWriter:
+
+    def __init__(self, write_fn=atomic_write):
+        self._write_fn = write_fn
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._seq = 0
+        self._completed = 0
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._blocked = []
+        self._write_times = []
+        self._writes = 0
+        self._merged = 0
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, path, snapshot_fn, encode_fn):
+        start = time.perf_counter()
+        snapshot = snapshot_fn()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SaveWriter закрыт")
+            self._seq += 1
+            if path in self._pending:
+                self._merged += 1
+            self._pending[path] = (self._seq, snapshot, encode_fn)
+            self._cond.notify_all()
+            ticket = self._seq
+        self._blocked.append(time.perf_counter() - start)
+        return ticket
+
+    def done(self, ticket: int):
+        with self._cond:
+            return ticket <= self._completed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                jobs = self._pending
+                self._pending = {}
+                self._busy = True
+            last = 0
+            for path, (seq, snapshot, encode_fn) in jobs.items():
+                start = time.perf_counter()
+                try:
+                    self._write_fn(path, encode_fn(snapshot))
+                except Exception as error:
+                    self._error = error
+                self._write_times.append(time.perf_counter() - start)
+                self._writes += 1
+                last = max(last, seq)
+            with self._cond:
+                self._completed = max(self._completed, last)
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = None):
+        with self._cond:
+            finished = self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return finished
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        return {
+            "submitted": self._seq,
+            "writes": self._writes,
+            "merged": self._merged,
+            "blocked_p50_ms": _percentile(self._blocked, 0.50) * 1000,
+            "blocked_p95_ms": _percentile(self._blocked, 0.95) * 1000,
+            "blocked_max_ms": max(self._blocked, default=0.0) * 1000,
+            "write_p50_ms": _percentile(self._write_times, 0.50) * 1000,
+            "write_max_ms": max(self._write_times, default=0.0) * 1000,
+        }
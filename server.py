@@ -0,0 +1,128 @@
+import asyncio
+import sys
+import time
+
+import instrument
+from game import GameSession, new_game_steps, show_odds
+
+
+HOST = "127.0.0.1"
+PORT = 7777
+IDLE_TIMEOUT = 300.0
+DRAIN_TIMEOUT = 10.0
+MAX_LINE = 1024
+MAX_SESSIONS = 5000
+WRITE_BUFFER_HIGH = 64 * 1024
+BACKLOG = 1024
+
+
+class GameServer:
+
+    def __init__(self, host: str = HOST, port: int = PORT, idle_timeout: float = IDLE_TIMEOUT,
+                 drain_timeout: float = DRAIN_TIMEOUT, max_sessions: int = MAX_SESSIONS,
+                 session_factory=None):
+        self._host = host
+        self._port = port
+        self._idle_timeout = idle_timeout
+        self._drain_timeout = drain_timeout
+        self._max_sessions = max_sessions
+        self._session_factory = session_factory or (lambda: GameSession(new_game_steps()))
+        self._server = None
+        self._sessions = 0
+        self._stats = {"connected": 0, "refused": 0, "timed_out": 0, "slow": 0, "commands": 0, "step_time": 0.0}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self._host, self._port, limit=MAX_LINE,
+                                                  backlog=BACKLOG)
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1] if self._server else self._port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["sessions"] = self._sessions
+        return stats
+
+    async def _send(self, writer: asyncio.StreamWriter, text: str):
+        if not text:
+            return
+        writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+        await asyncio.wait_for(writer.drain(), self._drain_timeout)
+
+    def _step(self, session: GameSession, command: str = None):
+        t0 = time.perf_counter()
+        text = session.start() if command is None else session.send(command)
+        self._stats["step_time"] += time.perf_counter() - t0
+        if session.prompt:
+            text += session.prompt
+        return text
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        if self._sessions >= self._max_sessions:
+            self._stats["refused"] += 1
+            writer.write("Сервер переполнен, попробуйте позже.\r\n".encode("utf-8"))
+            writer.close()
+            return
+
+        self._sessions += 1
+        self._stats["connected"] += 1
+        session = None
+        try:
+            session = self._session_factory()
+            await self._send(writer, self._step(session))
+            while not session.finished:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self._idle_timeout)
+                except asyncio.TimeoutError:
+                    self._stats["timed_out"] += 1
+                    await self._send(writer, "\nСессия закрыта по неактивности.\n")
+                    break
+                except ValueError:
+                    await self._send(writer, "\nСлишком длинная команда.\n")
+                    break
+                if not line:
+                    break
+                self._stats["commands"] += 1
+                await self._send(writer, self._step(session, line.decode("utf-8", "replace").strip()))
+        except asyncio.TimeoutError:
+            self._stats["slow"] += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._sessions -= 1
+            if session is not None:
+                session.close()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+
+
+if __name__ == "__main__":
+    ports = [int(arg) for arg in sys.argv[1:] if arg.isdigit()]
+    port = ports[0] if ports else PORT
+    if "--instrument" in sys.argv:
+        instrument.enable()
+    if "--odds" in sys.argv:
+        show_odds()
+    server = GameServer(port=port)
+    print(f"Сервер слушает {HOST}:{port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
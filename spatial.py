@@ -0,0 +1,151 @@
+class SpatialIndex:
+
+    def __init__(self, rows: int, cols: int, bucket: int = 16, loader=None):
+        self._rows = rows
+        self._cols = cols
+        self._bucket = bucket
+        self._buckets = {}
+        self._counts = {}
+        self._loader = loader
+        self._loaded = set()
+
+    def _load_bucket(self, key: tuple[int, int]):
+        if key in self._loaded:
+            return
+        b = self._bucket
+        top, left = key[0] * b, key[1] * b
+        if not (0 <= top < self._rows and 0 <= left < self._cols):
+            return
+        self._loaded.add(key)
+        for cls, pos in self._loader(top, left, min(top + b, self._rows) - 1, min(left + b, self._cols) - 1):
+            self._insert(cls, key, pos)
+
+    def _load(self, b_top: int, b_left: int, b_bottom: int, b_right: int):
+        if self._loader is None:
+            return
+        for br in range(b_top, b_bottom + 1):
+            for bc in range(b_left, b_right + 1):
+                self._load_bucket((br, bc))
+
+    def _load_all(self):
+        if self._loader is not None:
+            b = self._bucket
+            self._load(0, 0, (self._rows - 1) // b, (self._cols - 1) // b)
+            self._loader = None
+            self._loaded = set()
+
+    def add(self, cls: type, pos: tuple[int, int]):
+        key = (pos[0] // self._bucket, pos[1] // self._bucket)
+        if self._loader is None or key in self._loaded:
+            self._insert(cls, key, pos)
+
+    def _insert(self, cls: type, key: tuple[int, int], pos: tuple[int, int]):
+        cells = self._buckets.setdefault(cls, {}).setdefault(key, set())
+        if pos not in cells:
+            cells.add(pos)
+            self._counts[cls] = self._counts.get(cls, 0) + 1
+
+    def remove(self, cls: type, pos: tuple[int, int]):
+        buckets = self._buckets.get(cls)
+        if not buckets:
+            return
+        key = (pos[0] // self._bucket, pos[1] // self._bucket)
+        cells = buckets.get(key)
+        if cells and pos in cells:
+            cells.discard(pos)
+            if not cells:
+                del buckets[key]
+            self._counts[cls] -= 1
+
+    def move(self, old_cls: type, new_cls: type, pos: tuple[int, int]):
+        if old_cls is new_cls:
+            return
+        if old_cls is not None:
+            self.remove(old_cls, pos)
+        if new_cls is not None:
+            self.add(new_cls, pos)
+
+    def _kinds(self, cls: type):
+        return [kind for kind in self._buckets if issubclass(kind, cls)]
+
+    def count(self, cls: type):
+        self._load_all()
+        return sum(self._counts[kind] for kind in self._kinds(cls))
+
+    def positions(self, cls: type):
+        self._load_all()
+        for kind in self._kinds(cls):
+            for cells in self._buckets[kind].values():
+                yield from cells
+
+    def in_rect(self, cls: type, top: int, left: int, bottom: int, right: int):
+        b = self._bucket
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, self._rows - 1), min(right, self._cols - 1)
+        if top > bottom or left > right:
+            return []
+        b_top, b_left, b_bottom, b_right = top // b, left // b, bottom // b, right // b
+        self._load(b_top, b_left, b_bottom, b_right)
+        span = (b_bottom - b_top + 1) * (b_right - b_left + 1)
+        result = []
+        for kind in self._kinds(cls):
+            buckets = self._buckets[kind]
+            if span <= len(buckets):
+                pairs = (((br, bc), buckets.get((br, bc)))
+                         for br in range(b_top, b_bottom + 1) for bc in range(b_left, b_right + 1))
+            else:
+                pairs = ((key, cells) for key, cells in buckets.items()
+                         if b_top <= key[0] <= b_bottom and b_left <= key[1] <= b_right)
+            for key, cells in pairs:
+                if cells:
+                    result.extend((r, c) for r, c in cells if top <= r <= bottom and left <= c <= right)
+        return result
+
+    def within(self, cls: type, pos: tuple[int, int], radius: int):
+        r, c = pos
+        return [(nr, nc) for nr, nc in self.in_rect(cls, r - radius, c - radius, r + radius, c + radius)
+                if abs(nr - r) + abs(nc - c) <= radius]
+
+    def nearest(self, cls: type, pos: tuple[int, int], accept=None, max_radius: int = None):
+        if self._loader is None:
+            kinds = self._kinds(cls)
+            if not kinds or not any(self._counts[kind] for kind in kinds):
+                return None
+        b = self._bucket
+        r, c = pos
+        br, bc = r // b, c // b
+        rings = max(br, bc, (self._rows - 1) // b - br, (self._cols - 1) // b - bc)
+        best = None
+        best_d = None
+        for k in range(rings + 1):
+            if best is not None and best_d <= (k - 1) * b:
+                break
+            if max_radius is not None and (k - 1) * b >= max_radius:
+                break
+            if self._loader is not None:
+                for key in _ring(br, bc, k):
+                    self._load_bucket(key)
+                kinds = self._kinds(cls)
+            for key in _ring(br, bc, k):
+                for kind in kinds:
+                    cells = self._buckets[kind].get(key)
+                    if not cells:
+                        continue
+                    for cell in cells:
+                        d = abs(cell[0] - r) + abs(cell[1] - c)
+                        if (best_d is None or d < best_d or (d == best_d and cell < best)) \
+                                and (max_radius is None or d <= max_radius) and (accept is None or accept(cell)):
+                            best, best_d = cell, d
+        return best
+
+
+def _ring(br: int, bc: int, k: int):
+    if k == 0:
+        yield (br, bc)
+        return
+    for dc in range(-k, k + 1):
+        yield (br - k, bc + dc)
+        yield (br + k, bc + dc)
+    for dr in range(-k + 1, k):
+        yield (br + dr, bc - k)
+        yield (br + dr, bc + k)
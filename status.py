@@ -0,0 +1,132 @@
+import heapq
+from collections.abc import MutableMapping
+
+
+STACK_RULES = {
+    "infection": "refresh",
+    "poison": "refresh"
+}
+DEFAULT_RULE = "refresh"
+
+
+def stack(rule: str, old: tuple[float, int], dmg: float, turns: int):
+    old_dmg, old_turns = old
+    if rule == "refresh":
+        return dmg, turns
+    if rule == "extend":
+        return max(old_dmg, dmg), old_turns + turns
+    if rule == "intensify":
+        return old_dmg + dmg, max(old_turns, turns)
+    if rule == "strongest":
+        return max(old_dmg, dmg), max(old_turns, turns)
+    raise ValueError(f"Неизвестное правило наложения статуса: {rule}")
+
+
+class StatusEffects(MutableMapping):
+    __slots__ = ("_effects", "_heap", "_clock", "_seq")
+
+    def __init__(self, statuses=None):
+        self._effects = {}
+        self._heap = []
+        self._clock = 0
+        self._seq = 0
+        if statuses:
+            self.update(statuses)
+
+    def __getitem__(self, name: str):
+        dmg, expires, _ = self._effects[name]
+        return dmg, expires - self._clock
+
+    def __setitem__(self, name: str, value):
+        dmg, turns = value
+        self._seq += 1
+        expires = self._clock + int(turns)
+        effect = self._effects.get(name)
+        if effect is None:
+            self._effects[name] = [dmg, expires, self._seq]
+        else:
+            effect[:] = (dmg, expires, self._seq)
+        heapq.heappush(self._heap, (expires, self._seq, name))
+
+    def __delitem__(self, name: str):
+        del self._effects[name]
+        if not self._effects:
+            self._heap.clear()
+
+    def __iter__(self):
+        return iter(self._effects)
+
+    def __len__(self):
+        return len(self._effects)
+
+    def apply(self, name: str, dmg: float, turns: int, rule: str = None):
+        if name in self:
+            dmg, turns = stack(rule or STACK_RULES.get(name, DEFAULT_RULE), self[name], dmg, turns)
+        self[name] = (dmg, turns)
+
+    def rate(self):
+        return sum(effect[0] for effect in self._effects.values())
+
+    def next_expiry(self):
+        self._drop_stale()
+        return self._heap[0][0] - self._clock if self._heap else None
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap:
+            expires, seq, name = heap[0]
+            effect = self._effects.get(name)
+            if effect is not None and effect[2] == seq:
+                return
+            heapq.heappop(heap)
+
+    def tick(self, target, scale: float = 1.0):
+        total = 0.0
+        for dmg, _, _ in self._effects.values():
+            total += target.take_damage(dmg * scale)
+        self._clock += 1
+        expired = set()
+        heap = self._heap
+        while heap and heap[0][0] <= self._clock:
+            _, seq, name = heapq.heappop(heap)
+            effect = self._effects.get(name)
+            if effect is not None and effect[2] == seq:
+                expired.add(name)
+        if not expired:
+            return total, []
+        expired = [name for name in self._effects if name in expired]
+        for name in expired:
+            del self[name]
+        return total, expired
+
+
+class StatusScheduler:
+
+    def __init__(self):
+        self._afflicted = {}
+
+    def __len__(self):
+        return len(self._afflicted)
+
+    def track(self, entity):
+        if entity.has_status():
+            self._afflicted[id(entity)] = entity
+
+    def apply(self, entity, name: str, dmg: float, turns: int, rule: str = None):
+        entity.apply_status(name, dmg, turns, rule)
+        self._afflicted[id(entity)] = entity
+
+    def discard(self, entity):
+        self._afflicted.pop(id(entity), None)
+
+    def tick(self):
+        damage = {}
+        expired = []
+        for key, entity in list(self._afflicted.items()):
+            taken, ended = entity.tick_statuses()
+            damage[entity] = taken
+            if ended:
+                expired.extend((entity, name) for name in ended)
+            if not entity.has_status() or not entity.is_alive():
+                del self._afflicted[key]
+        return damage, expired
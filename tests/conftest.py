@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def settings():
+    from save import load
+    return load(os.path.join(ROOT, "difficulty.json"))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def pair():
+    from classes import Player, Stick
+    from rng import GameRng, using
+
+    def make(enemy_cls, lvl: int = 2, stick: bool = False):
+        with using(GameRng(0)):
+            player = Player(lvl=1, position=(0, 0))
+            if stick:
+                player._weapon = Stick((0, 0))
+            return player, enemy_cls(lvl, (0, 0))
+    return make
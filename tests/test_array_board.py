@@ -0,0 +1,76 @@
+import contextlib
+import io
+
+import pytest
+
+import game
+from array_board import ArrayBoard
+from classes import Board, Bow, Coins, Player, Rat, Tower, load_object
+
+
+def _level(settings, board_cls, size=(40, 60)):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return game.create_level("normal", board_cls=board_cls, size=size, settings=settings["normal"],
+                                 rng=game.GameRng(2))
+
+
+def _grid(board):
+    return board.to_dict()["grid"]
+
+
+def _layout(board):
+    return [[(cell["revealed"], cell["entity"] and cell["entity"]["class"]) for cell in row] for row in _grid(board)]
+
+
+def _render(board, player):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        board.render(player)
+    return out.getvalue()
+
+
+def test_same_level_as_board(settings):
+    board, player = _level(settings, Board)
+    array, array_player = _level(settings, ArrayBoard)
+    assert _layout(array) == _layout(board)
+    assert array.codes() == board.codes()
+    assert _render(array, array_player) == _render(board, player)
+
+
+def test_edits_match_board(settings):
+    board, player = _level(settings, Board)
+    array, array_player = _level(settings, ArrayBoard)
+    bow = Bow((7, 7))
+    for target in (board, array):
+        target.place(None, (5, 5))
+        target.place(Rat(2, (6, 6)), (6, 6))
+        target.place(bow, (7, 7))
+        target.place(Coins((30, 50)), (30, 50))
+        target.reveal_area((20, 20), 3)
+    assert _layout(array) == _layout(board)
+    assert array.entity_at((7, 7)) is bow
+    assert type(array.entity_at((6, 6))) is Rat
+    assert array.entity_at((5, 5)) is None
+    assert array.entity_at((-1, 0)) is None
+    assert array.revealed_count() == board.revealed_count()
+
+
+def test_entities_keep_their_state(settings):
+    array, player = _level(settings, ArrayBoard, size=(10, 10))
+    rat = Rat(3, (4, 4))
+    array.place(rat, (4, 4))
+    assert array.entity_at((4, 4)) is rat
+    tower = Tower((3, 3))
+    array.place(tower, (3, 3))
+    assert type(array.entity_at((3, 3))) is Tower
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_round_trip(settings, lazy):
+    array, player = _level(settings, ArrayBoard)
+    array.place(Rat(2, (6, 6)), (6, 6))
+    data = array.to_dict()
+    loaded = ArrayBoard.from_dict(data, lazy=lazy)
+    assert loaded.to_dict() == data
+    assert type(load_object(data)) is ArrayBoard
+    assert isinstance(loaded.entity_at((0, 0)), Player)
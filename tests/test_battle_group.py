@@ -0,0 +1,182 @@
+import contextlib
+import io
+
+import battle_group
+import game
+from battle_group import EnemyGroup, ACTIVE, DEAD, FLED
+from classes import Player, Rat, Spider, Skeleton, Stick
+from rng import GameRng, using, randint
+
+
+class _Board:
+
+    def __init__(self):
+        self.cleared = []
+
+    def place(self, entity, pos):
+        self.cleared.append(pos)
+
+
+def _fight(player, enemy, board=None, answer: str = "n"):
+    out = io.StringIO()
+    steps = game.battle_steps(player, enemy, board or _Board())
+    with contextlib.redirect_stdout(out):
+        try:
+            next(steps)
+            while True:
+                steps.send(answer)
+        except StopIteration:
+            pass
+    return out.getvalue()
+
+
+def test_status_death_ends_battle_before_player_attack():
+    with using(GameRng(1)):
+        player = Player(lvl=1, position=(0, 0))
+        rat = Rat(1, (0, 0))
+        rat._hp = 1.0
+        rat.apply_status("poison", 5.0, 3)
+        board = _Board()
+        text = _fight(player, rat, board)
+    assert "Враг повержен! +200 монет." in text
+    assert "Вы нанесли" not in text
+    assert player._coins == 200
+    assert not player.fight
+    assert rat._hp <= 0
+    assert board.cleared == [(0, 0)]
+
+
+def _collect(player, group):
+    steps = game.collect_dead_steps(player, group)
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def test_rewards_are_paid_as_enemies_die():
+    with using(GameRng(2)):
+        player = Player(lvl=1, position=(0, 0))
+        group = EnemyGroup([Rat(1, (0, 0)), Rat(2, (0, 1))])
+    group._hp[0] = 0.0
+    assert _collect(player, group) == group._reward[0]
+    assert player._coins == group._reward[0]
+    group._hp[1] = 0.0
+    player._hp = 0
+    assert _collect(player, group) == 0
+    assert player._coins == group._reward[0]
+
+
+def test_dead_player_is_not_paid():
+    with using(GameRng(1)):
+        player = Player(lvl=1, position=(0, 0))
+        player._hp = 1.0
+        player.apply_status("poison", 50.0, 2)
+        rat = Rat(1, (0, 0))
+        rat._hp = 0.5
+        _fight(player, rat)
+    assert not player.is_alive()
+    assert player._coins == 0
+    assert not player.fight
+
+
+def test_status_ticks_kill_only_afflicted_rows():
+    group = EnemyGroup([Spider(1, (0, 0)), Spider(1, (0, 1)), Spider(1, (0, 2))])
+    group._hp[1] = 2.0
+    group.apply_status(1, "poison", 5.0, 2)
+    group.apply_status(2, "poison", 1.0, 1)
+    damage = group.tick_statuses()
+    assert damage == 2.0 + 1.0 * 1.1
+    assert group.collect_dead() == [1]
+    assert group.active() == [0, 2]
+    assert group._state == [ACTIVE, DEAD, ACTIVE]
+    assert group.tick_statuses() == 0.0
+
+
+def test_flee_moves_target_to_next_enemy():
+    group = EnemyGroup([Rat(1, (0, 0)), Rat(2, (0, 1))])
+    group.flee(0)
+    group.flee(0)
+    assert len(group) == 1
+    assert group._state[0] == FLED
+    assert group.target_hp() == group._hp[1]
+    group.target().take_damage(1000)
+    assert group.collect_dead() == [1]
+    assert len(group) == 0
+
+
+def test_summons_join_and_sync_writes_back():
+    spider = Spider(2, (0, 0))
+    group = EnemyGroup([spider])
+    group.summon([0, 0])
+    assert len(group) == 3
+    assert group.source(1) is None
+    assert group.payout([0, 1, 2]) == 3 * spider._reward_coins
+    group.target().take_damage(10)
+    group.apply_status(0, "poison", 3.0, 4)
+    group.sync()
+    assert spider._hp == group._hp[0]
+    assert spider._statuses["poison"] == (3.0, 4)
+
+
+def test_group_attack_rolls_within_bounds():
+    with using(GameRng(2)):
+        player = Player(lvl=1, position=(0, 0))
+        player._hp = 10 ** 6
+        enemies = [Rat(1, (0, 0)) for _ in range(20)] + [Skeleton(1, (0, 0))]
+        group = EnemyGroup(enemies)
+        total, hits = group.attack(player, group.active())
+    high = 20 * int(enemies[0]._max_enemy_damage) + int(enemies[-1]._weapon._max_damage)
+    assert hits == 21
+    assert 0 <= total <= high
+    assert player._hp == 10 ** 6 - total
+
+
+def test_single_enemy_battle_pays_once():
+    with using(GameRng(5)):
+        player = Player(lvl=5, position=(0, 0))
+        player._weapon = Stick((0, 0))
+        player._hp = 500
+        rat = Rat(1, (0, 0))
+        text = _fight(player, rat)
+    assert player.is_alive()
+    assert rat._hp <= 0 or "Крыса сбежала!" in text
+    assert player._coins in (0, 200)
+
+
+def test_single_attacker_draws_like_a_lone_enemy():
+    with using(GameRng(11)):
+        player = Player(lvl=1, position=(0, 0))
+        rat = Rat(3, (0, 0))
+        group = EnemyGroup([rat])
+        totals = [group.attack(player, [0])[0] for _ in range(50)]
+    with using(GameRng(11)):
+        Player(lvl=1, position=(0, 0))
+        Rat(3, (0, 0))
+        expected = [randint(0, int(rat._max_enemy_damage)) for _ in range(50)]
+    assert totals == expected
+
+
+def _columns_run(vector_min, monkeypatch):
+    monkeypatch.setattr(battle_group, "VECTOR_MIN", vector_min)
+    with using(GameRng(9)):
+        group = EnemyGroup([Spider(randint(1, 5), (0, i)) for i in range(40)])
+        log = []
+        for turn in range(12):
+            for row in group.active()[::3]:
+                group.apply_status(row, "poison", 4.0 + turn, 2)
+            if turn % 4 == 0:
+                group.summon(group.active()[:10])
+            group.target().take_damage(60)
+            log.append((group.tick_statuses(), group.collect_dead(), group.below(group.active(), 0.5),
+                        group.total_hp(), group.target_hp()))
+            if group.active():
+                group.flee(group.active()[-1])
+    return log, [float(hp) for hp in group._hp[:len(group._kinds)]], group._state
+
+
+def test_vectorized_columns_match_row_loops(monkeypatch):
+    vector = _columns_run(32, monkeypatch)
+    rows = _columns_run(10 ** 9, monkeypatch)
+    assert vector == rows
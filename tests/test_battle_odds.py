@@ -0,0 +1,73 @@
+import contextlib
+import io
+
+import pytest
+
+import game
+from battle_odds import battle_odds, battle_key, state_space, cache_info, clear_cache, MAX_STATES
+from classes import Rat, Spider, Skeleton
+from rng import GameRng, using
+
+
+@pytest.mark.parametrize("enemy_cls", [Rat, Spider, Skeleton])
+def test_distributions_are_normalised(pair, enemy_cls):
+    odds = battle_odds(*pair(enemy_cls))
+    assert odds["exact"]
+    assert odds["win"] + odds["loss"] + odds["fled"] + odds["timeout"] == pytest.approx(1.0)
+    assert sum(odds["turns"].values()) == pytest.approx(1.0, abs=1e-9)
+    assert sum(odds["hp_left"].values()) == pytest.approx(1.0, abs=1e-9)
+
+
+@pytest.mark.parametrize("enemy_cls, stick", [(Rat, False), (Spider, False), (Skeleton, False), (Rat, True)])
+def test_exact_odds_match_monte_carlo(pair, enemy_cls, stick):
+    battle_sim = pytest.importorskip("battle_sim")
+    player, enemy = pair(enemy_cls, stick=stick)
+    odds = battle_odds(player, enemy)
+    sample = battle_sim.summarize(battle_sim.simulate_battles(player, enemy, 40_000, rng=1))
+    assert odds["win"] == pytest.approx(sample["win_rate"], abs=0.015)
+    assert odds["loss"] == pytest.approx(sample["loss_rate"], abs=0.015)
+    assert odds["fled"] == pytest.approx(sample["fled_rate"], abs=0.015)
+    assert odds["mean_turns"] == pytest.approx(sample["mean_turns"], rel=0.03)
+    assert odds["mean_hp_left"] == pytest.approx(sample["mean_hp_left"], rel=0.05, abs=0.5)
+
+
+def test_results_are_cached(pair):
+    clear_cache()
+    player, enemy = pair(Rat)
+    battle_odds(player, enemy)
+    battle_odds(player, enemy)
+    info = cache_info()
+    assert info.hits == 1 and info.misses == 1
+
+
+def test_huge_state_space_falls_back_to_sampling(pair):
+    player, enemy = pair(Rat)
+    player._hp = 10 ** 7
+    assert state_space(battle_key(player, enemy)) > MAX_STATES
+    odds = battle_odds(player, enemy)
+    if odds is not None:
+        assert not odds["exact"]
+        assert odds["win"] + odds["fled"] == pytest.approx(1.0)
+
+
+def _battle_output(player, enemy):
+    class _Board:
+        def place(self, entity, pos):
+            pass
+
+    out = io.StringIO()
+    steps = game.battle_steps(player, enemy, _Board())
+    with contextlib.redirect_stdout(out), using(GameRng(1)):
+        try:
+            next(steps)
+            while True:
+                steps.send("n")
+        except StopIteration:
+            pass
+    return out.getvalue()
+
+
+def test_odds_are_opt_in(pair, monkeypatch):
+    assert "Шансы" not in _battle_output(*pair(Rat))
+    monkeypatch.setattr(game, "SHOW_ODDS", True)
+    assert "Шансы без бонусов: победа" in _battle_output(*pair(Rat))
@@ -0,0 +1,62 @@
+import builtins
+import contextlib
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import game
+from battle_sim import BattlePolicy, simulate_battles, summarize, WIN, LOSS, FLED
+from classes import Board, Rat, Spider, Skeleton, Medkit
+from rng import GameRng, using
+
+
+def _interactive(pair, enemy_cls, n: int, monkeypatch):
+    monkeypatch.setattr(builtins, "input", lambda *args: "n")
+    board = Board(1, 1)
+    wins = 0
+    with contextlib.redirect_stdout(io.StringIO()), using(GameRng(7)):
+        for _ in range(n):
+            player, enemy = pair(enemy_cls, 3)
+            game.start_battle(player, enemy, board)
+            wins += player.is_alive() and not enemy.is_alive()
+    return wins / n
+
+
+@pytest.mark.parametrize("enemy_cls", [Rat, Skeleton])
+def test_matches_interactive_battles(pair, enemy_cls, monkeypatch):
+    sample = summarize(simulate_battles(*pair(enemy_cls, 3), 20_000, rng=1))
+    assert sample["win_rate"] == pytest.approx(_interactive(pair, enemy_cls, 1500, monkeypatch), abs=0.035)
+
+
+def test_spider_summons_are_not_simulated(pair, monkeypatch):
+    sample = summarize(simulate_battles(*pair(Spider, 3), 20_000, rng=1))
+    assert sample["win_rate"] >= _interactive(pair, Spider, 1500, monkeypatch) - 0.01
+
+
+def test_same_seed_same_result(pair):
+    first = simulate_battles(*pair(Rat, 3), 1000, rng=GameRng(3))
+    second = simulate_battles(*pair(Rat, 3), 1000, rng=GameRng(3))
+    for key in first:
+        assert np.array_equal(first[key], second[key])
+
+
+def test_outcomes_are_consistent(pair):
+    player, enemy = pair(Spider, 3)
+    hp = player._hp
+    result = simulate_battles(player, enemy, 5000, rng=2)
+    assert player._hp == hp and enemy._hp == enemy._max_hp
+    assert set(np.unique(result["winner"])) <= {WIN, LOSS, FLED}
+    assert (result["player_hp"][result["winner"] == LOSS] == 0).all()
+    assert (result["enemy_hp"][result["winner"] == WIN] == 0).all()
+    assert (result["turns"] >= 1).all()
+
+
+def test_policy_spends_medkits(pair):
+    player, enemy = pair(Rat, 5)
+    player._inventory["Medkit"].extend(Medkit((0, 0)) for _ in range(3))
+    passive = summarize(simulate_battles(player, enemy, 5000, rng=4))
+    healing = simulate_battles(player, enemy, 5000, policy=BattlePolicy(auto_buy=()), rng=4)
+    assert healing["used_Medkit"].max() <= 3 and healing["used_Medkit"].any()
+    assert summarize(healing)["win_rate"] > passive["win_rate"]
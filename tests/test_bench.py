@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+import bench
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def paths(monkeypatch):
+    monkeypatch.setattr(bench, "DIFFICULTY_PATH", os.path.join(ROOT, "difficulty.json"))
+    monkeypatch.setattr(bench, "BASELINE_PATH", os.path.join(ROOT, "bench_baseline.json"))
+
+
+def _report(**results):
+    return {"results": {key: {"best": best, "reference": reference} for key, (best, reference) in results.items()}}
+
+
+def test_compare_scales_by_machine_speed():
+    baseline = _report(a=(1.0, 1.0), b=(1.0, 1.0), c=(2.0, 1.0))
+    report = _report(a=(2.4, 2.0), b=(4.0, 2.0), c=(4.0, 2.2), d=(9.0, 2.0))
+    assert bench.speed(report, baseline) == 2.0
+    assert bench.compare(report, baseline) == [("b", 1.0, 4.0, 2.0)]
+    assert bench.compare(report, baseline, tolerance=0.1) == [("a", 1.0, 2.4, pytest.approx(1.2)),
+                                                              ("b", 1.0, 4.0, 2.0)]
+    assert bench.speed(_report(x=(1.0, 1.0)), baseline) == 1.0
+
+
+def test_remeasure_keeps_the_faster_result(paths):
+    report = {"results": {"render@5": {"best": 10.0, "reference": 1.0},
+                          "to_dict@5": {"best": 0.0, "reference": 1.0}}}
+    bench.remeasure(report, ["render@5", "to_dict@5"], min_time=0.01)
+    assert report["results"]["render@5"]["best"] < 10.0
+    assert report["results"]["to_dict@5"]["best"] == 0.0
+
+
+def test_measure_reports_per_op_time():
+    calls = []
+    result = bench.measure(lambda: calls.append(1), ops=10, min_time=0.01)
+    assert 3 <= result["runs"] <= len(calls)
+    assert 0 < result["best"] <= result["median"]
+    assert result["reference"] > 0
+
+
+def test_suite_covers_every_benchmark(paths):
+    report = bench.run_suite(sizes=(5,), min_time=0.01)
+    assert set(report["results"]) == {f"{name}@5" for name in bench.BENCHMARKS}
+    array = bench.run_suite(sizes=(5,), names=["render"], min_time=0.01, board="array")
+    assert set(array["results"]) == {"render@5/array"}
+
+
+def test_head_is_within_baseline(paths):
+    with open(bench.BASELINE_PATH, encoding="utf-8") as file:
+        baseline = json.load(file)
+    report = bench.run_suite(sizes=(5,), min_time=0.1)
+    assert set(report["results"]) <= set(baseline["results"])
+    assert bench.compare(report, baseline, tolerance=2.0) == []
+
+
+def test_main_saves_and_checks_baseline(paths, capsys):
+    args = ["--sizes", "5", "--only", "tower_interact,render", "--min-time", "0.01", "--baseline", "base.json"]
+    assert bench.main(args + ["--save-baseline"]) == 0
+    with open("base.json", encoding="utf-8") as file:
+        assert set(json.load(file)["results"]) == {"tower_interact@5", "render@5"}
+    assert bench.main(args + ["--tolerance", "5"]) == 0
+    assert bench.main(["--only", "nope"]) == 2
@@ -0,0 +1,61 @@
+import builtins
+from multiprocessing import Pool
+
+import pytest
+
+import calibrate
+import game
+
+
+def test_runs_are_reproducible(settings):
+    first = calibrate.play_run("normal", settings["normal"], seed=3, max_levels=2, max_turns=300)
+    second = calibrate.play_run("normal", settings["normal"], seed=3, max_levels=2, max_turns=300)
+    assert first == second
+    assert 0 <= first["levels"] <= 2 and len(first["coins"]) == first["levels"]
+    assert first["survived"] == (first["levels"] >= 2)
+
+
+def test_candidate_settings_apply_to_every_level(settings):
+    empty = dict(settings["easy"], board_min=3, board_max=3, enemy_multiplier=0.0)
+    result = calibrate.play_run("easy", empty, seed=2, max_levels=3, max_turns=100)
+    assert result["survived"] and result["turns"] == 12
+
+
+def test_headless_restores_game(settings):
+    saved = (builtins.input, game.create_level, game.save_game, game.save_record, game.load_record)
+    calibrate.play_run("easy", settings["easy"], seed=1, max_levels=1, max_turns=100)
+    assert (builtins.input, game.create_level, game.save_game, game.save_record, game.load_record) == saved
+
+
+def test_wilson_interval():
+    assert calibrate.wilson(0, 0) == (0.0, 0.0, 1.0)
+    p, low, high = calibrate.wilson(60, 100)
+    assert p == 0.6 and low == pytest.approx(0.502, abs=1e-3) and high == pytest.approx(0.691, abs=1e-3)
+    p, low, high = calibrate.wilson(100, 100)
+    assert p == 1.0 and low < 1.0 and high == pytest.approx(1.0)
+
+
+def test_summarize():
+    results = [
+        {"levels": 2, "survived": True, "turns": 40, "coins": [10, 30]},
+        {"levels": 1, "survived": False, "turns": 20, "coins": [20]},
+    ]
+    stats = calibrate.summarize(results, max_levels=2)
+    assert stats["runs"] == 2 and stats["survival"][0] == 0.5
+    assert stats["levels"][0] == 1.5 and stats["turns"][0] == 30
+    assert [(point["runs"], point["coins"]) for point in stats["coins"]] == [(2, 15), (1, 30)]
+
+
+def test_scaled_moves_pressure(settings):
+    harder = calibrate.scaled(settings["normal"], 2.0)
+    assert harder["enemy_multiplier"] == pytest.approx(settings["normal"]["enemy_multiplier"] * 2, abs=1e-4)
+    assert harder["bonus_multiplier"] == pytest.approx(settings["normal"]["bonus_multiplier"] / 2, abs=1e-4)
+    assert harder["board_min"] == settings["normal"]["board_min"]
+
+
+def test_parallel_matches_serial(settings):
+    with Pool(2) as pool:
+        stats = calibrate.run_many(pool, "easy", settings["easy"], runs=6, max_levels=1, max_turns=200)
+    serial = [calibrate.play_run("easy", settings["easy"], seed, 1, 200) for seed in range(6)]
+    assert stats["runs"] == 6
+    assert stats["survival"][0] == sum(result["survived"] for result in serial) / 6
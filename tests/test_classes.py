@@ -0,0 +1,40 @@
+from classes import Tower, Rat, Skeleton, Medkit, load_object
+from rng import GameRng, using, current
+
+
+def test_entities_have_no_instance_dict():
+    for entity in (Rat(1, (0, 0)), Skeleton(1, (0, 0)), Medkit((0, 0))):
+        assert not hasattr(entity, "__dict__")
+
+
+def test_tower_is_shared():
+    assert Tower((0, 0)) is Tower((3, 4))
+    assert load_object({"class": "tower", "position": [1, 1]}) is Tower()
+
+
+def test_skeleton_weapon_does_not_touch_session_rng():
+    with using(GameRng(7)):
+        skeleton = Skeleton(2, (1, 1))
+        state = current().getstate()
+        weapon = skeleton._weapon
+        assert current().getstate() == state
+    assert skeleton._weapon is weapon
+
+
+def test_skeleton_weapon_does_not_depend_on_read_time():
+    with using(GameRng(7)):
+        early = Skeleton(2, (1, 1))
+        early_weapon = early._weapon.to_dict()
+    with using(GameRng(7)):
+        late = Skeleton(2, (1, 1))
+        for _ in range(10):
+            current().random()
+        late_weapon = late._weapon.to_dict()
+    assert early_weapon == late_weapon
+
+
+def test_skeleton_round_trip_keeps_weapon():
+    with using(GameRng(3)):
+        skeleton = Skeleton(1, (2, 2))
+    data = skeleton.to_dict()
+    assert load_object(data).to_dict() == data
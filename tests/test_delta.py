@@ -0,0 +1,122 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+import game
+from array_board import ArrayBoard
+from classes import Board, Coins, Rat
+from delta import encode_delta, decode_delta, is_fresh
+from roaming import Roamer
+from rng import GameRng, using
+from save import save_game, load_game
+from save_bin import SaveFormatError
+
+
+def _level(settings, board_cls=Board, rng=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return game.create_level("normal", board_cls=board_cls, settings=settings["normal"],
+                                 rng=rng or GameRng(21).split("level", 1))
+
+
+def _play(board, player):
+    board.place(None, (0, 0))
+    player._position = (1, 1)
+    board.place(player, (1, 1))
+    board.place(Coins((2, 0)), (2, 0))
+    board.place(Rat(3, (0, 2)), (0, 2))
+    board.reveal_area((3, 3), 2)
+    player._coins = 42
+
+
+def test_is_fresh_only_for_unused_rng():
+    rng = GameRng(5)
+    assert is_fresh(rng)
+    rng.random()
+    assert not is_fresh(rng)
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_delta_round_trip(settings, board_cls):
+    board, player = _level(settings, board_cls)
+    assert board.generation() is not None
+    _play(board, player)
+    data = json.loads(json.dumps(encode_delta(board, player)))
+    assert data["class"] == "delta"
+    assert len(data["cells"]) < board._rows * board._cols // 4
+    restored = decode_delta(data, player)
+    assert restored.to_dict() == board.to_dict()
+    assert restored.entity_at((1, 1)) is player
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+@pytest.mark.parametrize("seed", [6, 11])
+def test_delta_keeps_hidden_cells_hidden(settings, board_cls, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board, player = game.create_level("hard", board_cls=board_cls, size=(30, 30), settings=settings["hard"],
+                                          rng=GameRng(seed))
+    hidden = [(r, c) for r in range(29, 14, -1) for c in range(29, 14, -1) if not board.is_revealed((r, c))][:5]
+    for pos in hidden:
+        board.place(Rat(3, pos), pos, reveal=False)
+    assert hidden and all(not board.is_revealed(pos) for pos in board.delta())
+    restored = decode_delta(json.loads(json.dumps(encode_delta(board, player))), player)
+    assert restored._fog.to_bytes() == board._fog.to_bytes()
+    assert restored.codes() == board.codes()
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+@pytest.mark.parametrize("seed", [6, 11])
+def test_delta_keeps_roamed_cells_hidden(settings, board_cls, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board, player = game.create_level("hard", board_cls=board_cls, size=(30, 30), settings=settings["hard"],
+                                          rng=GameRng(seed))
+    roamer = Roamer(board, GameRng(seed))
+    for turn in range(40):
+        roamer.step((15, 15 + turn % 3))
+    assert any(not board.is_revealed(pos) for pos in board.delta())
+    restored = decode_delta(json.loads(json.dumps(encode_delta(board, player))), player)
+    assert restored._fog.to_bytes() == board._fog.to_bytes()
+    assert restored.codes() == board.codes()
+
+
+def test_used_rng_falls_back_to_full_board(settings):
+    rng = GameRng(21)
+    rng.random()
+    board, player = _level(settings, rng=rng)
+    assert board.generation() is None
+    assert encode_delta(board, player) == board.to_dict()
+
+
+def test_changed_generation_is_rejected(settings):
+    board, player = _level(settings)
+    data = encode_delta(board, player)
+    data["generation"]["seed"] += 1
+    with pytest.raises(SaveFormatError):
+        decode_delta(data, player)
+
+
+def test_delta_save_game_round_trip(settings, workdir):
+    board, player = _level(settings)
+    _play(board, player)
+    save_game(player, board, 3, "normal", fmt="delta")
+    assert (workdir / "save.delta.json").exists()
+    data, found = load_game()
+    assert found
+    assert data["current_level"] == 3
+    assert data["player"]._coins == 42
+    assert data["board"].to_dict() == board.to_dict()
+
+
+def test_array_board_cells_do_not_depend_on_read_order(settings):
+    first, _ = _level(settings, ArrayBoard)
+    second, _ = _level(settings, ArrayBoard)
+    cells = [(r, c) for r in range(first._rows) for c in range(first._cols)]
+    with using(GameRng(1)) as rng:
+        state = rng.getstate()
+        for pos in cells:
+            first.entity_at(pos)
+        assert rng.getstate() == state
+        for pos in reversed(cells):
+            second.entity_at(pos)
+    assert first.to_dict() == second.to_dict()
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from classes import Board, Player, Tower
+from fog import FogOfWar
+
+
+def _cells(fog):
+    return {(r, c) for r in range(fog._rows) for c in range(fog._cols) if fog.is_revealed((r, c))}
+
+
+def _area(pos, radius, rows, cols):
+    r, c = pos
+    return {(nr, nc) for nr in range(r - radius, r + radius + 1) for nc in range(c - radius, c + radius + 1)
+            if 0 <= nr < rows and 0 <= nc < cols}
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (7, 13), (40, 65)])
+def test_matches_set_of_cells(rows, cols):
+    choices = random.Random(rows * cols)
+    fog = FogOfWar(rows, cols)
+    expected = set()
+    for _ in range(60):
+        pos = (choices.randrange(-2, rows + 2), choices.randrange(-2, cols + 2))
+        kind = choices.randrange(3)
+        if kind == 0:
+            radius = choices.randrange(4)
+            changes = set()
+            added = fog.reveal_area(pos, radius, changes)
+            assert changes == _area(pos, radius, rows, cols) - expected
+            assert added == len(changes)
+            expected |= changes
+        elif kind == 1:
+            assert fog.reveal(pos) == (pos in _area(pos, 0, rows, cols) and pos not in expected)
+            expected |= _area(pos, 0, rows, cols)
+        else:
+            r = choices.randrange(rows)
+            mask = choices.getrandbits(cols + 3)
+            fog.reveal_rows([(r, mask)])
+            expected |= {(r, c) for c in range(cols) if mask >> c & 1}
+        assert _cells(fog) == expected
+        assert fog.count() == len(expected)
+        if expected:
+            assert fog.bounds() == (min(r for r, c in expected), min(c for r, c in expected),
+                                    max(r for r, c in expected), max(c for r, c in expected))
+
+
+def test_reveal_area_covers_the_square():
+    fog = FogOfWar(10, 10)
+    fog.reveal_area((0, 9), 2)
+    assert _cells(fog) == _area((0, 9), 2, 10, 10)
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (3, 5), (17, 31), (64, 64)])
+def test_bytes_round_trip(rows, cols):
+    fog = FogOfWar(rows, cols)
+    choices = random.Random(cols)
+    fog.reveal_rows((r, choices.getrandbits(cols)) for r in range(rows))
+    data = fog.to_bytes()
+    assert len(data) == (rows * cols + 7) // 8
+    loaded = FogOfWar.from_bytes(rows, cols, data)
+    assert _cells(loaded) == _cells(fog) and loaded.count() == fog.count()
+
+
+def test_copy_is_independent():
+    fog = FogOfWar(5, 5)
+    fog.reveal((1, 1))
+    copy = fog.copy()
+    copy.reveal((2, 2))
+    assert _cells(fog) == {(1, 1)} and _cells(copy) == {(1, 1), (2, 2)}
+
+
+def test_tower_reveals_radius_and_reports_changes():
+    board = Board(6, 6)
+    changes = board.watch()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Tower().interact(board, (5, 0))
+    assert changes == _area((5, 0), 2, 6, 6)
+    assert board.revealed_count() == 9
+    assert Tower() is Tower((1, 1))
+
+
+def test_tower_defaults_to_players_cell():
+    board = Board(6, 6)
+    board.place(Tower((2, 3)), (2, 3), reveal=False)
+    player = Player(lvl=1, position=(2, 2))
+    with contextlib.redirect_stdout(io.StringIO()):
+        player.move(0, 1, board)
+        board.entity_at(player.position).interact(board)
+    assert _cells(board._fog) == _area((2, 3), 2, 6, 6)
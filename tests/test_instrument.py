@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+import game
+import instrument
+from rng import GameRng
+
+
+@pytest.fixture
+def enabled():
+    instrument.reset()
+    instrument.enable(dump_on_exit=False)
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def test_disabled_records_nothing():
+    instrument.reset()
+    with instrument.phase("draw"):
+        pass
+    instrument.count("battles")
+    assert instrument.phase("draw") is instrument.phase("render")
+    assert instrument.stats() == {"phases": {}, "counters": {}}
+
+
+def test_histogram_percentiles():
+    histogram = instrument.Histogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    summary = histogram.summary()
+    assert summary["count"] == 100 and summary["max"] == 0.1
+    assert summary["mean"] == pytest.approx(0.0505)
+    assert summary["p50"] == pytest.approx(0.050, rel=0.1)
+    assert summary["p99"] == pytest.approx(0.099, rel=0.1)
+    assert summary["p50"] <= summary["p95"] <= summary["p99"] <= summary["max"]
+    assert instrument.Histogram().percentile(0.5) == 0.0
+
+
+def test_phases_counters_and_dump(enabled):
+    @instrument.timed("work")
+    def work(value):
+        return value * 2
+
+    assert work(3) == 6
+    with instrument.phase("draw"):
+        pass
+    instrument.count("battles", 2)
+    instrument.dump("out.json")
+    with open("out.json", encoding="utf-8") as file:
+        data = json.load(file)
+    assert data["phases"]["work"]["count"] == 1 and data["phases"]["draw"]["count"] == 1
+    assert data["counters"] == {"battles": 2}
+
+
+def test_session_reports_turn_phases(enabled, settings):
+    session = game.GameSession(game.new_game_steps(settings=settings), GameRng(3))
+    session.start()
+    for command in ["easy", "d", "s", "d", "s"]:
+        session.send(command)
+    phases = instrument.stats()["phases"]
+    assert phases["step"]["count"] == 6
+    assert phases["draw"]["count"] >= 4 and phases["create_level"]["count"] == 1
+
+
+def test_profiled_writes_stats():
+    with instrument.profiled("game.prof"):
+        sum(range(1000))
+    assert os.path.getsize("game.prof") > 0
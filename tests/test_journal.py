@@ -0,0 +1,193 @@
+import contextlib
+import io
+import os
+
+import game
+import save
+from classes import Coins
+from journal import JOURNAL_PATH, MoveJournal, read_journal
+from rng import GameRng
+from save_writer import SaveWriter
+
+
+def _level(settings):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return game.create_level("normal", size=(8, 8), settings=settings["normal"], rng=GameRng(3))
+
+
+def _move(board, player, pos):
+    board.place(None, player.position)
+    player._position = pos
+    board.place(player, pos)
+    player._coins += 5
+
+
+def _walk(journal, board, player, steps):
+    for pos in steps:
+        _move(board, player, pos)
+        journal.record("d", player, board, 1, "normal")
+
+
+def test_crash_recovers_from_journal(settings):
+    board, player = _level(settings)
+    journal = MoveJournal(save.save_game, fsync=False)
+    journal.checkpoint(player, board, 1, "normal")
+    _walk(journal, board, player, [(0, 1), (1, 1), (1, 2)])
+    board.place(Coins((5, 5)), (5, 5))
+    journal.record("take", player, board, 1, "normal")
+    journal.close()
+
+    data, found = save.load_game()
+    assert found
+    assert data["player"].to_dict() == player.to_dict()
+    assert data["board"].to_dict() == board.to_dict()
+    assert data["board"].entity_at((1, 2)) is data["player"]
+
+
+def test_records_only_changed_cells(settings):
+    board, player = _level(settings)
+    journal = MoveJournal(save.save_game, fsync=False)
+    journal.attach(board)
+    _walk(journal, board, player, [(0, 1)])
+    journal.close()
+    entry, = read_journal()
+    assert sorted((r, c) for r, c, _, _ in entry["cells"]) == [(0, 0), (0, 1)]
+    assert entry["turn"] == 1 and entry["cmd"] == "d"
+
+
+def test_torn_tail_is_ignored(settings):
+    board, player = _level(settings)
+    journal = MoveJournal(save.save_game, fsync=False)
+    journal.checkpoint(player, board, 1, "normal")
+    _walk(journal, board, player, [(0, 1), (1, 1)])
+    journal.close()
+    with open(JOURNAL_PATH, "a", encoding="utf-8") as file:
+        file.write('{"turn": 3, "lev')
+    assert len(read_journal()) == 2
+    data, found = save.load_game()
+    assert data["player"].position == (1, 1)
+
+
+def test_checkpoint_truncates(settings):
+    board, player = _level(settings)
+    journal = MoveJournal(save.save_game, checkpoint_every=3, fsync=False)
+    journal.checkpoint(player, board, 1, "normal")
+    _walk(journal, board, player, [(0, 1), (1, 1), (1, 2), (2, 2)])
+    journal.close()
+    assert len(read_journal()) == 1
+    data, found = save.load_game()
+    assert data["player"].to_dict() == player.to_dict()
+
+
+def test_async_checkpoint_keeps_old_entries_until_written(settings):
+    board, player = _level(settings)
+    writer = SaveWriter()
+    try:
+        save.ASYNC_WRITER = writer
+        journal = MoveJournal(save.save_game, checkpoint_every=2, fsync=False, writer=writer)
+        journal.checkpoint(player, board, 1, "normal")
+        writer.flush()
+        _walk(journal, board, player, [(0, 1), (1, 1)])
+        assert len(read_journal()) == 2 and os.path.exists(JOURNAL_PATH + ".old")
+        writer.flush()
+        _walk(journal, board, player, [(1, 2)])
+        journal.close()
+        assert not os.path.exists(JOURNAL_PATH + ".old") and len(read_journal()) == 1
+        data, found = save.load_game()
+        assert data["player"].to_dict() == player.to_dict()
+    finally:
+        save.ASYNC_WRITER = None
+        writer.close()
+
+
+def test_new_game_does_not_replay_previous_journal(settings):
+    board, player = _level(settings)
+    journal = MoveJournal(save.save_game, fsync=False)
+    journal.start(player, board, 1, "normal")
+    _walk(journal, board, player, [(0, 1), (1, 1)])
+    journal.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        other, other_player = game.create_level("easy", size=(6, 6), settings=settings["easy"], rng=GameRng(4))
+    save.save_game(other_player, other, 1, "easy")
+    data, found = save.load_game()
+    assert data["board"].to_dict() == other.to_dict()
+    assert data["player"].to_dict() == other_player.to_dict()
+
+    journal = MoveJournal(save.save_game, fsync=False)
+    journal.start(other_player, other, 1, "easy")
+    _walk(journal, other, other_player, [(0, 1)])
+    journal.close()
+    data, found = save.load_game()
+    assert data["board"].to_dict() == other.to_dict()
+    assert data["player"].position == (0, 1) and len(read_journal()) == 1
+
+
+def test_start_drops_stale_old_journal(settings):
+    board, player = _level(settings)
+    with open(JOURNAL_PATH + ".old", "w", encoding="utf-8") as file:
+        file.write('{"checkpoint":"stale","turn":1,"level":1,"difficulty":"normal","cmd":"d","player":{},"cells":[]}\n')
+    writer = SaveWriter()
+    try:
+        save.ASYNC_WRITER = writer
+        journal = MoveJournal(save.save_game, checkpoint_every=2, fsync=False, writer=writer)
+        journal.start(player, board, 1, "normal")
+        assert not os.path.exists(JOURNAL_PATH + ".old") and read_journal() == []
+        _walk(journal, board, player, [(0, 1), (1, 1), (1, 2), (2, 2)])
+        journal.close()
+        assert [entry["turn"] for entry in read_journal()] == [3, 4]
+        writer.flush()
+        data, found = save.load_game()
+        assert data["player"].to_dict() == player.to_dict()
+    finally:
+        save.ASYNC_WRITER = None
+        writer.close()
+
+
+class _StalledWriter:
+
+    def done(self, ticket):
+        return False
+
+    def flush(self):
+        pass
+
+
+def test_unwritten_checkpoint_chains_to_loaded_save(settings):
+    board, player = _level(settings)
+    saves = []
+
+    def save_fn(*args, **kwargs):
+        saves.append(kwargs["checkpoint"])
+        if len(saves) == 1:
+            save.save_game(*args, **kwargs)
+        return len(saves)
+
+    journal = MoveJournal(save_fn, checkpoint_every=2, fsync=False, writer=_StalledWriter())
+    journal.start(player, board, 1, "normal")
+    _walk(journal, board, player, [(0, 1), (1, 1), (1, 2)])
+    journal.close()
+    assert len(saves) == 2 and os.path.exists(JOURNAL_PATH + ".old")
+    data, found = save.load_game()
+    assert data["checkpoint"] == saves[0]
+    assert data["player"].to_dict() == player.to_dict()
+    assert data["board"].to_dict() == board.to_dict()
+
+
+def test_replay_keeps_hidden_cells_hidden(settings):
+    for fmt in ("binary", "json"):
+        board, player = _level(settings)
+        hidden = next((r, c) for r in range(7, 1, -1) for c in range(7, 1, -1) if not board.is_revealed((r, c)))
+        save.set_save_format(fmt)
+        try:
+            journal = MoveJournal(save.save_game, fsync=False)
+            journal.start(player, board, 1, "normal")
+            board.place(Coins(hidden), hidden, reveal=False)
+            _walk(journal, board, player, [(0, 1)])
+            journal.close()
+            data, found = save.load_game()
+        finally:
+            save.set_save_format("binary")
+        assert not data["board"].is_revealed(hidden)
+        assert data["board"]._fog.to_bytes() == board._fog.to_bytes()
+        assert type(data["board"].entity_at(hidden)) is Coins
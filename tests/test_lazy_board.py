@@ -0,0 +1,66 @@
+import contextlib
+import io
+
+import pytest
+
+import game
+from array_board import ArrayBoard
+from classes import Board, RawCell, Medkit
+from rng import GameRng, using, current
+
+
+def _level(settings, board_cls):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board, player = game.create_level("hard", board_cls=board_cls, size=(20, 30), settings=settings["hard"],
+                                          rng=GameRng(8))
+    board.reveal_area((5, 5), 3)
+    return board
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_lazy_from_dict_round_trips(settings, board_cls):
+    data = _level(settings, board_cls).to_dict()
+    lazy = board_cls.from_dict(data)
+    eager = board_cls.from_dict(data, lazy=False)
+    assert lazy.to_dict() == data
+    assert eager.to_dict() == data
+    assert lazy.codes() == eager.codes()
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_cells_stay_raw_until_read(settings, board_cls):
+    data = _level(settings, board_cls).to_dict()
+    board = board_cls.from_dict(data)
+    pos = next((r, c) for r in range(board._rows) for c in range(board._cols)
+               if data["grid"][r][c]["entity"] and data["grid"][r][c]["entity"]["class"] != "tower")
+    raw = board._grid[pos[0]][pos[1]] if board_cls is Board else board._state[pos[0] * board._cols + pos[1]]
+    assert type(raw) is RawCell
+    entity = board.entity_at(pos)
+    assert type(entity) is not RawCell
+    assert board.entity_at(pos) is entity
+    assert entity.to_dict() == data["grid"][pos[0]][pos[1]]["entity"]
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_touched_cells_are_reencoded(settings, board_cls):
+    data = _level(settings, board_cls).to_dict()
+    board = board_cls.from_dict(data)
+    board.place(Medkit((1, 1)), (1, 1))
+    out = board.to_dict()
+    assert out["grid"][1][1]["entity"]["class"] == Medkit((1, 1)).to_dict()["class"]
+    assert out["grid"][1][1]["revealed"]
+    for r, row in enumerate(out["grid"]):
+        for c, cell in enumerate(row):
+            if (r, c) != (1, 1):
+                assert cell == data["grid"][r][c]
+
+
+def test_decoding_does_not_touch_session_rng(settings):
+    data = _level(settings, Board).to_dict()
+    with using(GameRng(3)):
+        board = Board.from_dict(data)
+        state = current().getstate()
+        for r in range(board._rows):
+            for c in range(board._cols):
+                board.entity_at((r, c))
+        assert current().getstate() == state
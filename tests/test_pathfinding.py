@@ -0,0 +1,118 @@
+import contextlib
+import heapq
+import io
+import random
+
+import game
+from classes import Board, Coins, Player, Rat
+from pathfinding import DIRECTIONS, ENEMY_COST, FOG_COST, STEP_COST, DistanceField, PathFinder
+
+
+def _cost(board, pos):
+    if not board.is_revealed(pos):
+        return FOG_COST
+    return ENEMY_COST if isinstance(board.entity_at(pos), Rat) else STEP_COST
+
+
+def _dijkstra(board, start, target):
+    dist = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        d, pos = heapq.heappop(heap)
+        if pos == target:
+            return d
+        if d > dist[pos]:
+            continue
+        for dr, dc in DIRECTIONS:
+            nxt = (pos[0] + dr, pos[1] + dc)
+            if board.in_bounds(nxt) and d + _cost(board, nxt) < dist.get(nxt, float("inf")):
+                dist[nxt] = d + _cost(board, nxt)
+                heapq.heappush(heap, (dist[nxt], nxt))
+    return None
+
+
+def _board(seed, rows=12, cols=15):
+    choices = random.Random(seed)
+    board = Board(rows, cols)
+    for _ in range(rows * cols // 4):
+        pos = (choices.randrange(rows), choices.randrange(cols))
+        board.place(Rat(1, pos) if choices.random() < 0.5 else Coins(pos), pos, reveal=choices.random() < 0.7)
+    board.reveal_area((rows // 2, cols // 2), 3)
+    return board, choices
+
+
+def test_distances_match_dijkstra():
+    board, choices = _board(1)
+    field = DistanceField(board, board._goal)
+    for _ in range(30):
+        pos = (choices.randrange(board._rows), choices.randrange(board._cols))
+        assert field.distance(pos) == _dijkstra(board, pos, board._goal)
+    assert field.distance((-1, 0)) is None
+
+
+def test_path_is_connected_and_optimal():
+    board, choices = _board(2)
+    field = DistanceField(board, (3, 4))
+    path = field.path((11, 14))
+    assert path[-1] == (3, 4)
+    cost = 0
+    prev = (11, 14)
+    for step in path:
+        assert abs(step[0] - prev[0]) + abs(step[1] - prev[1]) == 1
+        cost += _cost(board, step)
+        prev = step
+    assert cost == field.distance((11, 14))
+
+
+def test_incremental_updates_match_rebuild():
+    board, choices = _board(3)
+    finder = PathFinder(board)
+    targets = [board._goal, (0, 7), (6, 0)]
+    for _ in range(40):
+        pos = (choices.randrange(board._rows), choices.randrange(board._cols))
+        kind = choices.randrange(3)
+        if kind == 0:
+            board.place(Rat(1, pos), pos)
+        elif kind == 1:
+            board.place(None, pos)
+        else:
+            board.reveal_area(pos, 1)
+        for target in targets:
+            start = (choices.randrange(board._rows), choices.randrange(board._cols))
+            assert finder.distance(start, target) == DistanceField(board, target).distance(start)
+    finder.close()
+    assert not board._watchers
+
+
+def _travel(board, player, target):
+    finder = PathFinder(board)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        while True:
+            command = game.travel_step(finder, board, player, target)
+            if command is None:
+                return out.getvalue()
+            dr, dc = {v: k for k, v in DIRECTIONS.items()}[command]
+            player.move(dr, dc, board)
+
+
+def test_travel_reaches_revealed_target():
+    board = Board(10, 10)
+    board.reveal_area((5, 5), 10)
+    player = Player(lvl=1, position=(0, 0))
+    assert "Вы на месте" in _travel(board, player, board._goal)
+    assert player.position == board._goal
+
+
+def test_travel_stops_before_fog_and_enemies():
+    board = Board(10, 10)
+    board.reveal_area((2, 2), 2)
+    player = Player(lvl=1, position=(0, 0))
+    assert "неразведанная" in _travel(board, player, board._goal)
+    assert max(player.position) == 4 and board.is_revealed(player.position)
+
+    board.reveal_area((5, 5), 10)
+    for r in range(10):
+        board.place(Rat(1, (r, 7)), (r, 7))
+    assert "Впереди враг" in _travel(board, player, board._goal)
+    assert player.position[1] == 6
@@ -0,0 +1,71 @@
+import contextlib
+import io
+
+import pytest
+
+import game
+import placement
+from classes import Board, Enemy, Rat, Spider, Tower
+from placement import FreeCells
+from rng import GameRng
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(placement, "np", None)
+    elif placement.np is None:
+        pytest.skip("numpy не установлен")
+    return request.param
+
+
+def test_takes_every_free_cell_once(backend):
+    cells = FreeCells(7, 9, exclude=[(0, 0), (6, 8), (10, 10)], rng=GameRng(1))
+    assert len(cells) == 61
+    assert (0, 0) not in cells and (3, 4) in cells and (-1, 0) not in cells
+    taken = cells.take_many(10)
+    while True:
+        pos = cells.take()
+        if pos is None:
+            break
+        taken.append(pos)
+    assert len(taken) == len(set(taken)) == 61
+    assert (0, 0) not in taken and (6, 8) not in taken
+    assert len(cells) == 0 and cells.take_many(5) == []
+
+
+def test_discard_and_take_stay_consistent(backend):
+    cells = FreeCells(5, 5, rng=GameRng(2))
+    cells.discard((2, 2))
+    cells.discard((2, 2))
+    assert (2, 2) not in cells and len(cells) == 24
+    taken = cells.take_many(4)
+    for pos in taken:
+        assert pos not in cells
+    rest = cells.take_many(100)
+    assert len(rest) == 20 and (2, 2) not in rest + taken
+
+
+def test_same_seed_same_order(backend):
+    first = FreeCells(20, 20, rng=GameRng(3)).take_many(50)
+    assert FreeCells(20, 20, rng=GameRng(3)).take_many(50) == first
+    assert FreeCells(20, 20, rng=GameRng(4)).take_many(50) != first
+
+
+def test_place_batch_fills_board(backend):
+    board = Board(10, 10)
+    cells = FreeCells(10, 10, exclude=[(0, 0)], rng=GameRng(5))
+    placed = cells.place_batch(board, 30, [Rat, Spider], lambda cls, pos: cls(1, pos))
+    enemies = [(r, c) for r in range(10) for c in range(10) if isinstance(board.entity_at((r, c)), Enemy)]
+    assert placed == len(enemies) == 30
+    assert board.entity_at((0, 0)) is None
+    assert cells.place_batch(board, 1000, [Tower]) == 69
+    assert cells.place_batch(board, 1, [Tower]) == 0
+
+
+def test_full_level_leaves_start_and_goal_free(settings):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board, player = game.create_level("hard", size=(3, 3), settings=dict(settings["hard"], enemy_multiplier=5),
+                                          rng=GameRng(6))
+    assert board.entity_at((0, 0)) is player
+    assert board.entity_at((2, 2)) is None
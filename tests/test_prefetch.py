@@ -0,0 +1,72 @@
+import contextlib
+import io
+import threading
+
+import game
+import instrument
+from prefetch import LevelPrefetcher
+from rng import GameRng
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def test_take_returns_matching_result():
+    prefetcher = LevelPrefetcher()
+    try:
+        prefetcher.submit("a", lambda x: x * 2, 21)
+        assert prefetcher.take("a") == 42
+        assert prefetcher.take("a") is None
+        prefetcher.submit("a", lambda: 1)
+        assert prefetcher.take("b") is None
+        assert prefetcher.take("a") is None
+    finally:
+        prefetcher.close()
+
+
+def test_submit_replaces_pending_work():
+    gate = threading.Event()
+    prefetcher = LevelPrefetcher()
+    try:
+        prefetcher.submit("slow", gate.wait)
+        prefetcher.submit("queued", lambda: "old")
+        prefetcher.submit("queued", lambda: "new")
+        gate.set()
+        assert prefetcher.take("queued") == "new"
+    finally:
+        prefetcher.close()
+
+
+def test_prefetched_level_matches_direct_generation(settings):
+    rng = GameRng(11)
+    direct_board, direct_player = _quiet(game.next_level, None, "hard", 1, settings["hard"],
+                                         rng.split("level", 2), 2)
+    prefetcher = LevelPrefetcher()
+    instrument.reset()
+    instrument.enable(dump_on_exit=False)
+    try:
+        game.prefetch_level(prefetcher, "hard", 1, settings["hard"], rng.split("level", 2), 2)
+        board, player = _quiet(game.next_level, prefetcher, "hard", 1, settings["hard"], rng.split("level", 2), 2)
+        counters = instrument.stats()["counters"]
+    finally:
+        instrument.disable()
+        instrument.reset()
+        prefetcher.close()
+    assert counters.get("prefetch.hit", 0) + counters.get("prefetch.wait", 0) == 1
+    assert board.to_dict() == direct_board.to_dict()
+    assert player.to_dict() == direct_player.to_dict()
+    assert board.generation() == direct_board.generation()
+
+
+def test_wrong_level_is_not_used(settings):
+    rng = GameRng(12)
+    prefetcher = LevelPrefetcher()
+    try:
+        game.prefetch_level(prefetcher, "hard", 1, settings["hard"], rng.split("level", 2), 2)
+        board, player = _quiet(game.next_level, prefetcher, "hard", 1, settings["hard"], rng.split("level", 3), 3)
+    finally:
+        prefetcher.close()
+    expected, _ = _quiet(game.create_level, "hard", 1, settings=settings["hard"], rng=rng.split("level", 3))
+    assert board.to_dict() == expected.to_dict()
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import random
+
+import game
+from recording import Recording, state_hash
+from replay import replay
+from rng import GameRng, using
+
+
+def _play(settings, seed: int, levels: int, persist: bool):
+    recording = Recording.new(settings, seed=seed)
+    choices = random.Random(seed)
+    steps = recording.wrap(game.new_game_steps(persist, None, recording, recording.settings))
+    with contextlib.redirect_stdout(io.StringIO()), using(GameRng(seed)):
+        try:
+            prompt = next(steps)
+            while True:
+                level = recording.checkpoints[-1][0] if recording.checkpoints else 1
+                if prompt.startswith("Выберите"):
+                    command = "easy"
+                elif prompt.startswith("Ваш ход"):
+                    if level > levels:
+                        command = "q"
+                    else:
+                        command = "t" if choices.random() < 0.5 else choices.choice("wasd")
+                elif prompt.startswith("Использовать"):
+                    command = "y"
+                else:
+                    command = choices.choice(["y", "n", "Medkit", "Rage", "Accuracy"])
+                prompt = steps.send(command)
+        except StopIteration:
+            pass
+    return recording
+
+
+def _multi_level(settings, persist: bool, levels: int = 2):
+    for seed in range(50):
+        recording = _play(settings, seed, levels, persist)
+        if recording.checkpoints[-1][0] > levels and recording.commands[-1] == "q":
+            return recording
+    raise AssertionError("ни одна сессия не прошла нужное число уровней")
+
+
+def test_quit_save_sessions_replay(settings, workdir):
+    sessions = [_play(settings, seed, 2, persist=True) for seed in range(15)]
+    saved = [recording for recording in sessions if recording.commands[-1] == "q"]
+    assert len(saved) >= 5
+    assert (workdir / "save.json").exists() or (workdir / "save.bin").exists()
+    for recording in saved:
+        assert recording.checkpoints[-1][0] > 2
+        assert replay(recording) == ("ok", None), recording.seed
+
+
+def test_recording_round_trips_through_file(settings, workdir):
+    recording = _multi_level(settings, persist=False)
+    path = recording.save(str(workdir / "session.json"))
+    loaded = Recording.load(path)
+    assert loaded.commands == recording.commands
+    assert replay(loaded) == ("ok", None)
+
+
+def test_changed_command_diverges(settings):
+    recording = _multi_level(settings, persist=False)
+    recording.commands[0] = "hard"
+    status, detail = replay(recording)
+    assert status == "diverged"
+
+
+def test_state_hash_sees_rng_state(settings):
+    with using(GameRng(1)):
+        board, player = game.create_level("easy", settings=settings["easy"], rng=GameRng(2))
+        before = state_hash(board, player, 1)
+        game.current().random()
+        assert state_hash(board, player, 1) != before
@@ -0,0 +1,87 @@
+import io
+import re
+
+from classes import Board, Coins, Player, Rat
+from renderer import TerminalRenderer, CLEAR, SAVE_CURSOR, RESTORE_CURSOR
+
+MOVE = re.compile("\033\\[(\\d+);(\\d+)H([^\033])")
+
+
+def _board():
+    board = Board(6, 8)
+    player = Player(lvl=1, position=(0, 0))
+    board.place(player, (0, 0))
+    board.place(Rat(1, (2, 3)), (2, 3))
+    board.reveal_area((0, 0), 4)
+    return board, player
+
+
+def _screen(text: str):
+    lines = text.split("\033[H", 2)[-1].split("\n")
+    return [line.strip("|").split("|") for line in lines if line.startswith("|")]
+
+
+def _apply(screen, text: str):
+    for r, c, symbol in MOVE.findall(text):
+        screen[int(r) - 1][(int(c) - 2) // 2] = symbol
+
+
+def test_first_frame_is_full():
+    board, player = _board()
+    out = io.StringIO()
+    renderer = TerminalRenderer(out, viewport=(6, 8))
+    assert renderer.draw(board, player)
+    text = out.getvalue()
+    assert text.startswith(CLEAR)
+    assert _screen(text) == [[board.symbol_at((r, c), player) for c in range(8)] for r in range(6)]
+
+
+def test_unchanged_frame_is_skipped():
+    board, player = _board()
+    out = io.StringIO()
+    renderer = TerminalRenderer(out, viewport=(6, 8))
+    renderer.draw(board, player)
+    size = len(out.getvalue())
+    assert not renderer.draw(board, player)
+    assert len(out.getvalue()) == size
+    assert renderer.stats() == {"frames": 2, "skipped": 1, "cells_written": 48}
+
+
+def test_diff_updates_only_changed_cells():
+    board, player = _board()
+    out = io.StringIO()
+    renderer = TerminalRenderer(out, viewport=(6, 8))
+    renderer.draw(board, player)
+    screen = _screen(out.getvalue())
+    mark = len(out.getvalue())
+
+    board.place(None, (0, 0))
+    player._position = (0, 1)
+    board.place(player, (0, 1))
+    board.place(Coins((1, 1)), (1, 1))
+    board.reveal_area((5, 7), 0)
+    assert renderer.draw(board, player)
+    diff = out.getvalue()[mark:]
+    assert diff.startswith(SAVE_CURSOR) and diff.endswith(RESTORE_CURSOR)
+    assert CLEAR not in diff
+    assert len(MOVE.findall(diff)) == 4
+    _apply(screen, diff)
+    assert screen == [[board.symbol_at((r, c), player) for c in range(8)] for r in range(6)]
+
+
+def test_scrolling_and_invalidate_redraw_everything():
+    board = Board(30, 30)
+    player = Player(lvl=1, position=(0, 0))
+    board.place(player, (0, 0))
+    out = io.StringIO()
+    renderer = TerminalRenderer(out, viewport=(5, 5))
+    renderer.draw(board, player)
+    player._position = (20, 20)
+    board.place(player, (20, 20))
+    mark = len(out.getvalue())
+    renderer.draw(board, player)
+    assert out.getvalue()[mark:].startswith(CLEAR)
+    renderer.invalidate()
+    mark = len(out.getvalue())
+    renderer.draw(board, player)
+    assert out.getvalue()[mark:].startswith(CLEAR)
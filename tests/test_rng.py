@@ -0,0 +1,79 @@
+import contextlib
+import io
+import pickle
+import random
+
+import pytest
+
+import game
+import rng
+from classes import Rat
+from rng import GameRng, NumpyRng, current, derive_seed, using
+
+
+def test_split_is_stable_and_independent():
+    base = GameRng(10)
+    assert base.split("level", 1).random() == GameRng(10).split("level", 1).random()
+    assert base.split("level", 1).random() != base.split("level", 2).random()
+    base.random()
+    assert base.split("roam", 3).base_seed == derive_seed(10, ("roam", 3))
+
+
+def test_batch_draws_match_single_draws():
+    batch, single = GameRng(3), GameRng(3)
+    assert batch.randoms(5) == [single.random() for _ in range(5)]
+    assert batch.integers(2, 9, 50) == [single.randint(2, 9) for _ in range(50)]
+    assert batch.getstate() == single.getstate()
+
+
+def test_module_helpers_follow_the_active_rng():
+    with using(GameRng(5)):
+        values = [rng.randint(0, 100), rng.random(), rng.choice("abcdef")]
+    reference = random.Random(5)
+    assert values == [reference.randint(0, 100), reference.random(), reference.choice("abcdef")]
+
+
+def test_using_restores_previous_rng():
+    outer = current()
+    with using(GameRng(1)) as inner:
+        assert current() is inner
+        with using(GameRng(2)):
+            pass
+        assert current() is inner
+    assert current() is outer
+
+
+def test_pickle_keeps_seed_and_state():
+    source = GameRng(8)
+    source.random()
+    copy = pickle.loads(pickle.dumps(source))
+    assert copy.base_seed == 8 and copy.random() == source.random()
+
+
+def test_entities_draw_from_the_active_rng():
+    with using(GameRng(6)):
+        first = Rat(5, (0, 0)).to_dict()
+    with using(GameRng(6)):
+        assert Rat(5, (0, 0)).to_dict() == first
+
+
+def test_same_seed_same_level(settings):
+    def level(seed):
+        with contextlib.redirect_stdout(io.StringIO()):
+            board, player = game.create_level("hard", settings=settings["hard"], rng=GameRng(seed))
+        return board.to_dict()
+
+    assert level(12) == level(12)
+    assert level(12) != level(13)
+
+
+def test_numpy_rng():
+    pytest.importorskip("numpy")
+    first, second = NumpyRng(4, buffer=8), NumpyRng(4, buffer=8)
+    assert [first.random() for _ in range(20)] == [second.random() for _ in range(20)]
+    assert [first.randint(0, 9) for _ in range(20)] == [second.randint(0, 9) for _ in range(20)]
+    state = first.getstate()
+    values = [first.random() for _ in range(5)]
+    first.setstate(state)
+    assert [first.random() for _ in range(5)] == values
+    assert all(0 <= value <= 3 for value in first.integers(0, 3, 100))
@@ -0,0 +1,98 @@
+import contextlib
+import io
+
+import pytest
+
+import game
+from array_board import ArrayBoard
+from classes import Board, Enemy
+from roaming import Roamer
+from rng import GameRng, using
+
+
+def _level(settings, board_cls, seed: int = 1, size=(40, 40)):
+    with contextlib.redirect_stdout(io.StringIO()), using(GameRng(seed)):
+        return game.create_level("hard", board_cls=board_cls, size=size, settings=settings["hard"],
+                                 rng=GameRng(seed))
+
+
+def _enemies(board):
+    return {(r, c) for r in range(board._rows) for c in range(board._cols)
+            if isinstance(board.entity_at((r, c)), Enemy)}
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_roaming_does_not_reveal_fog(settings, board_cls):
+    board, player = _level(settings, board_cls)
+    revealed = board._fog.count()
+    roamer = Roamer(board, GameRng(5))
+    for turn in range(30):
+        roamer.step((20, 20 + turn % 3))
+    assert board._fog.count() == revealed
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_roaming_keeps_board_and_index_consistent(settings, board_cls):
+    board, player = _level(settings, board_cls)
+    before = _enemies(board)
+    roamer = Roamer(board, GameRng(5))
+    for turn in range(40):
+        roamer.step((20, 20))
+    after = _enemies(board)
+    assert len(after) == len(before)
+    assert after != before
+    assert set(board.in_rect(Enemy, 0, 0, board._rows - 1, board._cols - 1)) == after
+    for pos in after:
+        assert board.entity_at(pos)._position == pos
+        assert pos not in (board._start, board._goal)
+
+
+def test_roaming_is_deterministic(settings):
+    first, _ = _level(settings, Board)
+    second, _ = _level(settings, Board)
+    for board in (first, second):
+        roamer = Roamer(board, GameRng(9))
+        for turn in range(20):
+            roamer.step((10, 10 + turn % 5))
+    assert first.codes() == second.codes()
+
+
+def test_far_enemies_sleep(settings):
+    board, player = _level(settings, Board)
+    far = {pos for pos in _enemies(board) if max(abs(pos[0] - 5), abs(pos[1] - 5)) > 6}
+    roamer = Roamer(board, GameRng(5))
+    for _ in range(10):
+        roamer.step((5, 5))
+    assert far <= _enemies(board)
+
+
+class _EnemySnapshots:
+
+    def __init__(self):
+        self.drawn = None
+
+    def draw(self, board, player):
+        self.drawn = _enemies(board)
+
+
+def test_enemies_move_before_redraw(settings):
+    renderer = _EnemySnapshots()
+    board, player = _level(settings, Board, size=(15, 15))
+    player._hp = 1000
+    moves = "dsdsdsdsawdsdsdsdsawdsds"
+    steps = game.game_steps(board, player, 1, "hard", renderer, persist=False, settings=settings["hard"])
+    checked = 0
+    with contextlib.redirect_stdout(io.StringIO()), using(GameRng(3)):
+        try:
+            prompt = next(steps)
+            while moves:
+                if prompt.startswith("Ваш ход"):
+                    assert renderer.drawn == _enemies(board)
+                    checked += 1
+                    prompt = steps.send(moves[0])
+                    moves = moves[1:]
+                else:
+                    prompt = steps.send("n")
+        except StopIteration:
+            pass
+    assert checked > 5
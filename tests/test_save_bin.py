@@ -0,0 +1,90 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import game
+import save
+from array_board import ArrayBoard
+from classes import Board, Bow, Medkit, Rage, Rat, Skeleton
+from rng import GameRng
+from save_bin import MAGIC, SaveFormatError, is_binary, read_save, write_save
+
+
+def _state(settings, board_cls=Board):
+    with contextlib.redirect_stdout(io.StringIO()):
+        board, player = game.create_level("hard", board_cls=board_cls, size=(30, 40),
+                                          settings=settings["hard"], rng=GameRng(5))
+    player._coins = 321
+    player._weapon = Bow((0, 0))
+    player.add_to_inventory("Medkit", Medkit((0, 0)))
+    player.add_to_inventory("Rage", Rage((0, 0)))
+    player.apply_status("poison", 2.5, 3)
+    rat = Rat(4, (3, 3))
+    rat.take_damage(7)
+    board.place(rat, (3, 3))
+    board.place(Skeleton(2, (4, 4)), (4, 4))
+    board.reveal_area((10, 10), 3)
+    return board, player
+
+
+def _dump(data):
+    return data["difficulty"], data["current_level"], data["player"].to_dict(), data["board"].to_dict()
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+@pytest.mark.parametrize("compress", [True, False])
+@pytest.mark.parametrize("lazy", [True, False])
+def test_round_trip(settings, board_cls, compress, lazy):
+    board, player = _state(settings, board_cls)
+    write_save("save.bin", player, board, 7, "hard", compress)
+    assert is_binary("save.bin")
+    data = read_save("save.bin", lazy)
+    assert type(data["board"]) is board_cls
+    assert _dump(data) == ("hard", 7, player.to_dict(), board.to_dict())
+    assert data["board"].entity_at((0, 0)) is data["player"]
+
+
+def test_round_trip_without_board(settings):
+    board, player = _state(settings)
+    write_save("save.bin", player, None, 2, "easy")
+    data = read_save("save.bin")
+    assert data["board"] is None and data["player"].to_dict() == player.to_dict()
+
+
+def test_smaller_than_json(settings):
+    board, player = _state(settings)
+    write_save("save.bin", player, board, 1, "hard")
+    save.save("save.json", save.state_dict(player, board, 1, "hard"))
+    assert os.path.getsize("save.bin") * 5 < os.path.getsize("save.json")
+
+
+def test_convert_both_ways(settings):
+    board, player = _state(settings)
+    write_save("save.bin", player, board, 3, "hard")
+    assert save.convert_save("save.bin", "copy.json")
+    assert not is_binary("copy.json")
+    assert save.convert_save("copy.json", "copy.bin")
+    assert _dump(read_save("copy.bin")) == _dump(read_save("save.bin"))
+
+
+def test_rejects_foreign_and_newer_files():
+    with open("save.bin", "wb") as file:
+        file.write(b"{}")
+    with pytest.raises(SaveFormatError):
+        read_save("save.bin")
+    with open("save.bin", "wb") as file:
+        file.write(MAGIC + bytes([99, 0]))
+    with pytest.raises(SaveFormatError):
+        read_save("save.bin")
+
+
+def test_load_game_prefers_newest_save(settings):
+    board, player = _state(settings)
+    save.save_game(player, board, 4, "hard", fmt="json")
+    player._coins = 999
+    save.save_game(player, board, 5, "hard", fmt="binary")
+    os.utime("save.json", (0, 0))
+    data, found = save.load_game()
+    assert found and data["current_level"] == 5 and data["player"]._coins == 999
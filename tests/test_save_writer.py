@@ -0,0 +1,69 @@
+import os
+import threading
+
+import pytest
+
+import save
+from classes import Player
+from save_bin import read_save
+from save_writer import SaveWriter, atomic_write
+
+
+def test_atomic_write_replaces_file():
+    atomic_write("data.bin", b"old")
+    atomic_write("data.bin", b"new")
+    with open("data.bin", "rb") as file:
+        assert file.read() == b"new"
+    assert not os.path.exists("data.bin.tmp")
+
+
+def test_failed_write_keeps_previous_file():
+    atomic_write("data.bin", b"old")
+
+    def encode(state):
+        raise ValueError("boom")
+
+    writer = SaveWriter()
+    writer.submit("data.bin", lambda: None, encode)
+    with pytest.raises(ValueError):
+        writer.flush()
+    writer.close()
+    with open("data.bin", "rb") as file:
+        assert file.read() == b"old"
+
+
+def test_pending_writes_to_one_path_are_merged():
+    gate = threading.Event()
+    written = []
+
+    def write(path, data):
+        gate.wait()
+        written.append((path, data))
+
+    writer = SaveWriter(write)
+    first = writer.submit("a", lambda: b"0", bytes)
+    tickets = [writer.submit("a", lambda value=value: value, bytes) for value in (b"1", b"2", b"3")]
+    tickets.append(writer.submit("b", lambda: b"x", bytes))
+    assert not writer.done(tickets[-1])
+    gate.set()
+    assert writer.flush(timeout=5)
+    assert all(writer.done(ticket) for ticket in [first] + tickets)
+    assert written[-2:] == [("a", b"3"), ("b", b"x")]
+    assert writer.stats()["merged"] >= 2
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit("a", lambda: b"4", bytes)
+
+
+def test_async_save_uses_a_snapshot():
+    player = Player(lvl=1, position=(0, 0))
+    player._coins = 10
+    writer = save.enable_async_saves()
+    try:
+        save.save_game(player, None, 1, "easy", fmt="binary")
+        player._coins = 20
+        save.flush_saves()
+        assert read_save(save.SAVE_PATH)["player"]._coins == 10
+    finally:
+        save.ASYNC_WRITER = None
+        writer.close()
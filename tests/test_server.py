@@ -0,0 +1,85 @@
+import asyncio
+
+from game import GameSession, new_game_steps
+from rng import GameRng, current
+from server import GameServer
+
+COMMANDS = ["normal", "d", "s", "i", "d", "s", "x", "s"]
+
+
+def _session(settings, seed):
+    return GameSession(new_game_steps(settings=settings), GameRng(seed))
+
+
+def test_interleaved_sessions_do_not_share_state(settings):
+    solo = _session(settings, 4)
+    expected = [solo.start()] + [solo.send(command) for command in COMMANDS]
+
+    ambient = current().getstate()
+    first, second, other = _session(settings, 4), _session(settings, 4), _session(settings, 9)
+    transcripts = [[session.start()] for session in (first, second, other)]
+    for command in COMMANDS:
+        for transcript, session in zip(transcripts, (first, second, other)):
+            transcript.append(session.send(command))
+    assert transcripts[0] == transcripts[1] == expected
+    assert transcripts[2] != expected
+    assert current().getstate() == ambient
+
+
+def test_session_finishes_on_quit(settings):
+    session = _session(settings, 1)
+    session.start()
+    session.send("easy")
+    assert "Игра завершена" in session.send("q")
+    assert session.finished and session.prompt is None
+    assert session.send("d") == ""
+
+
+def _serve(settings, scenario, **kwargs):
+    async def run():
+        server = GameServer(port=0, session_factory=lambda: _session(settings, 2), **kwargs)
+        await server.start()
+        try:
+            return await scenario(server), server.stats()
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+async def _read_prompt(reader, prompt: bytes):
+    return (await asyncio.wait_for(reader.readuntil(prompt), 5)).decode("utf-8")
+
+
+def test_server_plays_a_session(settings):
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        greeting = await _read_prompt(reader, "(easy/normal/hard): ".encode("utf-8"))
+        writer.write(b"easy\n")
+        board = await _read_prompt(reader, "Ваш ход: ".encode("utf-8"))
+        writer.write(b"q\n")
+        tail = (await asyncio.wait_for(reader.read(), 5)).decode("utf-8")
+        writer.close()
+        return greeting, board, tail
+
+    (greeting, board, tail), stats = _serve(settings, scenario)
+    assert "Сдохни или умри" in greeting
+    assert "\r\n|P|" in board
+    assert "Игра завершена" in tail
+    assert stats["commands"] == 2 and stats["sessions"] == 0
+
+
+def test_server_limits_sessions_and_idle_clients(settings):
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await _read_prompt(reader, "(easy/normal/hard): ".encode("utf-8"))
+        extra_reader, extra_writer = await asyncio.open_connection("127.0.0.1", server.port)
+        refused = (await asyncio.wait_for(extra_reader.read(), 5)).decode("utf-8")
+        idle = (await asyncio.wait_for(reader.read(), 5)).decode("utf-8")
+        writer.close()
+        extra_writer.close()
+        return refused, idle
+
+    (refused, idle), stats = _serve(settings, scenario, max_sessions=1, idle_timeout=0.2)
+    assert "Сервер переполнен" in refused
+    assert "неактивности" in idle
+    assert stats["refused"] == 1 and stats["timed_out"] == 1
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+import game
+from array_board import ArrayBoard
+from classes import Board, Enemy, Rat, Spider, Coins, Bonus
+from spatial import SpatialIndex
+from rng import GameRng
+
+
+def _level(settings, board_cls, size=(70, 90)):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return game.create_level("hard", board_cls=board_cls, size=size, settings=settings["hard"],
+                                 rng=GameRng(4))
+
+
+def _scan(board, cls, top=0, left=0, bottom=None, right=None):
+    bottom = board._rows - 1 if bottom is None else bottom
+    right = board._cols - 1 if right is None else right
+    return {(r, c) for r in range(max(top, 0), min(bottom, board._rows - 1) + 1)
+            for c in range(max(left, 0), min(right, board._cols - 1) + 1)
+            if isinstance(board.entity_at((r, c)), cls)}
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_index_matches_scan_after_edits(settings, board_cls):
+    board, player = _level(settings, board_cls)
+    choices = random.Random(1)
+    board.in_rect(Enemy, 0, 0, 20, 20)
+    for _ in range(500):
+        pos = (choices.randrange(board._rows), choices.randrange(board._cols))
+        entity = choices.choice([None, Rat(1, pos), Coins(pos)])
+        board.place(entity, pos)
+    for _ in range(20):
+        top, left = choices.randrange(-5, board._rows), choices.randrange(-5, board._cols)
+        bottom, right = top + choices.randrange(30), left + choices.randrange(30)
+        for cls in (Enemy, Bonus, Rat):
+            assert set(board.in_rect(cls, top, left, bottom, right)) == _scan(board, cls, top, left, bottom, right)
+    assert board.spatial().count(Enemy) == len(_scan(board, Enemy))
+    assert set(board.spatial().positions(Bonus)) == _scan(board, Bonus)
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_index_is_filled_lazily(settings, board_cls):
+    board, player = _level(settings, board_cls, size=(200, 200))
+    board.in_rect(Enemy, 100, 100, 110, 110)
+    index = board.spatial()
+    assert 0 < len(index._loaded) <= 4
+    board.place(Rat(1, (0, 0)), (5, 5))
+    assert (0, 0) not in index._loaded
+    assert (5, 5) in board.in_rect(Rat, 0, 0, 10, 10)
+
+
+@pytest.mark.parametrize("board_cls", [Board, ArrayBoard])
+def test_nearest_and_within(settings, board_cls):
+    board, player = _level(settings, board_cls)
+    expected = _scan(board, Enemy)
+    for pos in [(0, 0), (35, 45), (69, 89)]:
+        nearest = board.nearest(Enemy, pos)
+        best = min(abs(r - pos[0]) + abs(c - pos[1]) for r, c in expected)
+        assert abs(nearest[0] - pos[0]) + abs(nearest[1] - pos[1]) == best
+        within = set(board.within(Enemy, pos, 7))
+        assert within == {(r, c) for r, c in expected if abs(r - pos[0]) + abs(c - pos[1]) <= 7}
+
+
+def test_nearest_missing_type_is_none(settings):
+    board, player = _level(settings, Board, size=(30, 30))
+    for r in range(30):
+        for c in range(30):
+            if isinstance(board.entity_at((r, c)), Rat):
+                board.place(None, (r, c))
+    assert board.nearest(Rat, (15, 15)) is None
+
+
+def test_index_without_loader():
+    index = SpatialIndex(40, 40, bucket=8)
+    index.add(Rat, (1, 1))
+    index.add(Rat, (1, 1))
+    index.add(Spider, (30, 30))
+    index.add(Coins, (5, 5))
+    assert index.count(Enemy) == 2 and index.count(Rat) == 1 and index.count(Bonus) == 1
+    index.move(Rat, Coins, (1, 1))
+    index.remove(Spider, (0, 0))
+    assert index.count(Rat) == 0 and index.count(Coins) == 2
+    assert sorted(index.positions(Bonus)) == [(1, 1), (5, 5)]
+    assert index.in_rect(Enemy, 20, 20, 100, 100) == [(30, 30)]
+    assert index.in_rect(Enemy, 50, 50, 60, 60) == []
+
+
+def test_nearest_options():
+    index = SpatialIndex(40, 40, bucket=8)
+    for pos in [(10, 12), (12, 10), (30, 30)]:
+        index.add(Rat, pos)
+    assert index.nearest(Rat, (11, 11)) == (10, 12)
+    assert index.nearest(Rat, (11, 11), accept=lambda pos: pos[0] > 20) == (30, 30)
+    assert index.nearest(Rat, (35, 35), max_radius=5) is None
+    assert index.nearest(Rat, (35, 35), max_radius=10) == (30, 30)
+    assert index.nearest(Spider, (0, 0)) is None
+
+
+def test_nearest_revealed_only():
+    board = Board(20, 20)
+    board.place(Rat(1, (2, 2)), (2, 2), reveal=False)
+    board.place(Rat(1, (15, 15)), (15, 15))
+    assert board.nearest(Rat, (0, 0)) == (2, 2)
+    assert board.nearest(Rat, (0, 0), revealed_only=True) == (15, 15)
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from classes import Player, Rat
+from status import StatusEffects, StatusScheduler, stack
+
+
+class _Target:
+
+    def __init__(self, hp: float = 1000.0):
+        self._hp = hp
+
+    def take_damage(self, amount: float):
+        damage = min(amount, self._hp)
+        self._hp -= damage
+        return damage
+
+
+@pytest.mark.parametrize("rule, expected", [
+    ("refresh", (2.0, 3)),
+    ("extend", (5.0, 7)),
+    ("intensify", (7.0, 4)),
+    ("strongest", (5.0, 4)),
+])
+def test_stack_rules(rule, expected):
+    assert stack(rule, (5.0, 4), 2.0, 3) == expected
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError):
+        stack("merge", (1.0, 1), 1.0, 1)
+
+
+def test_effects_expire_on_time():
+    effects = StatusEffects({"poison": (2.0, 2), "infection": (1.0, 3)})
+    target = _Target()
+    assert effects.next_expiry() == 2
+    assert effects.tick(target) == (3.0, [])
+    assert effects["poison"] == (2.0, 1)
+    assert effects.tick(target, scale=2.0) == (6.0, ["poison"])
+    assert dict(effects) == {"infection": (1.0, 1)}
+    assert effects.tick(target) == (1.0, ["infection"])
+    assert not effects and effects.next_expiry() is None
+    assert target._hp == 990.0
+
+
+def test_refresh_ignores_stale_expiry():
+    effects = StatusEffects()
+    effects.apply("poison", 1.0, 1)
+    effects.apply("poison", 3.0, 3)
+    assert effects.tick(_Target()) == (3.0, [])
+    assert effects["poison"] == (3.0, 2)
+
+
+def test_matches_turn_by_turn_model():
+    choices = random.Random(5)
+    effects = StatusEffects()
+    model = {}
+    for _ in range(300):
+        if choices.random() < 0.3:
+            name = choices.choice(["poison", "infection", "burn"])
+            rule = choices.choice(["refresh", "extend", "intensify", "strongest"])
+            dmg, turns = float(choices.randint(1, 5)), choices.randint(1, 6)
+            effects.apply(name, dmg, turns, rule)
+            model[name] = stack(rule, model[name], dmg, turns) if name in model else (dmg, turns)
+        total, expired = effects.tick(_Target())
+        assert total == sum(dmg for dmg, _ in model.values())
+        model = {name: (dmg, turns - 1) for name, (dmg, turns) in model.items()}
+        assert sorted(expired) == sorted(name for name, (_, turns) in model.items() if turns <= 0)
+        model = {name: value for name, value in model.items() if value[1] > 0}
+        assert dict(effects) == model
+        assert effects.rate() == sum(dmg for dmg, _ in model.values())
+
+
+def test_scheduler_ticks_only_afflicted():
+    scheduler = StatusScheduler()
+    healthy, sick, frail = Rat(1, (0, 0)), Rat(1, (0, 1)), Rat(1, (0, 2))
+    scheduler.track(healthy)
+    scheduler.apply(sick, "poison", 1.0, 2)
+    frail._hp = 0.5
+    scheduler.apply(frail, "poison", 5.0, 10)
+    assert len(scheduler) == 2
+    damage, expired = scheduler.tick()
+    assert damage == {sick: pytest.approx(1.1), frail: 0.5}
+    assert len(scheduler) == 1
+    damage, expired = scheduler.tick()
+    assert expired == [(sick, "poison")] and len(scheduler) == 0
+
+
+def test_player_statuses_scale_and_announce_expiry():
+    player = Player(lvl=5, position=(0, 0))
+    player.apply_status("poison", 2.0, 1)
+    player.apply_status("infection", 1.0, 4)
+    loaded = Player.from_dict(player.to_dict())
+    assert dict(loaded._statuses) == dict(player._statuses)
+    player._statuses.pop("infection")
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert player.apply_status_tick() == pytest.approx(3.0)
+    assert "Статус poison закончился" in out.getvalue()
+    assert not player.has_status()
@@ -0,0 +1,69 @@
+import os
+
+from classes import Coins, Enemy, Rat, load_object
+from world import ChunkedBoard
+
+
+def _world(settings, path, seed=7, cache_size=2, size=(40, 40)):
+    return ChunkedBoard(*size, settings["normal"], seed=seed, path=str(path), chunk_size=10, cache_size=cache_size)
+
+
+def _dump(board, rows, cols):
+    return [[board.code_at((r, c)) for c in range(cols)] for r in range(rows)]
+
+
+def test_chunks_depend_only_on_seed(settings, tmp_path):
+    forward = _world(settings, tmp_path / "a", cache_size=100)
+    backward = _world(settings, tmp_path / "b", cache_size=1)
+    cells = [(r, c) for r in range(40) for c in range(40)]
+    expected = [forward.code_at(pos) for pos in cells]
+    assert [backward.code_at(pos) for pos in reversed(cells)] == expected[::-1]
+    assert _dump(_world(settings, tmp_path / "c", seed=8), 40, 40) != _dump(forward, 40, 40)
+    assert forward.entity_at((0, 0)) is None and forward.entity_at((39, 39)) is None
+
+
+def test_lru_eviction(settings, tmp_path):
+    board = _world(settings, tmp_path / "w")
+    board.code_at((0, 0))
+    board.code_at((0, 15))
+    board.code_at((0, 0))
+    board.code_at((15, 0))
+    assert board.cached_chunks() == [(0, 0), (1, 0)]
+    assert not os.path.exists(board.path)
+
+
+def test_evicted_edits_are_reloaded(settings, tmp_path):
+    board = _world(settings, tmp_path / "w", cache_size=1)
+    hidden = [(r, c) for r in range(10, 20) for c in range(10, 20) if not board.is_revealed((r, c))]
+    board.place(Rat(9, (12, 13)), (12, 13))
+    board.place(None, (15, 15))
+    board.reveal((14, 14))
+    board.code_at((35, 35))
+    assert board.cached_chunks() == [(3, 3)]
+    assert os.path.exists(os.path.join(board.path, "1_1.json"))
+    assert not os.path.exists(os.path.join(board.path, "3_3.json"))
+
+    rat = board.entity_at((12, 13))
+    assert isinstance(rat, Rat) and rat._lvl == 9
+    assert board.entity_at((15, 15)) is None
+    assert board.is_revealed((14, 14))
+    touched = {(12, 13), (14, 14), (15, 15)}
+    assert [pos for pos in hidden if not board.is_revealed(pos)] == [pos for pos in hidden if pos not in touched]
+
+
+def test_saved_world_restores_edits(settings, tmp_path):
+    board = _world(settings, tmp_path / "w", cache_size=4)
+    board.place(Coins((21, 22)), (21, 22))
+    data = board.to_dict()
+    loaded = load_object(data)
+    assert type(loaded) is ChunkedBoard and loaded.cached_chunks() == []
+    assert loaded.entity_at((21, 22)).to_dict() == board.entity_at((21, 22)).to_dict()
+    assert _dump(loaded, 40, 40) == _dump(board, 40, 40)
+
+
+def test_queries_cross_chunk_borders(settings, tmp_path):
+    board = _world(settings, tmp_path / "w", cache_size=100)
+    expected = {(r, c) for r in range(5, 26) for c in range(8, 31) if isinstance(board.entity_at((r, c)), Enemy)}
+    assert set(board.in_rect(Enemy, 5, 8, 25, 30)) == expected
+    board.reveal_area((10, 10), 1)
+    assert all(board.is_revealed((r, c)) for r in range(9, 12) for c in range(9, 12))
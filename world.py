@@ -0,0 +1,243 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from classes import Board, CLASS_REGISTRY
+from instrument import count, timed
+from placement import populate
+from rng import GameRng, using
+from save_writer import atomic_write
+
+if TYPE_CHECKING:
+    from classes import Player
+
+
+WORLD_DIR = "worlds"
+WORLD_SIZE = 1_000_000
+CHUNK_SIZE = 32
+CACHE_SIZE = 64
+VIEW = (15, 31)
+
+
+class _Chunk(Board):
+
+    def __init__(self, rows: int, cols: int, origin: tuple[int, int]):
+        super().__init__(rows, cols)
+        self._origin = origin
+
+    def place_batch(self, cls: type, indices, factory=None):
+        top, left = self._origin
+        for index in indices:
+            r, c = divmod(int(index), self._cols)
+            pos = (top + r, left + c)
+            self.place(factory(cls, pos) if factory else cls(pos), (r, c))
+
+
+class ChunkedBoard(Board):
+
+    def __init__(self, rows: int, cols: int, settings: dict, seed: int = None, player_lvl: int = 1,
+                 path: str = None, chunk_size: int = CHUNK_SIZE, cache_size: int = CACHE_SIZE):
+        self._rows = rows
+        self._cols = cols
+        self._rng = GameRng(seed)
+        self._seed = self._rng.base_seed
+        self._settings = settings
+        self._player_lvl = player_lvl
+        self._chunk_size = chunk_size
+        self._cache_size = max(1, cache_size)
+        if path is None:
+            path = os.path.join(WORLD_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self._seed:016x}")
+        self._path = path
+        self._chunks = OrderedDict()
+        self._dirty = set()
+        self._start = (0, 0)
+        self._goal = (rows - 1, cols - 1)
+        self._watchers = []
+        self._changes = None
+        self._spatial = None
+        self._generation = None
+        self._delta = None
+
+    @property
+    def path(self):
+        return self._path
+
+    def _locate(self, pos: tuple[int, int]):
+        size = self._chunk_size
+        return (pos[0] // size, pos[1] // size), (pos[0] % size, pos[1] % size)
+
+    def _chunk_path(self, key: tuple[int, int]):
+        return os.path.join(self._path, f"{key[0]}_{key[1]}.json")
+
+    def _chunk(self, key: tuple[int, int]):
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+        chunk = self._load_chunk(key)
+        if chunk is None:
+            chunk = self._generate(key)
+        self._chunks[key] = chunk
+        if len(self._chunks) > self._cache_size:
+            old_key, old = self._chunks.popitem(last=False)
+            count("world.evict")
+            if old_key in self._dirty:
+                self._write_chunk(old_key, old)
+        return chunk
+
+    @timed("world.generate")
+    def _generate(self, key: tuple[int, int]):
+        size = self._chunk_size
+        top, left = key[0] * size, key[1] * size
+        rows = min(size, self._rows - top)
+        cols = min(size, self._cols - left)
+        chunk = _Chunk(rows, cols, (top, left))
+        exclude = [(r - top, c - left) for r, c in (self._start, self._goal)]
+        rng = self._rng.split("chunk", *key)
+        with using(rng):
+            populate(chunk, self._settings, self._player_lvl, exclude, rng)
+        return chunk
+
+    @timed("world.load")
+    def _load_chunk(self, key: tuple[int, int]):
+        try:
+            with open(self._chunk_path(key), "r", encoding="utf-8") as file:
+                return Board.from_dict(json.load(file))
+        except FileNotFoundError:
+            return None
+
+    @timed("world.write")
+    def _write_chunk(self, key: tuple[int, int], chunk: Board):
+        os.makedirs(self._path, exist_ok=True)
+        data = json.dumps(chunk.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        atomic_write(self._chunk_path(key), data.encode("utf-8"))
+        self._dirty.discard(key)
+
+    def flush(self):
+        for key in sorted(self._dirty):
+            self._write_chunk(key, self._chunks[key])
+
+    def cached_chunks(self):
+        return list(self._chunks)
+
+    def snapshot(self):
+        self.flush()
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._chunks = OrderedDict()
+        board._dirty = set()
+        board._watchers = []
+        board._changes = None
+        return board
+
+    def place(self, entity, pos: tuple[int, int], reveal: bool = True):
+        if self.in_bounds(pos):
+            key, local = self._locate(pos)
+            self._chunk(key).place(entity, local, reveal)
+            self._dirty.add(key)
+            if self._watchers:
+                self._changed(pos)
+
+    def place_batch(self, cls: type, indices, factory=None):
+        for index in indices:
+            pos = divmod(int(index), self._cols)
+            self.place(factory(cls, pos) if factory else cls(pos), pos)
+
+    def entity_at(self, pos: tuple[int, int]):
+        if self.in_bounds(pos):
+            key, local = self._locate(pos)
+            return self._chunk(key).entity_at(local)
+        return None
+
+    def code_at(self, pos: tuple[int, int]):
+        if self.in_bounds(pos):
+            key, local = self._locate(pos)
+            return self._chunk(key).code_at(local)
+        return 0
+
+    def in_rect(self, cls: type, top: int, left: int, bottom: int, right: int):
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, self._rows - 1), min(right, self._cols - 1)
+        size = self._chunk_size
+        result = []
+        for cr in range(top // size, bottom // size + 1):
+            for cc in range(left // size, right // size + 1):
+                r0, c0 = cr * size, cc * size
+                chunk = self._chunk((cr, cc))
+                result.extend((r0 + r, c0 + c) for r, c in chunk.in_rect(cls, top - r0, left - c0, bottom - r0, right - c0))
+        return result
+
+    def is_revealed(self, pos: tuple[int, int]):
+        if self.in_bounds(pos):
+            key, local = self._locate(pos)
+            return self._chunk(key).is_revealed(local)
+        return False
+
+    def _reveal(self, pos: tuple[int, int]):
+        key, local = self._locate(pos)
+        if not self._chunk(key)._fog.reveal(local):
+            return False
+        self._dirty.add(key)
+        if self._watchers:
+            self._changed(pos)
+        return True
+
+    def reveal(self, pos: tuple[int, int]):
+        if self.in_bounds(pos):
+            self._reveal(pos)
+
+    def reveal_area(self, pos: tuple[int, int], radius: int):
+        r, c = pos
+        added = 0
+        for nr in range(max(r - radius, 0), min(r + radius, self._rows - 1) + 1):
+            for nc in range(max(c - radius, 0), min(c + radius, self._cols - 1) + 1):
+                added += self._reveal((nr, nc))
+        return added
+
+    def symbol_at(self, pos: tuple[int, int], player: 'Player'):
+        key, local = self._locate(pos)
+        chunk = self._chunk(key)
+        if not chunk.is_revealed(local):
+            return "X"
+        if pos == player.position:
+            return "P"
+        entity = chunk._grid[local[0]][local[1]]
+        return " " if entity is None else entity.symbol()
+
+    @timed("render")
+    def render(self, player: 'Player'):
+        rows, cols = min(VIEW[0], self._rows), min(VIEW[1], self._cols)
+        r, c = player.position
+        top = min(max(0, r - rows // 2), self._rows - rows)
+        left = min(max(0, c - cols // 2), self._cols - cols)
+        lines = []
+        for nr in range(top, top + rows):
+            lines.append("|" + "|".join(self.symbol_at((nr, nc), player) for nc in range(left, left + cols)) + "|")
+        print("\n".join(lines))
+
+    def to_dict(self):
+        self.flush()
+        return {
+            "class": "ChunkedBoard",
+            "rows": self._rows,
+            "cols": self._cols,
+            "start": self._start,
+            "goal": self._goal,
+            "seed": self._seed,
+            "settings": self._settings,
+            "player_lvl": self._player_lvl,
+            "chunk_size": self._chunk_size,
+            "path": self._path
+        }
+
+    @classmethod
+    def from_dict(cls, data, lazy: bool = True):
+        board = cls(data["rows"], data["cols"], data["settings"], data["seed"], data["player_lvl"],
+                    data["path"], data["chunk_size"])
+        board._start = tuple(data["start"])
+        board._goal = tuple(data["goal"])
+        return board
+
+CLASS_REGISTRY["ChunkedBoard"] = ChunkedBoard